@@ -0,0 +1,140 @@
+"""Recruitment pipeline analytics: funnel, time in stage and breakdowns per requisition, department and source.
+
+Reads tables through the source app.py passes in (see TableSource there),
+so this module does not import app.py.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+def days_between(start, end):
+    """Days from start to end per row as floats; NaN where either date is missing or end is earlier"""
+    days = (end - start).dt.total_seconds() / 86400
+    return days.where(days >= 0)
+
+def as_dates(series):
+    """A column as datetime64, whatever it was read as; unparseable cells become NaT"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series.astype(object), errors='coerce', format='mixed')
+
+def json_number(value, digits=3):
+    """A numpy number as a plain rounded float, None for NaN"""
+    return None if pd.isna(value) else round(float(value), digits)
+
+class PipelineAnalytics:
+    """Recruitment funnel, time-in-stage and source effectiveness from per-candidate stage timelines.
+
+    A timeline holds each candidate's first date at every milestone: the
+    applied_date, then their earliest screening, interview, offer and
+    onboarding row. Reaching a milestone counts as passing the earlier ones,
+    so a hire with no screening row still counts as screened. Like
+    the dashboard counters, the report is kept with the signatures of the tables it
+    was built from and rebuilt on the first request after one of them changes.
+    """
+
+    MILESTONES = [  # (funnel step, table, date column); a candidate is in the step's stage until the next one
+        ('Applied', 'candidates', 'applied_date'),
+        ('Screened', 'screening', 'screening_date'),
+        ('Interviewed', 'interviews', 'interview_date'),
+        ('Offered', 'offers', 'offer_date'),
+        ('Hired', 'onboarding', 'onboarding_date'),
+    ]
+    TABLES = ['requisitions', 'candidates', 'screening', 'interviews', 'offers', 'onboarding']
+    BREAKDOWNS = ['requisition', 'department', 'source']
+
+    def __init__(self, tables):
+        self.tables = tables
+        self._report = None
+        self._signatures = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def get(self):
+        """The current report, rebuilt only if a source table changed since it was built"""
+        signatures = [self.tables.signature(table) for table in self.TABLES]
+        with self._lock:
+            if self._report is not None and self._signatures == signatures:
+                return self._report
+        report = self.build()
+        with self._lock:
+            self._report, self._signatures = report, signatures
+            self.rebuilds += 1
+        return report
+
+    def timelines(self):
+        """One row per candidate id: requisition, department, source and the first date of each milestone"""
+        read = self.tables.read
+        candidates = read('candidates', ['id', 'requisition_id', 'department', 'source', 'applied_date'])
+        if 'id' not in candidates.columns:
+            return pd.DataFrame(columns=['requisition', 'department', 'source'] + [m[0] for m in self.MILESTONES])
+        candidates = candidates[candidates['id'].notna()].drop_duplicates('id').set_index('id')
+        column = lambda name: candidates[name] if name in candidates.columns else pd.Series(None, index=candidates.index, dtype=object)
+        timeline = pd.DataFrame({'requisition': column('requisition_id'), 'source': column('source')}, index=candidates.index)
+
+        # A candidate's department is their requisition's; direct hires carry their own
+        requisitions = read('requisitions', ['id', 'department'])
+        department = column('department').astype(object)
+        if 'department' in requisitions.columns:
+            by_requisition = requisitions.dropna(subset=['id']).drop_duplicates('id').set_index('id')['department'].astype(object)
+            department = timeline['requisition'].map(by_requisition).astype(object).where(lambda d: d.notna(), department)
+        timeline['department'] = department
+
+        timeline['Applied'] = as_dates(column('applied_date'))
+        for step, table, date_column in self.MILESTONES[1:]:
+            history = read(table, ['candidate_id', date_column])
+            if history.empty or date_column not in history.columns or 'candidate_id' not in history.columns:
+                timeline[step] = pd.NaT
+                continue
+            first = as_dates(history[date_column]).groupby(history['candidate_id']).min()
+            timeline[step] = first.reindex(timeline.index)
+        return timeline
+
+    def build(self):
+        """Compute the report from the tables"""
+        timeline = self.timelines()
+        steps = [m[0] for m in self.MILESTONES]
+        dates = timeline[steps]
+        # Reaching a step implies the earlier ones: a right-to-left running OR
+        reached = np.logical_or.accumulate(dates.notna().to_numpy()[:, ::-1], axis=1)[:, ::-1]
+        reached[:, 0] = True
+        reached = pd.DataFrame(reached, index=timeline.index, columns=steps)
+        days_to_hire = days_between(dates['Applied'], dates['Hired'])
+
+        counts = reached.sum()
+        funnel = [{'step': step, 'count': int(counts[step]),
+                   'conversion': json_number(counts[step] / counts[steps[i - 1]]) if i and counts[steps[i - 1]] else None,
+                   'from_applied': json_number(counts[step] / counts['Applied']) if counts['Applied'] else None}
+                  for i, step in enumerate(steps)]
+
+        time_in_stage = []
+        for (start, _, _), (end, _, _) in zip(self.MILESTONES, self.MILESTONES[1:]):
+            time_in_stage.append(self._durations(start, end, days_between(dates[start], dates[end])))
+        time_in_stage.append(self._durations('Applied', 'Hired', days_to_hire))
+
+        report = {'candidates': len(timeline), 'funnel': funnel, 'time_in_stage': time_in_stage}
+        for name in self.BREAKDOWNS:
+            report[f'by_{name}'] = self._breakdown(timeline[name], reached, days_to_hire)
+        return report
+
+    @staticmethod
+    def _durations(start, end, days):
+        days = days.dropna()
+        return {'from': start, 'to': end, 'count': len(days),
+                'median_days': json_number(days.median()) if len(days) else None,
+                'p90_days': json_number(days.quantile(0.9)) if len(days) else None}
+
+    @staticmethod
+    def _breakdown(keys, reached, days_to_hire):
+        """Funnel counts, rates and median days to hire per value of keys, largest groups first"""
+        grouped = reached.assign(days_to_hire=days_to_hire).groupby(keys.rename('key'), dropna=False, observed=True)
+        table = grouped[list(reached.columns)].sum()
+        table.columns = [step.lower() for step in reached.columns]
+        ratio = lambda a, b: (table[a] / table[b].where(table[b] > 0)).round(3)
+        table = table.assign(offer_rate=ratio('offered', 'applied'), hire_rate=ratio('hired', 'applied'),
+                             offer_acceptance=ratio('hired', 'offered'),
+                             median_days_to_hire=grouped['days_to_hire'].median().round(3))
+        table = table.sort_values(['applied', 'hired'], ascending=False).reset_index()
+        table['key'] = table['key'].astype(object).map(lambda key: 'Unknown' if pd.isna(key) else str(key))
+        return table.astype(object).where(table.notna(), None).to_dict('records')
@@ -1,48 +1,2529 @@
 import os
 import csv
 import pandas as pd
+import numpy as np
 import logging
 from datetime import datetime
+import werkzeug.utils
 from werkzeug.utils import secure_filename
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, make_response, Response
+from flask import Flask, render_template, request, redirect, url_for, flash, send_file, make_response, Response, jsonify
+from flask import g, session, has_request_context, before_render_template, template_rendered
 import uuid
 import io
+import json
+import hashlib
+import functools
+import re
+import threading
+import time
+import tempfile
+import bisect
+import sqlite3
+import click
+import multiprocessing
+import zipfile
+import shutil
+import zlib
+from collections import OrderedDict
+from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, ExitStack
+from resume_text import extract_resume_to_cache
+from table_views import DashboardStats, SearchIndex
+from analytics import PipelineAnalytics
+
+try:
+    import fcntl
+except ImportError:  # Windows: sequences are only guarded within the process
+    fcntl = None
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'DEBUG').upper())
+
+app = Flask(__name__)
+app.secret_key = os.environ.get("SESSION_SECRET", "hr-system-secret-key")
+
+# Configuration
+UPLOAD_FOLDER = 'uploads'
+BLOB_FOLDER = os.path.join(UPLOAD_FOLDER, '.blobs')
+RESUME_TEXT_FOLDER = os.path.join(UPLOAD_FOLDER, '.text')
+RESUME_EXTRACT_WORKERS = int(os.environ.get('RESUME_EXTRACT_WORKERS', 2))
+RESUME_EXTRACT_MAX_PENDING = 1000
+CSV_FOLDER = 'csv_templates'
+SEQUENCE_FOLDER = os.path.join(CSV_FOLDER, '.sequences')
+LOCK_FOLDER = os.path.join(CSV_FOLDER, '.locks')
+SNAPSHOT_FOLDER = os.path.join(CSV_FOLDER, '.snapshots')
+JOURNAL_FOLDER = os.path.join(CSV_FOLDER, '.journal')
+JOB_FOLDER = os.path.join(CSV_FOLDER, '.jobs')
+# Threads running background jobs (bulk uploads, exports, offer letter zips); 0 runs each job inline in its request
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_MAX_PENDING = 100
+# Finished jobs' records and files are deleted after JOB_RETENTION_SECONDS, checked at most every JOB_PRUNE_INTERVAL
+JOB_RETENTION_SECONDS = int(os.environ.get('JOB_RETENTION_SECONDS', 24 * 3600))
+JOB_PRUNE_INTERVAL = 3600
+# Rendered offer letters kept in memory, and threads rendering a requisition's letters for its zip
+OFFER_LETTER_CACHE_ENTRIES = int(os.environ.get('OFFER_LETTER_CACHE_ENTRIES', 1000))
+OFFER_LETTER_WORKERS = int(os.environ.get('OFFER_LETTER_WORKERS', 4))
+ALLOWED_EXTENSIONS = {'txt', 'pdf', 'doc', 'docx', 'csv'}
+# Hand uploaded-document transfers to the web server in front: '' serves them from the app,
+# 'x-sendfile' sets X-Sendfile (Apache mod_xsendfile, lighttpd) and 'x-accel' sets
+# X-Accel-Redirect to UPLOAD_ACCEL_PREFIX, an nginx internal location aliased to UPLOAD_FOLDER
+UPLOAD_OFFLOAD = os.environ.get('UPLOAD_OFFLOAD', '').lower()
+UPLOAD_ACCEL_PREFIX = os.environ.get('UPLOAD_ACCEL_PREFIX', '/protected-uploads/')
+TABLE_CACHE_MAX_BYTES = int(os.environ.get('TABLE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+TABLE_CACHE_MAX_ENTRIES = int(os.environ.get('TABLE_CACHE_MAX_ENTRIES', 32))
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'csv')  # 'csv' or 'sqlite'
+GROUP_COMMIT_WINDOW_MS = float(os.environ.get('GROUP_COMMIT_WINDOW_MS', 0))
+BULK_UPLOAD_CHUNK_SIZE = int(os.environ.get('BULK_UPLOAD_CHUNK_SIZE', 1000))
+# Bulk-upload CSVs up to this size are ingested within the request; larger ones run as a background job
+BULK_UPLOAD_INLINE_BYTES = int(os.environ.get('BULK_UPLOAD_INLINE_BYTES', 256 * 1024))
+BULK_REPORT_MAX_ISSUES = 1000
+LIST_PAGE_SIZE = int(os.environ.get('LIST_PAGE_SIZE', 50))
+LIST_PAGE_SIZE_MAX = 500
+# Requests slower than this are logged with their I/O counts (0 turns the log off)
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 0))
+# Query-string filter name -> table column, shared by the list pages
+LIST_FILTERS = {
+    'stage': 'stage',
+    'status': 'status',
+    'requisition': 'requisition_id',
+    'source': 'source',
+    'department': 'department',
+}
+# Pipeline stages a candidate can move to from each stage, as the screening,
+# interview, offer, onboarding and resignation forms move them
+STAGE_TRANSITIONS = {
+    'Applied': {'Screening', 'Screening Hold', 'Rejected'},
+    'Screening Hold': {'Screening', 'Screening Hold', 'Rejected'},
+    'Screening': {'Interview', 'Interview Hold', 'Rejected'},
+    'Interview Hold': {'Interview', 'Interview Hold', 'Rejected'},
+    'Hold': {'Screening', 'Screening Hold', 'Interview', 'Interview Hold', 'Rejected'},  # from before holds were split
+    'Interview': {'Offer'},
+    'Offer': {'Onboarded'},
+    'Onboarded': {'Onboarded', 'Resigned'},
+    'Resigned': set(),
+    'Rejected': set(),
+}
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# Searchable columns per table, with the weight a match in each counts for;
+# resume_filename is indexed through the extracted resume text
+SEARCH_FIELDS = {
+    'candidates': {'name': 3.0, 'skills': 2.0, 'email': 1.0, 'phone': 1.0, 'resume_filename': 0.5},
+    'requisitions': {'position_title': 3.0, 'requirements': 1.5, 'job_description': 1.0},
+}
+SEARCH_RESULT_LIMIT = 20
+SQLITE_PATH = os.environ.get('SQLITE_PATH', os.path.join(CSV_FOLDER, 'hr.sqlite3'))
+TABLE_NAMES = ['requisitions', 'candidates', 'screening', 'interviews', 'offers', 'onboarding', 'resignations']
+HISTORY_DATE_COLUMNS = {
+    'screening': 'screening_date',
+    'interviews': 'interview_date',
+    'offers': 'offer_date',
+    'onboarding': 'onboarding_date',
+    'resignations': 'resignation_date',
+}
+# Date column the export's date_from/date_to apply to unless ?date_column= names another
+EXPORT_DATE_COLUMNS = dict(HISTORY_DATE_COLUMNS, requisitions='created_date', candidates='applied_date')
+EXPORT_CHUNK_ROWS = 10000
+# Declared column types; columns not listed are free text. Kinds: int (nullable Int64),
+# number (Int64 while every value is whole, else float), float, category, flag (Yes/No
+# held as boolean), date and datetime (see DATE_FORMATS). Numbers and dates that do not
+# parse are written as given, and the column then loads as text (see apply_schema).
+TABLE_SCHEMAS = {
+    'requisitions': {
+        'id': 'int', 'start_date': 'date', 'end_date': 'date', 'number_of_openings': 'number',
+        'department': 'category', 'location': 'category', 'salary_min': 'number', 'salary_max': 'number',
+        'job_type': 'category', 'status': 'category', 'created_date': 'datetime',
+    },
+    'candidates': {
+        'id': 'int', 'requisition_id': 'int', 'experience': 'number', 'stage': 'category',
+        'applied_date': 'datetime', 'notice_period': 'category', 'source': 'category',
+        'department': 'category', 'join_date': 'date',
+    },
+    'screening': {
+        'id': 'int', 'candidate_id': 'int', 'technical_score': 'int', 'communication_score': 'int',
+        'experience_score': 'int', 'overall_score': 'float', 'status': 'category', 'screening_date': 'datetime',
+    },
+    'interviews': {
+        'id': 'int', 'candidate_id': 'int', 'interview_type': 'category', 'technical_score': 'int',
+        'problem_solving_score': 'int', 'communication_score': 'int', 'cultural_fit_score': 'int',
+        'overall_score': 'float', 'status': 'category', 'interview_date': 'datetime',
+    },
+    'offers': {
+        'id': 'int', 'candidate_id': 'int', 'salary': 'number', 'joining_date': 'date', 'department': 'category',
+        'location': 'category', 'offer_letter_generated': 'flag', 'offer_date': 'datetime', 'status': 'category',
+    },
+    'onboarding': {
+        'id': 'int', 'candidate_id': 'int', 'documents_verified': 'flag', 'laptop_assigned': 'flag',
+        'id_card_issued': 'flag', 'workspace_assigned': 'flag', 'orientation_completed': 'flag',
+        'system_access_provided': 'flag', 'onboarding_date': 'datetime', 'hr_representative': 'category',
+    },
+    'resignations': {
+        'id': 'int', 'candidate_id': 'int', 'resignation_date': 'date', 'last_working_date': 'date',
+        'reason': 'category', 'exit_interview_completed': 'flag', 'laptop_returned': 'flag',
+        'id_card_returned': 'flag', 'clearance_completed': 'flag', 'final_settlement': 'category',
+        'hr_representative': 'category', 'updated_at': 'datetime', 'completion_status': 'category',
+        'notice_period_days': 'number', 'notice_period_end_date': 'date',
+    },
+}
+DATE_FORMATS = {'date': '%Y-%m-%d', 'datetime': '%Y-%m-%d %H:%M:%S'}
+# Date columns keep their format when joined onto another table's rows
+COLUMN_DATE_FORMATS = {column: DATE_FORMATS[kind] for schema in TABLE_SCHEMAS.values()
+                       for column, kind in schema.items() if kind in DATE_FORMATS}
+FLAG_VALUES = {'yes': True, 'no': False, 'true': True, 'false': False}
+
+# Ensure directories exist
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+os.makedirs(BLOB_FOLDER, exist_ok=True)
+os.makedirs(RESUME_TEXT_FOLDER, exist_ok=True)
+os.makedirs(CSV_FOLDER, exist_ok=True)
+os.makedirs(SEQUENCE_FOLDER, exist_ok=True)
+os.makedirs(LOCK_FOLDER, exist_ok=True)
+os.makedirs(SNAPSHOT_FOLDER, exist_ok=True)
+os.makedirs(JOURNAL_FOLDER, exist_ok=True)
+os.makedirs(JOB_FOLDER, exist_ok=True)
+
+# Cached tables are handed out as shallow copies; copy-on-write keeps callers from mutating the cache
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+class Metrics:
+    """Per-endpoint request metrics, exposed in the Prometheus text format on /metrics.
+
+    Storage code calls count() where it reads, parses or writes tables. The
+    amount is added to the endpoint's running total and to the current
+    request, whose totals feed the per-request histograms and the slow
+    request log. Work outside a request (background snapshot writes, resume
+    re-indexing) is counted under endpoint="background". A write committed
+    for a group of requests is counted on the request that committed it.
+    Values are per process.
+    """
+
+    COUNTERS = {
+        'table_reads': 'read_csv_safe calls',
+        'table_writes': 'Write operations queued on a table (appends, updates, replacements)',
+        'bytes_parsed': 'CSV and snapshot bytes parsed into tables',
+        'bytes_written': 'Bytes written to CSV and snapshot files',
+        'rows_scanned': 'Table rows loaded from storage or filtered',
+        'rows_written': 'Table rows written',
+        'upload_bytes': 'Request body bytes of multipart (file upload) requests',
+    }
+    # name -> (bucket upper bounds, per-request amount observed, help)
+    HISTOGRAMS = {
+        'request_duration_seconds': ((0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10), 'duration',
+                                     'Wall time per request'),
+        'template_render_seconds': ((0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1), 'render_seconds',
+                                    'Template render time per request'),
+        'request_bytes_parsed': ((1 << 10, 1 << 14, 1 << 17, 1 << 20, 1 << 23, 1 << 26, 1 << 29), 'bytes_parsed',
+                                 'Table bytes parsed per request'),
+    }
+
+    def __init__(self, prefix='hr'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.counters = {}  # (name, endpoint) -> total
+        self.requests = {}  # (endpoint, method, status) -> count
+        self.histograms = {}  # (name, endpoint) -> [count per bucket..., +Inf count, sum]
+
+    def count(self, name, amount=1):
+        if has_request_context():
+            current = g.setdefault('metrics', {})
+            current[name] = current.get(name, 0) + amount
+            endpoint = request.endpoint or 'unmatched'
+        else:
+            endpoint = 'background'
+        with self._lock:
+            self.counters[(name, endpoint)] = self.counters.get((name, endpoint), 0) + amount
+
+    def finish_request(self, status, duration):
+        """Record a finished request; returns its per-request totals"""
+        current = dict(g.get('metrics', {}), duration=duration)
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            key = (endpoint, request.method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for name, (buckets, source, _) in self.HISTOGRAMS.items():
+                if source not in current:
+                    continue
+                value = current[source]
+                counts = self.histograms.setdefault((name, endpoint), [0] * (len(buckets) + 2))
+                counts[bisect.bisect_left(buckets, value)] += 1
+                counts[-1] += value
+        return current
+
+    def render(self, extra=None):
+        """All metrics in the Prometheus text exposition format; extra maps name -> (type, help, value)"""
+        p = self.prefix
+        with self._lock:
+            counters, requests = dict(self.counters), dict(self.requests)
+            histograms = {key: list(counts) for key, counts in self.histograms.items()}
+        lines = [f'# HELP {p}_requests_total Requests handled', f'# TYPE {p}_requests_total counter']
+        for (endpoint, method, status), value in sorted(requests.items()):
+            lines.append(f'{p}_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {value}')
+        for name, help_text in self.COUNTERS.items():
+            lines += [f'# HELP {p}_{name}_total {help_text}', f'# TYPE {p}_{name}_total counter']
+            for (counter, endpoint), value in sorted(counters.items()):
+                if counter == name:
+                    lines.append(f'{p}_{name}_total{{endpoint="{endpoint}"}} {value:g}')
+        for name, (buckets, _, help_text) in self.HISTOGRAMS.items():
+            lines += [f'# HELP {p}_{name} {help_text}', f'# TYPE {p}_{name} histogram']
+            for (histogram, endpoint), counts in sorted(histograms.items()):
+                if histogram != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += count
+                    lines.append(f'{p}_{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                lines.append(f'{p}_{name}_sum{{endpoint="{endpoint}"}} {counts[-1]:g}')
+                lines.append(f'{p}_{name}_count{{endpoint="{endpoint}"}} {cumulative}')
+        for name, (kind, help_text, value) in (extra or {}).items():
+            lines += [f'# HELP {p}_{name} {help_text}', f'# TYPE {p}_{name} {kind}', f'{p}_{name} {value:g}']
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+
+class TableCache:
+    """Process-wide LRU cache of parsed CSV tables keyed by path.
+
+    An entry is only served while the storage signature (file mtime/size or
+    SQLite table version) and the in-process write version match the values
+    recorded when it was parsed.
+    """
+
+    def __init__(self, max_bytes, max_entries):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # path -> (signature, df, nbytes, indexes)
+        self._versions = {}
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def signature(self, csv_file_path):
+        """Return the validity key for a table"""
+        path = os.path.abspath(csv_file_path)
+        return storage.signature(path) + (self._versions.get(path, 0),)
+
+    def get(self, csv_file_path):
+        """Return a shallow copy of the cached table, or None if missing or stale"""
+        path = os.path.abspath(csv_file_path)
+        with self._lock:
+            entry = self._entries.get(path)
+            try:
+                current = self.signature(path)
+            except (OSError, sqlite3.Error):
+                current = None
+            if entry is None or entry[0] != current:
+                if entry is not None:
+                    self._drop(path)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1].copy(deep=False)
+
+    def current(self, csv_file_path):
+        """(signature, table) of a current cached table without copying it or counting a hit; None otherwise"""
+        path = os.path.abspath(csv_file_path)
+        with self._lock:
+            entry = self._entries.get(path)
+            try:
+                current = self.signature(path)
+            except (OSError, sqlite3.Error):
+                return None
+            if entry is None or entry[0] != current:
+                return None
+            return entry[0], entry[1]
+
+    def get_index(self, csv_file_path, name, builder):
+        """Return (table, index) for a current cached table, building the index on first use.
+
+        Returns None when the table is not cached or stale.
+        """
+        path = os.path.abspath(csv_file_path)
+        with self._lock:
+            entry = self._entries.get(path)
+            try:
+                current = self.signature(path)
+            except (OSError, sqlite3.Error):
+                current = None
+            if entry is None or entry[0] != current:
+                return None
+            indexes = entry[3]
+            if name not in indexes:
+                indexes[name] = builder(entry[1])
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1].copy(deep=False), indexes[name]
+
+    def put(self, csv_file_path, df, signature, indexes=None):
+        """Store a parsed table under the signature observed before it was read"""
+        path = os.path.abspath(csv_file_path)
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            if path in self._entries:
+                self._drop(path)
+            if nbytes > self.max_bytes or self.max_entries <= 0:
+                return
+            self._entries[path] = (signature, df.copy(deep=False), nbytes, indexes or {})
+            self.current_bytes += nbytes
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def extend(self, csv_file_path, rows_df, before, after):
+        """Append freshly written rows to a cached table that was current before the write"""
+        path = os.path.abspath(csv_file_path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != before:
+                return
+            cached = entry[1].copy(deep=False)
+            for col in rows_df.columns:
+                if col not in cached.columns:
+                    continue
+                cached_dtype, new_dtype = cached[col].dtype, rows_df[col].dtype
+                cached_kind, new_kind = cached_dtype.kind, new_dtype.kind
+                if isinstance(cached_dtype, pd.CategoricalDtype) and isinstance(new_dtype, pd.CategoricalDtype):
+                    if not cached_dtype.categories.equals(new_dtype.categories):
+                        # Recode both sides onto the sorted union so sorting stays alphabetical
+                        categories = cached_dtype.categories.union(new_dtype.categories)
+                        cached[col] = cached[col].cat.set_categories(categories)
+                        rows_df[col] = rows_df[col].cat.set_categories(categories)
+                elif rows_df[col].isna().all():
+                    # All-empty columns parse as float; keep the cached dtype instead
+                    if not isinstance(cached_dtype, np.dtype) or cached_kind not in 'iub':
+                        rows_df[col] = rows_df[col].astype(cached_dtype)
+                elif cached_dtype != new_dtype and (is_typed_dtype(cached_dtype) or is_typed_dtype(new_dtype)):
+                    if cached_kind == new_kind == 'M':
+                        continue  # datetime resolutions are reconciled by concat
+                    # One side did not fit the schema; a fresh parse decides the column's dtype
+                    self._drop(path)
+                    return
+                elif cached_kind in 'OSUT' and new_kind in 'iufb':
+                    # A text column stays text even if the new values look numeric
+                    rows_df[col] = rows_df[col].map(lambda v: v if pd.isna(v) else str(v)).astype(cached[col].dtype)
+                elif cached_kind in 'iufb' and new_kind not in 'iufb':
+                    # A fresh parse would turn the whole column into text; let it happen
+                    self._drop(path)
+                    return
+            combined = pd.concat([cached, rows_df], ignore_index=True)
+            indexes = {}
+            for name, index in entry[3].items():
+                try:
+                    index.add_rows(combined, len(cached))
+                    indexes[name] = index
+                except Exception as e:
+                    logging.debug(f"Dropping index {name} for {path}: {e}")
+        self.put(path, combined, after, indexes)
+
+    def invalidate(self, csv_file_path):
+        """Bump the write version of a table so any cached copy is discarded"""
+        path = os.path.abspath(csv_file_path)
+        with self._lock:
+            self._versions[path] = self._versions.get(path, 0) + 1
+            if path in self._entries:
+                self._drop(path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _drop(self, path):
+        entry = self._entries.pop(path)
+        self.current_bytes -= entry[2]
+
+table_cache = TableCache(TABLE_CACHE_MAX_BYTES, TABLE_CACHE_MAX_ENTRIES)
+
+class CandidateHistoryIndex:
+    """Maps candidate_id to row positions of a history table, oldest first by its date column.
+
+    Built once per cached table and extended in place when rows are appended,
+    so the latest screening/interview/... for a candidate is positions[-1].
+    """
+
+    def __init__(self, df, date_column):
+        self.date_column = date_column
+        self.positions = {}
+        self.add_rows(df, 0)
+
+    def lookup(self, candidate_id):
+        try:
+            return self.positions.get(int(candidate_id), [])
+        except (TypeError, ValueError):
+            return []
+
+    def add_rows(self, df, start):
+        """Index rows start..end of df (start=0 builds the whole index)"""
+        if 'candidate_id' not in df.columns:
+            return
+        keys = pd.to_numeric(df['candidate_id'].iloc[start:], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        dates = df[self.date_column].reset_index(drop=True) if self.date_column in df.columns else None
+        if start == 0:
+            if dates is None:
+                order = np.arange(len(df))
+            else:
+                order = dates.sort_values(kind='stable', na_position='last').index.to_numpy()
+            groups = pd.Series(order).groupby(keys[order], sort=False).indices
+            self.positions = {int(key): order[idx].tolist() for key, idx in groups.items()}
+            return
+        for offset, key in enumerate(keys):
+            if pd.isna(key):
+                continue
+            rows = self.positions.setdefault(int(key), [])
+            if dates is None:
+                rows.append(start + offset)
+            else:
+                bisect.insort(rows, start + offset, key=lambda pos: self._sort_key(dates.iat[pos], pos))
+
+    @staticmethod
+    def _sort_key(value, pos):
+        # Same order as a stable sort_values with missing dates last
+        return (1, '', pos) if pd.isna(value) else (0, value, pos)
+
+# Fields copied onto candidate records by the list and detail pages
+REQUISITION_FIELDS = {'position': 'position_title', 'requisition_department': 'department'}
+OFFER_FIELDS = {
+    'department': 'department',
+    'job_title': 'job_title',
+    'joining_date': 'joining_date',
+    'location': 'location',
+    'salary': 'salary',
+    'benefits': 'benefits',
+}
+
+def first_row_per_key(df, key_column):
+    """First row (in file order) for each key value"""
+    if df.empty or key_column not in df.columns:
+        return df
+    return df.drop_duplicates(subset=key_column, keep='first')
+
+def latest_row_per_key(df, key_column, sort_by):
+    """Last row for each key value after a stable sort by sort_by"""
+    if df.empty or key_column not in df.columns:
+        return df
+    try:
+        df = df.sort_values(by=sort_by, kind='stable')
+    except Exception:
+        pass
+    return df.drop_duplicates(subset=key_column, keep='last')
+
+def attach_related(records, related_df, fields, key_column='candidate_id', left_key='id',
+                   default='N/A', keep_existing=False):
+    """Copy fields from one related row per key onto each record dict (a hash join).
+
+    related_df must hold at most one row per key_column value. Records
+    without a related row are left untouched. fields maps record keys to
+    related columns; a column missing from related_df yields default, or
+    the record's current value when keep_existing is set.
+    """
+    if not records or related_df.empty or key_column not in related_df.columns:
+        return records
+    columns = [c for c in dict.fromkeys(fields.values()) if c in related_df.columns and c != key_column]
+    lookup = plain_frame(related_df.set_index(key_column)[columns]).to_dict('index')
+    for record in records:
+        key = record.get(left_key)
+        try:
+            related = lookup.get(key) if key in lookup else lookup.get(int(key))
+        except (TypeError, ValueError):
+            related = None
+        if related is None:
+            continue
+        for target, column in fields.items():
+            fallback = record.get(target, default) if keep_existing else default
+            record[target] = related.get(column, fallback)
+    return records
+
+def history_rows(csv_file_path, candidate_id, sort_by='date'):
+    """Rows of a history table for one candidate.
+
+    sort_by='date' orders by the table's date column (oldest first), None
+    keeps file order, and any other column name sorts by that column.
+    """
+    date_column = HISTORY_DATE_COLUMNS.get(table_name(csv_file_path))
+    if sort_by == 'date':
+        sort_by = date_column
+    try:
+        rows = None
+        builder = lambda df: CandidateHistoryIndex(df, date_column)
+        indexed = table_cache.get_index(csv_file_path, 'candidate_history', builder)
+        if indexed is None and not read_csv_safe(csv_file_path).empty:
+            indexed = table_cache.get_index(csv_file_path, 'candidate_history', builder)
+        if indexed is not None:
+            df, index = indexed
+            positions = index.lookup(candidate_id)
+            if sort_by == date_column and date_column in df.columns:
+                return df.iloc[positions]
+            rows = df.iloc[sorted(positions)]
+        if rows is None:
+            rows = find_rows(csv_file_path, candidate_id=int(candidate_id))
+        if sort_by and not rows.empty:
+            try:
+                rows = rows.sort_values(by=sort_by, kind='stable')
+            except Exception:
+                pass
+        return rows
+    except Exception as e:
+        logging.error(f"Error reading history from {csv_file_path}: {e}")
+        return pd.DataFrame()
+
+class ListPage:
+    """One page of a filtered, sorted list plus the state its controls link back to.
+
+    Several lists can share a URL; each reads its query arguments under its
+    own prefix and links keep the other lists' arguments intact.
+    """
+
+    def __init__(self, rows, total, page, limit, sort, order, filters, filter_names, date_column, prefix, args):
+        self.rows = rows
+        self.total = total
+        self.page = page
+        self.limit = limit
+        self.sort = sort
+        self.order = order
+        self.filters = filters
+        self.filter_names = list(filter_names) + (['date_from', 'date_to'] if date_column else [])
+        self.date_column = date_column
+        self.prefix = prefix
+        self.args = args
+
+    @property
+    def pages(self):
+        return max(1, -(-self.total // self.limit))
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    @property
+    def first_index(self):
+        return (self.page - 1) * self.limit + 1 if self.total else 0
+
+    @property
+    def last_index(self):
+        return min(self.page * self.limit, self.total)
+
+    def hidden_args(self):
+        """Arguments a filter form must carry over: other lists' state and this list's sort and size"""
+        own = {self.prefix + name for name in self.filter_names + ['page']}
+        return {key: value for key, value in self.args.items() if key not in own}
+
+    def url(self, **changes):
+        """URL of the current view with some of this list's arguments changed (None removes one)"""
+        args = dict(self.args)
+        for name, value in changes.items():
+            if value is None or value == '':
+                args.pop(self.prefix + name, None)
+            else:
+                args[self.prefix + name] = value
+        return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+def _column_equals(series, value):
+    """Compare a column with a query-string value, numerically for numeric columns"""
+    if pd.api.types.is_numeric_dtype(series):
+        number = pd.to_numeric(value, errors='coerce')
+        return (series == number).fillna(False) if not pd.isna(number) else pd.Series(False, index=series.index)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series == value  # compares the codes, not every string
+    return series.astype(str) == value
+
+def filter_mask(df, arg, filters, date_column=None):
+    """Boolean mask of the rows matching the equality filters (see LIST_FILTERS) and date_from/date_to range.
+
+    arg(name) returns a filter's query-string value ('' when not given).
+    Returns the mask and the filters that were applied.
+    """
+    applied = {}
+    mask = pd.Series(True, index=df.index)
+    for name in filters:
+        value, column = arg(name), LIST_FILTERS[name]
+        if value:
+            applied[name] = value
+            if column in df.columns:
+                mask &= _column_equals(df[column], value)
+            else:
+                mask &= False
+    if date_column and date_column in df.columns:
+        column = df[date_column]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            # Whole-day comparison; a bound that is not a date matches nothing
+            dates = column.dt.normalize()
+            bound = lambda text: pd.to_datetime(text[:10], format='%Y-%m-%d', errors='coerce')
+        else:
+            dates = column.astype(str).str[:10]
+            bound = lambda text: text
+        for name, keep in (('date_from', dates.__ge__), ('date_to', dates.__le__)):
+            if arg(name):
+                applied[name] = arg(name)
+                mask &= column.notna() & keep(bound(arg(name)))
+    return mask, applied
+
+def query_table(df, prefix='', date_column=None, filters=('stage', 'requisition', 'source'), default_sort=None):
+    """Filter, sort and slice a table for a list page from the request's query string.
+
+    Supports equality filters (see LIST_FILTERS), a date_from/date_to range on
+    date_column, sort/order and page/limit. Only the requested page is turned
+    into record dicts; the rest of the table is never materialized.
+    """
+    args = request.args.to_dict()
+    arg = lambda name: (args.get(prefix + name) or '').strip()
+    metrics.count('rows_scanned', len(df))
+
+    mask, applied = filter_mask(df, arg, filters, date_column)
+    if not mask.all():
+        df = df[mask]
+
+    sort = arg('sort') or default_sort
+    order = 'desc' if arg('order') == 'desc' else 'asc'
+    if sort in df.columns:
+        try:
+            df = df.sort_values(by=sort, ascending=(order == 'asc'), kind='stable', na_position='last')
+        except TypeError:
+            pass  # mixed-type column; keep file order
+    else:
+        sort = None
+
+    try:
+        limit = min(max(int(arg('limit') or LIST_PAGE_SIZE), 1), LIST_PAGE_SIZE_MAX)
+    except ValueError:
+        limit = LIST_PAGE_SIZE
+    total = len(df)
+    pages = max(1, -(-total // limit))
+    try:
+        page = min(max(int(arg('page') or 1), 1), pages)
+    except ValueError:
+        page = 1
+    start = (page - 1) * limit
+    rows = to_records(df.iloc[start:start + limit])
+    return ListPage(rows, total, page, limit, sort, order, applied, filters, date_column, prefix, args)
+
+def join_related(df, related_df, fields, key_column='candidate_id', left_key='id'):
+    """Frame-level attach_related: set columns from one related row per key, so lists can filter and sort on them"""
+    if df.empty or related_df.empty or key_column not in related_df.columns or left_key not in df.columns:
+        return df
+    lookup = related_df.set_index(key_column)
+    matched = df[left_key].isin(lookup.index)
+    df = df.copy()
+    for target, column in fields.items():
+        values = df[left_key].map(lookup[column]) if column in lookup.columns else pd.Series('N/A', index=df.index)
+        if target in df.columns:
+            # The two tables may type the column differently; combine their plain values
+            df[target] = plain_column(df[target], target).where(~matched, plain_column(values, target))
+        else:
+            df[target] = values.where(matched)
+    return df
+
+def table_name(csv_file_path):
+    """Table name for a CSV path, e.g. csv_templates/offers.csv -> offers"""
+    return os.path.splitext(os.path.basename(csv_file_path))[0]
+
+def frame_to_text_rows(df):
+    """Render a DataFrame as rows of CSV cell text (None for empty cells)"""
+    buffer = io.StringIO()
+    plain_frame(df).to_csv(buffer, header=False, index=False)
+    buffer.seek(0)
+    return [tuple(v if v != '' else None for v in row) for row in csv.reader(buffer)]
+
+def update_each_hits(df, key, column, changes):
+    """Mask of the rows an ('update_each', key, column, changes) write changes, and their new values.
+
+    changes maps a key value to (expected, new): a row changes only while
+    its column still holds the expected value.
+    """
+    if df.empty or key not in df.columns or column not in df.columns:
+        return pd.Series(False, index=df.index), pd.Series(dtype=object)
+    keys = df[key].astype(object)
+    expected = keys.map({k: old for k, (old, new) in changes.items()})
+    hit = expected.notna() & (df[column].astype(object) == expected).fillna(False)
+    return hit, keys[hit].map({k: new for k, (old, new) in changes.items()})
+
+def match_rows(df, conditions):
+    """Filter a DataFrame to rows whose columns equal the given values"""
+    if df.empty or any(col not in df.columns for col in conditions):
+        return df.iloc[0:0]
+    metrics.count('rows_scanned', len(df))
+    mask = pd.Series(True, index=df.index)
+    for col, value in conditions.items():
+        mask &= (df[col] == value).fillna(False)
+    return df[mask]
+
+_schema_fallbacks = set()  # (table, column) pairs already reported as not fitting their declared kind
+
+def is_typed_dtype(dtype):
+    """True for the dtypes TABLE_SCHEMAS gives columns, as opposed to what read_csv infers"""
+    return (isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_datetime64_any_dtype(dtype)
+            or (isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.kind in 'iufb'))
+
+def typed_column(series, kind):
+    """Convert a column to the dtype of its declared kind; ValueError if any value does not fit"""
+    if kind == 'category':
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            return series if categories.is_monotonic_increasing else series.cat.reorder_categories(categories.sort_values())
+        if pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+            series = series.astype('Int64')  # whole numbers read back with missing cells
+        return (series if series.dtype == 'str' else series.astype('str')).astype('category')
+    missing = series.isna()
+    if kind in ('int', 'number', 'float'):
+        if kind != 'float' and isinstance(series.dtype, pd.Int64Dtype):
+            return series
+        if kind != 'float' and isinstance(series.dtype, np.dtype) and series.dtype.kind in 'iu':
+            return series.astype('Int64')  # already whole numbers with nothing missing
+        if kind == 'float' and series.dtype == np.float64:
+            return series
+        numbers = pd.to_numeric(series, errors='coerce')
+        if (numbers.isna() & ~missing).any():
+            raise ValueError('non-numeric values')
+        if kind == 'float':
+            return numbers.astype('float64')
+        if (numbers.dropna() % 1 != 0).any():
+            if kind == 'number':
+                return numbers.astype('float64')
+            raise ValueError('fractional values')
+        return numbers.astype('Int64')
+    if kind == 'flag':
+        if isinstance(series.dtype, pd.BooleanDtype):
+            return series
+        if pd.api.types.is_bool_dtype(series):
+            return series.astype('boolean')
+        flags = series.map(lambda value: FLAG_VALUES.get(str(value).strip().lower()), na_action='ignore')
+        if (flags.isna() & ~missing).any():
+            raise ValueError('values other than Yes/No')
+        return flags.astype('boolean')
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    dates = pd.to_datetime(series, format=DATE_FORMATS[kind], errors='coerce')
+    if (dates.isna() & ~missing).any():
+        raise ValueError(f'values not in {DATE_FORMATS[kind]} format')
+    return dates
+
+def apply_schema(table, df):
+    """Give a table's columns their declared dtypes.
+
+    A column holding values that do not fit its kind keeps the dtype it was
+    read with (and is reported once), so nothing is lost on the next rewrite.
+    """
+    converted = {}
+    for column, kind in TABLE_SCHEMAS.get(table, {}).items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        try:
+            typed = typed_column(series, kind)
+        except (ValueError, TypeError) as e:
+            if (table, column) not in _schema_fallbacks:
+                _schema_fallbacks.add((table, column))
+                logging.warning(f"{table}.{column} is not a valid {kind} column ({e}); keeping it as read")
+            continue
+        if typed is not series:
+            converted[column] = typed
+    return df.assign(**converted) if converted else df
+
+def plain_column(series, column=None):
+    """A typed column as templates, JSON and CSV expect it: Yes/No flags, formatted dates, NaN for missing"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return series.astype(object)
+    if isinstance(dtype, pd.BooleanDtype):
+        return series.map({True: 'Yes', False: 'No'}).astype(object)
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return series.dt.strftime(COLUMN_DATE_FORMATS.get(column, DATE_FORMATS['datetime'])).astype(object)
+    if is_typed_dtype(dtype):
+        return pd.Series(series.to_numpy(dtype=object, na_value=np.nan), index=series.index, name=series.name)
+    return series
+
+def plain_frame(df):
+    """DataFrame with every typed column converted by plain_column"""
+    converted = {col: plain_column(df[col], col) for col in df.columns if is_typed_dtype(df[col].dtype)}
+    return df.assign(**converted) if converted else df
+
+def to_records(df):
+    """Rows of a (typed) table as plain record dicts"""
+    return plain_frame(df).to_dict('records')
+
+def plain_scalar(series, position):
+    """One value of a (typed) column as to_records gives it, without converting the column"""
+    value = series.iat[position]
+    if is_typed_dtype(series.dtype):
+        if pd.isna(value):
+            return np.nan
+        if isinstance(series.dtype, pd.BooleanDtype):
+            return 'Yes' if value else 'No'
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return value.strftime(COLUMN_DATE_FORMATS.get(series.name, DATE_FORMATS['datetime']))
+    return value.item() if isinstance(value, np.generic) else value
+
+def to_record(df, position=0):
+    """One row of a (typed) table as a plain record dict"""
+    return {col: plain_scalar(series, position) for col, series in df.items()}
+
+def plain_value(kind, value):
+    """Canonical plain form of one value for a column of the given kind (None if empty).
+
+    Raises ValueError for int, float and flag values that do not fit; numbers
+    and dates that do not parse are kept as the (stripped) text given.
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if not isinstance(value, str) and pd.isna(value):
+        return None
+    try:
+        if kind == 'int':
+            number = float(value)
+            if isinstance(value, bool) or not number.is_integer():
+                raise ValueError
+            return int(value) if isinstance(value, (int, np.integer)) else int(number)
+        if kind == 'float':
+            return float(value)
+        if kind == 'number':
+            try:
+                number = float(value)
+            except (ValueError, TypeError):
+                return str(value).strip()
+            if isinstance(value, bool):
+                raise ValueError
+            if not np.isfinite(number):
+                return str(value).strip()
+            return int(number) if number.is_integer() else number
+        if kind == 'flag':
+            if isinstance(value, (bool, np.bool_)):
+                return 'Yes' if value else 'No'
+            return 'Yes' if FLAG_VALUES[str(value).strip().lower()] else 'No'
+        if kind in DATE_FORMATS:
+            if isinstance(value, datetime):
+                return value.strftime(DATE_FORMATS[kind])
+            try:
+                return datetime.strptime(str(value).strip(), DATE_FORMATS[kind]).strftime(DATE_FORMATS[kind])
+            except ValueError:
+                return str(value).strip()
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f'{value!r} is not a valid {kind}') from None
+    return str(value)
+
+def conform_row(table, row):
+    """A row to be written with its declared columns in canonical form; ValueError naming a column that does not fit"""
+    schema = TABLE_SCHEMAS.get(table, {})
+    conformed = dict(row)
+    for column, value in row.items():
+        if column in schema:
+            try:
+                conformed[column] = plain_value(schema[column], value)
+            except ValueError as e:
+                raise ValueError(f'{column}: {e}') from None
+    return conformed
+
+class TableSnapshots:
+    """Binary columnar copies of the CSV tables for fast cold loads.
+
+    A snapshot file holds a JSON header (the CSV signature it was taken at,
+    row count, and per-column offsets) followed by one payload per column:
+    raw NumPy bytes for numeric, bool and datetime columns, the same plus a
+    packed missing-value bitmap for nullable (Int64, boolean) columns, and
+    for text and categorical columns the distinct values (NUL-separated
+    UTF-8) plus an int32 code per row, -1 for missing. A reader seeks to
+    just the columns it needs. A snapshot is only used while its signature
+    matches the CSV, which stays the source of truth.
+
+    Snapshots are written on a background thread from freshly parsed or
+    freshly appended (cached) tables; bursts of commits to a table coalesce
+    into one write.
+    """
+
+    MAGIC = b'HRSNAP2\n'
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._pending = {}  # path -> (df, signature), or None to take the cached table
+        self._cond = threading.Condition()
+        self._thread = None
+        self.reads = 0
+        self.writes = 0
+
+    def path(self, csv_file_path):
+        return os.path.join(self.folder, f'{table_name(csv_file_path)}.snap')
+
+    def read(self, csv_file_path, signature, columns=None):
+        """Load a fresh snapshot (optionally only some columns); None if missing or stale"""
+        try:
+            with open(self.path(csv_file_path), 'rb') as f:
+                if f.read(len(self.MAGIC)) != self.MAGIC:
+                    return None
+                header = json.loads(f.read(int.from_bytes(f.read(8), 'little')))
+                if header['source'] != list(signature):
+                    return None
+                base = f.tell()
+                rows = header['rows']
+                specs = header['columns']
+                if columns is not None:
+                    specs = [spec for spec in specs if spec['name'] in columns]
+                data = {}
+                for spec in specs:
+                    f.seek(base + spec['offset'])
+                    payload = f.read(spec['length'])
+                    if spec['kind'] == 'array':
+                        data[spec['name']] = pd.Series(np.frombuffer(payload, dtype=np.dtype(spec['dtype'])).copy())
+                        continue
+                    if spec['kind'] == 'masked':
+                        values = np.frombuffer(payload, dtype=np.dtype(spec['values_dtype']))
+                        missing = np.unpackbits(np.frombuffer(f.read(spec['mask_length']), dtype=np.uint8), count=rows)
+                        data[spec['name']] = pd.Series(values, dtype=spec['dtype']).mask(missing.astype(bool))
+                        continue
+                    uniques = payload.decode('utf-8').split('\x00') if spec['uniques'] else []
+                    codes = np.frombuffer(f.read(spec['codes_length']), dtype=np.int32)
+                    if spec['dtype'] == 'category':
+                        data[spec['name']] = pd.Series(pd.Categorical.from_codes(codes, uniques))
+                        continue
+                    values = np.array(uniques + [np.nan], dtype=object).take(codes)  # code -1 is missing
+                    data[spec['name']] = pd.Series(values, dtype=spec['dtype'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.error(f"Ignoring unreadable snapshot for {csv_file_path}: {e}")
+            return None
+        self.reads += 1
+        metrics.count('bytes_parsed', sum(spec['length'] + spec.get('mask_length', 0) + spec.get('codes_length', 0)
+                                          for spec in specs))
+        metrics.count('rows_scanned', rows)
+        return pd.DataFrame(data, index=pd.RangeIndex(rows), columns=[spec['name'] for spec in specs])
+
+    def write(self, csv_file_path, df, signature):
+        """Write a snapshot of df taken at the given CSV signature; False if a column cannot be encoded"""
+        specs = []
+        payloads = []
+        offset = 0
+        for col in df.columns:
+            series = df[col]
+            dtype = series.dtype
+            if isinstance(dtype, np.dtype) and dtype.kind in 'iufbM':
+                payload = np.ascontiguousarray(series.to_numpy()).tobytes()
+                spec = {'name': col, 'kind': 'array', 'dtype': dtype.str}
+                extra = b''
+            elif is_typed_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype):
+                values = np.ascontiguousarray(series.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+                payload = values.tobytes()
+                extra = np.packbits(series.isna().to_numpy()).tobytes()
+                spec = {'name': col, 'kind': 'masked', 'dtype': dtype.name,
+                        'values_dtype': values.dtype.str, 'mask_length': len(extra)}
+            else:
+                if isinstance(dtype, pd.CategoricalDtype):
+                    codes, uniques = series.cat.codes.to_numpy(), dtype.categories.to_numpy(dtype=object)
+                else:
+                    codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+                if pd.api.types.infer_dtype(uniques, skipna=True) not in ('string', 'empty'):
+                    return False
+                joined = '\x00'.join(uniques.tolist())
+                if joined.count('\x00') != max(len(uniques) - 1, 0):
+                    return False  # a cell contains the separator
+                payload = joined.encode('utf-8')
+                extra = codes.astype(np.int32).tobytes()
+                spec = {'name': col, 'kind': 'text', 'dtype': str(dtype),
+                        'uniques': len(uniques), 'codes_length': len(extra)}
+            spec.update(offset=offset, length=len(payload))
+            specs.append(spec)
+            payloads += [payload, extra]
+            offset += len(payload) + len(extra)
+        header = json.dumps({'source': list(signature), 'rows': len(df), 'columns': specs}).encode('utf-8')
+
+        target = self.path(csv_file_path)
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{table_name(csv_file_path)}.', suffix='.tmp', dir=self.folder)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.MAGIC)
+                f.write(len(header).to_bytes(8, 'little'))
+                f.write(header)
+                for payload in payloads:
+                    f.write(payload)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.writes += 1
+        metrics.count('bytes_written', len(self.MAGIC) + 8 + len(header) + offset)
+        return True
+
+    def schedule(self, csv_file_path, df=None, signature=None):
+        """Queue a snapshot write of df (or of the cached table) for the background thread"""
+        path = os.path.abspath(csv_file_path)
+        with self._cond:
+            self._pending[path] = None if df is None else (df.copy(deep=False), signature)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='table-snapshots', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                path, job = self._pending.popitem()
+            try:
+                if job is None:
+                    job = table_cache.current(path)
+                    if job is None:
+                        continue
+                    job = (job[1], job[0][:-1])  # drop the in-process write version
+                self.write(path, *job)
+            except Exception as e:
+                logging.error(f"Error writing snapshot for {path}: {e}")
+
+snapshots = TableSnapshots(SNAPSHOT_FOLDER)
+
+class CsvStorage:
+    """Tables stored as the CSV files in CSV_FOLDER"""
+
+    name = 'csv'
+
+    def exists(self, csv_file_path):
+        return os.path.exists(csv_file_path)
+
+    def signature(self, csv_file_path):
+        # Rewrites swap in a new file, so the inode changes even if mtime and size do not
+        st = os.stat(csv_file_path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def load(self, csv_file_path):
+        """Load a table from its snapshot when fresh, otherwise parse the CSV and snapshot it"""
+        signature = self.signature(csv_file_path)
+        df = snapshots.read(csv_file_path, signature)
+        if df is None:
+            df = self._parse(csv_file_path, table_name(csv_file_path))
+            snapshots.schedule(csv_file_path, df, signature)
+            return df
+        return apply_schema(table_name(csv_file_path), df)  # a no-op unless the schema changed
+
+    def load_columns(self, csv_file_path, columns):
+        """Read only the given columns from a fresh snapshot; None if there is none"""
+        df = snapshots.read(csv_file_path, self.signature(csv_file_path), columns)
+        return None if df is None else apply_schema(table_name(csv_file_path), df)
+
+    def iter_chunks(self, csv_file_path, columns, chunk_rows):
+        """The given columns as stored (text, empty cells missing), chunk_rows rows at a time, bypassing the cache"""
+        metrics.count('bytes_parsed', os.path.getsize(csv_file_path))
+        with pd.read_csv(csv_file_path, usecols=columns, dtype=str, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                metrics.count('rows_scanned', len(chunk))
+                yield chunk
+
+    @staticmethod
+    def _parse(source, table):
+        """read_csv, then the table's schema; declared non-numeric columns are parsed as text throughout"""
+        text = {col: 'str' for col, kind in TABLE_SCHEMAS.get(table, {}).items() if kind not in ('int', 'number', 'float')}
+        metrics.count('bytes_parsed', os.path.getsize(source) if isinstance(source, str) else len(source.getvalue()))
+        df = pd.read_csv(source, dtype=text)
+        metrics.count('rows_scanned', len(df))
+        return apply_schema(table, df)
+
+    def save(self, df, csv_file_path):
+        """Write the whole table to a temp file, fsync it and atomically rename it into place"""
+        tmp_path = self._write_temp(df, csv_file_path)
+        try:
+            os.replace(tmp_path, csv_file_path)
+            metrics.count('rows_written', len(df))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _write_temp(self, df, csv_file_path):
+        """Write the whole table to an fsync'd temp file next to it and return its path"""
+        folder = os.path.dirname(os.path.abspath(csv_file_path))
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{table_name(csv_file_path)}.', suffix='.tmp', dir=folder)
+        try:
+            with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+                plain_frame(df).to_csv(f, index=False)
+                f.flush()
+                os.fsync(f.fileno())
+                metrics.count('bytes_written', f.tell())
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def find(self, csv_file_path, conditions):
+        return match_rows(read_csv_safe(csv_file_path), conditions)
+
+    def columns(self, csv_file_path):
+        """Return the column names from the first line of a CSV file"""
+        if not os.path.exists(csv_file_path) or os.path.getsize(csv_file_path) == 0:
+            return []
+        with open(csv_file_path, newline='', encoding='utf-8') as f:
+            return next(csv.reader(f), [])
+
+    def append(self, rows, header, csv_file_path):
+        """Write rows to the end of the file using the existing header order"""
+        self._append_text(csv_file_path, header, self._append_text_for(rows, header), len(rows))
+
+    @staticmethod
+    def _append_text_for(rows, header):
+        buffer = io.StringIO()
+        pd.DataFrame(rows, columns=header, dtype=object).to_csv(buffer, header=False, index=False)
+        return buffer.getvalue()
+
+    def _append_text(self, csv_file_path, header, text, row_count, size=None):
+        """Append CSV lines to the file, first cutting it back to size if given (so a replay is idempotent)"""
+        payload = text.encode('utf-8')
+        before = table_cache.signature(csv_file_path)
+        with open(csv_file_path, 'rb+') as f:
+            if size is not None:
+                f.truncate(size)
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        after = table_cache.signature(csv_file_path)
+        metrics.count('bytes_written', len(payload))
+        metrics.count('rows_written', row_count)
+
+        # Parse just the appended lines so the cached table matches a fresh read
+        header_line = io.StringIO()
+        csv.writer(header_line).writerow(header)
+        appended_df = self._parse(io.StringIO(header_line.getvalue() + text), table_name(csv_file_path))
+        table_cache.extend(csv_file_path, appended_df, before, after)
+        snapshots.schedule(csv_file_path)
+
+    def apply_batch(self, csv_file_path, operations):
+        """Apply queued writes with one append, or one read-modify-write of the file"""
+        results, write = self._plan(csv_file_path, operations)
+        if write and write[0] == 'append':
+            self.append(write[1], write[2], csv_file_path)
+        elif write:
+            try:
+                self.save(write[1], csv_file_path)
+            finally:
+                table_cache.invalidate(csv_file_path)
+            self._recache(csv_file_path, write[1], write[2])
+        return results
+
+    def apply_unit(self, batches):
+        """Apply batches of writes to several tables all-or-nothing; returns each table's results.
+
+        Every table still gets a single write: its appended lines, or the
+        rewritten table staged as an fsync'd temp file. A journal of those
+        writes is fsync'd before any table is touched and removed once all
+        are done, so a crash in between is rolled forward by recover() before
+        the next commit.
+        """
+        results, writes, rewrites = {}, [], {}
+        try:
+            for csv_file_path, operations in batches.items():
+                results[csv_file_path], write = self._plan(csv_file_path, operations)
+                if any(result is False for result in results[csv_file_path]):
+                    raise ValueError(f'a write to {csv_file_path} does not apply')
+                if write and write[0] == 'append':
+                    writes.append({'path': csv_file_path, 'header': write[2], 'rows': len(write[1]),
+                                   'text': self._append_text_for(write[1], write[2]),
+                                   'size': os.path.getsize(csv_file_path)})
+                elif write:
+                    rewrites[csv_file_path] = write[1:]
+                    writes.append({'path': csv_file_path, 'rows': len(write[1]),
+                                   'signature': list(self.signature(csv_file_path)),
+                                   'temp': self._write_temp(write[1], csv_file_path)})
+            fd, journal_path = tempfile.mkstemp(prefix='unit-', suffix='.journal', dir=JOURNAL_FOLDER)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(writes, f)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            for write in writes:
+                if 'temp' in write and os.path.exists(write['temp']):
+                    os.remove(write['temp'])
+            raise
+        self._redo(writes)
+        os.remove(journal_path)
+        for csv_file_path, (df, updated) in rewrites.items():
+            self._recache(csv_file_path, df, updated)
+        return results
+
+    def _redo(self, writes, replay=False):
+        """Carry out the writes of a unit's journal; safe to repeat after a crash part-way.
+
+        On replay, a table that was changed by anything but the unit itself
+        since its journal was written is left alone rather than cut back or
+        replaced.
+        """
+        for write in writes:
+            if 'temp' in write:
+                if os.path.exists(write['temp']):  # otherwise renamed before the crash
+                    if replay and list(self.signature(write['path'])) != write.get('signature'):
+                        logging.error(f"Not replacing {write['path']} from an interrupted unit of work: it changed since")
+                        os.remove(write['temp'])
+                    else:
+                        os.replace(write['temp'], write['path'])
+                        metrics.count('rows_written', write['rows'])
+                table_cache.invalidate(write['path'])
+                continue
+            appended = self._appended(write) if replay else False
+            if appended is None:
+                logging.error(f"Not appending to {write['path']} from an interrupted unit of work: it changed since")
+            elif not appended:
+                self._append_text(write['path'], write['header'], write['text'], write['rows'], size=write['size'])
+
+    @staticmethod
+    def _appended(write):
+        """True if a journaled append is in its file, False if at most part of it is, None if other bytes follow"""
+        payload = write['text'].encode('utf-8')
+        with open(write['path'], 'rb') as f:
+            if f.seek(0, os.SEEK_END) < write['size']:
+                return None
+            if write['size'] > 0:
+                f.seek(write['size'] - 1)
+                if f.read(1) != b'\n':
+                    payload = b'\n' + payload
+            f.seek(write['size'])
+            tail = f.read()
+        if tail.startswith(payload):
+            return True
+        return False if payload.startswith(tail) else None
+
+    def recover(self):
+        """Roll forward the units of work a crash interrupted after their journal was written.
+
+        Called before every commit, so no other write can land on a table
+        between the crash and the replay.
+        """
+        if not any(entry.name.endswith('.journal') for entry in os.scandir(JOURNAL_FOLDER)):
+            return
+        with ExitStack() as stack:
+            for csv_file_path in sorted(os.path.join(CSV_FOLDER, f'{table}.csv') for table in TABLE_NAMES):
+                stack.enter_context(table_file_lock(csv_file_path))
+            stack.enter_context(journal_lock(exclusive=True))
+            for entry in sorted(os.scandir(JOURNAL_FOLDER), key=lambda e: e.stat().st_mtime_ns):
+                if not entry.name.endswith('.journal'):
+                    continue
+                try:
+                    with open(entry.path, encoding='utf-8') as f:
+                        writes = json.load(f)
+                except ValueError:
+                    os.remove(entry.path)  # torn while being written, so nothing was applied
+                    continue
+                logging.warning(f"Completing interrupted unit of work {entry.name} ({len(writes)} table(s))")
+                self._redo(writes, replay=True)
+                os.remove(entry.path)
+
+    def _plan(self, csv_file_path, operations):
+        """Results of a batch of writes and the single write that makes them.
+
+        The write is ('append', rows, header), ('rewrite', df, updated) or
+        None; updated is (table as read, columns changed) when the batch only
+        updated rows in place, so the cached table can be kept (see _recache).
+        """
+        header = self.columns(csv_file_path)
+        if header and all(op[0] == 'append' for op in operations):
+            rows = [row for op in operations for row in op[1]]
+            if all(col in header for row in rows for col in row):
+                return [True] * len(operations), ('append', rows, header)
+
+        # Updates, full replacements or a header migration: rewrite the file once, on plain values
+        typed = read_csv_safe(csv_file_path)
+        df = plain_frame(typed)
+        updated = set()  # None once rows are added or replaced
+        results = []
+        for op in operations:
+            if op[0] == 'append':
+                df = pd.concat([df, pd.DataFrame(op[1], dtype=object)], ignore_index=True)
+                updated = None
+            elif op[0] == 'replace':
+                df = plain_frame(op[1])
+                updated = None
+            elif op[0] == 'update_each':
+                key, column, changes = op[1:]
+                hit, new_values = update_each_hits(df, key, column, changes)
+                df.loc[hit, column] = new_values
+                results.append(df.loc[hit, key].tolist())
+                if updated is not None:
+                    updated.add(column)
+                continue
+            else:
+                conditions, values = op[1], op[2]
+                if df.empty or any(col not in df.columns for col in conditions):
+                    results.append(False)
+                    continue
+                mask = df.index.isin(match_rows(df, conditions).index)
+                for col, value in values.items():
+                    df.loc[mask, col] = value
+                if updated is not None:
+                    updated.update(values)
+            results.append(True)
+        if not any(results):
+            return results, None
+        return results, ('rewrite', df, None if updated is None else (typed, updated))
+
+    def _recache(self, csv_file_path, df, updated):
+        """Cache a table just rewritten by in-place updates without parsing it again.
+
+        The table as read is kept with only the updated columns converted
+        back from the written values, which gives what a fresh parse would.
+        Anything else (new columns, columns outside the schema or that do
+        not fit it) is left for the next read to parse.
+        """
+        if updated is None:
+            return
+        typed, columns = updated
+        table = table_name(csv_file_path)
+        if len(typed) != len(df) or any(col not in typed.columns or col not in TABLE_SCHEMAS.get(table, {}) for col in columns):
+            return
+        retyped = apply_schema(table, df[list(columns)])
+        if not all(is_typed_dtype(retyped[col].dtype) for col in columns):
+            return
+        table_cache.put(csv_file_path, typed.assign(**{col: retyped[col] for col in columns}),
+                        table_cache.signature(csv_file_path))
+        snapshots.schedule(csv_file_path)
+
+    def export_csv(self, csv_file_path):
+        with open(csv_file_path, 'rb') as f:
+            return f.read()
+
+class SqliteStorage:
+    """Tables stored in an embedded SQLite database.
+
+    Cells are kept as their CSV text so exports round-trip byte for byte;
+    id, candidate_id and requisition_id are INTEGER columns, and those plus
+    stage are indexed so single-row lookups and stage filters are seeks.
+    The numeric kind read_csv would infer for each column is tracked in
+    _column_kinds so partial results get the same dtypes as a full read.
+    Column names and kinds are cached per table and dropped whenever the
+    table's version moves, so a lookup costs one keyed read, not two.
+    """
+
+    name = 'sqlite'
+    INTEGER_COLUMNS = {'id', 'candidate_id', 'requisition_id'}
+    INDEXED_COLUMNS = ['id', 'candidate_id', 'requisition_id', 'stage']
+    KIND_ORDER = ['int', 'float', 'text']
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._metadata = {}
+
+    def connect(self):
+        """Per-thread connection in autocommit mode; writes use explicit transactions"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS _table_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS _column_kinds '
+                         '(name TEXT, column_name TEXT, kind TEXT NOT NULL, PRIMARY KEY (name, column_name))')
+            self._local.conn = conn
+        return conn
+
+    def exists(self, csv_file_path):
+        return bool(self.columns(csv_file_path))
+
+    def signature(self, csv_file_path):
+        row = self.connect().execute(
+            'SELECT version FROM _table_versions WHERE name = ?', (table_name(csv_file_path),)
+        ).fetchone()
+        return ('sqlite', row[0] if row else 0)
+
+    def columns(self, csv_file_path):
+        return self._table_metadata(table_name(csv_file_path))[0]
+
+    def load(self, csv_file_path):
+        table = table_name(csv_file_path)
+        cursor = self.connect().execute(f'SELECT * FROM "{table}" ORDER BY rowid')
+        return self._to_frame(cursor, table)
+
+    def load_columns(self, csv_file_path, columns):
+        """Select only the given columns; None if the table has none of them"""
+        table = table_name(csv_file_path)
+        selected = [col for col in self.columns(csv_file_path) if col in columns]
+        if not selected:
+            return None
+        quoted = ', '.join(f'"{col}"' for col in selected)
+        cursor = self.connect().execute(f'SELECT {quoted} FROM "{table}" ORDER BY rowid')
+        return self._to_frame(cursor, table)
+
+    def iter_chunks(self, csv_file_path, columns, chunk_rows):
+        """The given columns as stored, chunk_rows rows at a time from one cursor, bypassing the cache"""
+        quoted = ', '.join(f'"{col}"' for col in columns)
+        cursor = self.connect().execute(f'SELECT {quoted} FROM "{table_name(csv_file_path)}" ORDER BY rowid')
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                return
+            metrics.count('rows_scanned', len(rows))
+            yield pd.DataFrame.from_records(rows, columns=columns)
+
+    def find(self, csv_file_path, conditions):
+        table = table_name(csv_file_path)
+        columns = self.columns(csv_file_path)
+        if not columns or any(col not in columns for col in conditions):
+            return pd.DataFrame(columns=columns)
+        where = ' AND '.join(f'"{col}" = ?' for col in conditions)
+        cursor = self.connect().execute(
+            f'SELECT * FROM "{table}" WHERE {where} ORDER BY rowid',
+            [self._param(col, v) for col, v in conditions.items()]
+        )
+        return self._to_frame(cursor, table)
+
+    def save(self, df, csv_file_path):
+        self.replace_table(table_name(csv_file_path), list(df.columns), frame_to_text_rows(df))
+
+    def append(self, rows, header, csv_file_path):
+        table = table_name(csv_file_path)
+        columns = list(header)
+        text_rows = frame_to_text_rows(pd.DataFrame(rows, columns=columns, dtype=object))
+        with self.transaction() as conn:
+            existing = self.columns(csv_file_path)
+            for col in columns:
+                if col not in existing:
+                    conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}" {self._column_type(col)}')
+                    # Rows already present read back as empty in the new column
+                    if existing and conn.execute(f'SELECT 1 FROM "{table}" LIMIT 1').fetchone():
+                        self._merge_kinds(conn, table, [col], [(None,)])
+            placeholders = ', '.join('?' for _ in columns)
+            quoted = ', '.join(f'"{c}"' for c in columns)
+            conn.executemany(f'INSERT INTO "{table}" ({quoted}) VALUES ({placeholders})', text_rows)
+            metrics.count('rows_written', len(text_rows))
+            self._merge_kinds(conn, table, columns, text_rows)
+            self._bump_version(conn, table)
+
+    def update(self, csv_file_path, conditions, values):
+        columns = self.columns(csv_file_path)
+        if not columns or any(col not in columns for col in list(conditions) + list(values)):
+            return False
+        table = table_name(csv_file_path)
+        assignments = ', '.join(f'"{col}" = ?' for col in values)
+        where = ' AND '.join(f'"{col}" = ?' for col in conditions)
+        new_values = [self._param(c, v) for c, v in values.items()]
+        with self.transaction() as conn:
+            cursor = conn.execute(f'UPDATE "{table}" SET {assignments} WHERE {where}',
+                                  new_values + [self._param(c, v) for c, v in conditions.items()])
+            metrics.count('rows_written', cursor.rowcount)
+            self._merge_kinds(conn, table, list(values), [tuple(new_values)])
+            self._bump_version(conn, table)
+        return True
+
+    def update_each(self, csv_file_path, key, column, changes):
+        """Compare-and-set one column per key value in one transaction; returns the keys changed"""
+        columns = self.columns(csv_file_path)
+        if not columns or key not in columns or column not in columns:
+            return []
+        table = table_name(csv_file_path)
+        changed, new_values = [], []
+        with self.transaction() as conn:
+            for k, (old, new) in changes.items():
+                cursor = conn.execute(f'UPDATE "{table}" SET "{column}" = ? WHERE "{key}" = ? AND "{column}" = ?',
+                                      (self._param(column, new), self._param(key, k), self._param(column, old)))
+                if cursor.rowcount:
+                    changed.append(k)
+                    new_values.append((self._param(column, new),))
+            metrics.count('rows_written', len(changed))
+            if changed:
+                self._merge_kinds(conn, table, [column], new_values)
+                self._bump_version(conn, table)
+        return changed
+
+    def replace_table(self, table, columns, text_rows):
+        """Recreate a table with the given columns, rows and indexes in one transaction"""
+        with self.transaction() as conn:
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute('DELETE FROM _column_kinds WHERE name = ?', (table,))
+            column_defs = ', '.join(f'"{c}" {self._column_type(c)}' for c in columns)
+            conn.execute(f'CREATE TABLE "{table}" ({column_defs})')
+            placeholders = ', '.join('?' for _ in columns)
+            conn.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', text_rows)
+            metrics.count('rows_written', len(text_rows))
+            for col in self.INDEXED_COLUMNS:
+                if col in columns:
+                    conn.execute(f'CREATE INDEX "idx_{table}_{col}" ON "{table}" ("{col}")')
+            self._merge_kinds(conn, table, columns, text_rows)
+            self._bump_version(conn, table)
+
+    @contextmanager
+    def transaction(self):
+        """Run a write transaction that takes the database write lock up front.
+
+        Nested calls join the outer transaction, so a batch commits once.
+        """
+        conn = self.connect()
+        depth = getattr(self._local, 'depth', 0)
+        if depth:
+            self._local.depth = depth + 1
+            try:
+                yield conn
+            finally:
+                self._local.depth = depth
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+        finally:
+            self._local.depth = 0
+
+    def apply_batch(self, csv_file_path, operations):
+        """Apply queued writes inside a single transaction"""
+        results = []
+        with self.transaction():
+            for op in operations:
+                if op[0] == 'append':
+                    header = self.columns(csv_file_path)
+                    if not header:
+                        self.save(pd.DataFrame(op[1], dtype=object), csv_file_path)
+                    else:
+                        new_columns = [c for c in dict.fromkeys(k for row in op[1] for k in row) if c not in header]
+                        self.append(op[1], header + new_columns, csv_file_path)
+                    results.append(True)
+                elif op[0] == 'replace':
+                    self.save(op[1], csv_file_path)
+                    results.append(True)
+                elif op[0] == 'update_each':
+                    results.append(self.update_each(csv_file_path, *op[1:]))
+                else:
+                    results.append(self.update(csv_file_path, op[1], op[2]))
+        return results
+
+    def apply_unit(self, batches):
+        """Apply batches of writes to several tables in one transaction; returns each table's results"""
+        with self.transaction():
+            results = {}
+            for csv_file_path, operations in batches.items():
+                results[csv_file_path] = self.apply_batch(csv_file_path, operations)
+                if any(result is False for result in results[csv_file_path]):
+                    raise ValueError(f'a write to {csv_file_path} does not apply')
+        return results
+
+    def recover(self):
+        """Nothing to do: SQLite rolls back interrupted transactions itself"""
+
+    def export_csv(self, csv_file_path):
+        cursor = self.connect().execute(f'SELECT * FROM "{table_name(csv_file_path)}" ORDER BY rowid')
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator='\n')
+        writer.writerow([d[0] for d in cursor.description])
+        writer.writerows(cursor)
+        return output.getvalue().encode('utf-8')
+
+    def _column_type(self, col):
+        return 'INTEGER' if col in self.INTEGER_COLUMNS else 'TEXT'
+
+    def _param(self, col, value):
+        if col in self.INTEGER_COLUMNS:
+            return int(value)
+        return None if pd.isna(value) else str(value)
+
+    def _bump_version(self, conn, table):
+        conn.execute('INSERT INTO _table_versions (name, version) VALUES (?, 1) '
+                     'ON CONFLICT(name) DO UPDATE SET version = version + 1', (table,))
+
+    @staticmethod
+    def _cell_kind(value):
+        """Kind read_csv would give a single cell; empty cells force a float column"""
+        if value is None:
+            return 'float'
+        if isinstance(value, int):
+            return 'int'
+        if '_' in value:
+            return 'text'
+        try:
+            int(value)
+            return 'int'
+        except ValueError:
+            pass
+        try:
+            float(value)
+            return 'float'
+        except ValueError:
+            return 'text'
+
+    def _merge_kinds(self, conn, table, columns, text_rows):
+        known = dict(conn.execute('SELECT column_name, kind FROM _column_kinds WHERE name = ?', (table,)).fetchall())
+        rank = {k: i for i, k in enumerate(self.KIND_ORDER)}
+        for i, col in enumerate(columns):
+            kind = known.get(col, 'int')
+            for row in text_rows:
+                if kind == 'text':
+                    break
+                cell_kind = self._cell_kind(row[i])
+                if rank[cell_kind] > rank[kind]:
+                    kind = cell_kind
+            if kind != known.get(col):
+                conn.execute('INSERT OR REPLACE INTO _column_kinds (name, column_name, kind) VALUES (?, ?, ?)',
+                             (table, col, kind))
+
+    def _table_metadata(self, table):
+        """Column names and kinds of a table, reused until its version changes.
+
+        Reads inside a write transaction go to the database, since the
+        schema may be mid-change and the transaction may still roll back.
+        """
+        conn = self.connect()
+        in_transaction = getattr(self._local, 'depth', 0)
+        if not in_transaction:
+            row = conn.execute('SELECT version FROM _table_versions WHERE name = ?', (table,)).fetchone()
+            version = row[0] if row else 0
+            cached = self._metadata.get(table)
+            if cached and cached[0] == version:
+                return cached[1], cached[2]
+        columns = [r[1] for r in conn.execute(f'PRAGMA table_info("{table}")').fetchall()]
+        kinds = dict(conn.execute('SELECT column_name, kind FROM _column_kinds WHERE name = ?', (table,)).fetchall())
+        if not in_transaction:
+            self._metadata[table] = (version, columns, kinds)
+        return columns, kinds
+
+    def _to_frame(self, cursor, table):
+        """Build a DataFrame with the dtypes read_csv would give the whole table, then the table's schema"""
+        columns = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        metrics.count('rows_scanned', len(rows))
+        kinds = self._table_metadata(table)[1]
+        # Cells are parsed the way _cell_kind classified them, so the frame is built once with its final dtypes
+        data = {}
+        for col, cells in zip(columns, zip(*rows) if rows else [()] * len(columns)):
+            kind = kinds.get(col, 'text')
+            if kind == 'int':
+                data[col] = np.array([int(v) for v in cells], dtype='int64')
+            elif kind == 'float' or all(v is None for v in cells):
+                data[col] = np.array([np.nan if v is None else float(v) for v in cells], dtype='float64')
+            else:
+                data[col] = list(cells)
+        return apply_schema(table, pd.DataFrame(data, columns=columns))
+
+def table_signature(table):
+    """Cache validity key of a table by name, or None if it cannot be read"""
+    try:
+        return table_cache.signature(os.path.join(CSV_FOLDER, f'{table}.csv'))
+    except (OSError, sqlite3.Error):
+        return None
+
+class TableSource:
+    """The tables as the views in table_views.py and analytics.py read them"""
+
+    @staticmethod
+    def read(table, columns=None):
+        return read_csv_safe(os.path.join(CSV_FOLDER, f'{table}.csv'), columns=columns)
+
+    def records(self, table, columns):
+        """Plain record dicts of the given columns (those the table has)"""
+        df = self.read(table, columns)
+        return to_records(df[[col for col in columns if col in df.columns]])
+
+    @staticmethod
+    def rows(csv_file_path, columns):
+        """A table's rows to take old values from: the cached table, else only the columns needed"""
+        current = table_cache.current(csv_file_path)
+        return current[1] if current else read_csv_safe(csv_file_path, columns=columns)
+
+    signature = staticmethod(table_signature)
+    name = staticmethod(table_name)
+    match = staticmethod(match_rows)
+    update_each_hits = staticmethod(update_each_hits)
+
+table_source = TableSource()
+dashboard_stats = DashboardStats(table_source)
+search_index = SearchIndex(table_source, SEARCH_FIELDS)
+pipeline_analytics = PipelineAnalytics(table_source)
+
+@contextmanager
+def table_file_lock(csv_file_path):
+    """Exclusive OS lock on a table's lock file, shared by every worker process"""
+    lock_path = os.path.join(LOCK_FOLDER, f'{table_name(csv_file_path)}.lock')
+    with open(lock_path, 'a') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+@contextmanager
+def journal_lock(exclusive=False):
+    """OS lock on the unit-of-work journals: shared while a unit commits, exclusive to recover"""
+    with open(os.path.join(LOCK_FOLDER, 'journal.lock'), 'a') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+class WriteCoordinator:
+    """Serializes writers per table and commits writes that arrive together as one group.
+
+    Writers queue an operation for their table. The first one to take the
+    table's commit lock becomes the leader: it waits GROUP_COMMIT_WINDOW_MS
+    for more writes, takes the OS file lock (so other gunicorn workers are
+    excluded) and applies the whole queue with a single fsync'd write.
+    Writers whose operation was committed by a leader just return its result.
+    """
+
+    def __init__(self, window_seconds, views=()):
+        self.window_seconds = window_seconds
+        self.views = list(views)  # kept current from each commit's delta (see DashboardStats)
+        self._tables = {}
+        self._tables_lock = threading.Lock()
+        self.commits = 0
+        self.operations = 0
+
+    def _state(self, csv_file_path):
+        path = os.path.abspath(csv_file_path)
+        with self._tables_lock:
+            if path not in self._tables:
+                self._tables[path] = {'queue_lock': threading.Lock(), 'commit_lock': threading.Lock(), 'pending': []}
+            return self._tables[path]
+
+    def submit(self, csv_file_path, operation):
+        """Queue one write operation and return its result once it is committed"""
+        metrics.count('table_writes')
+        state = self._state(csv_file_path)
+        write = {'operation': operation, 'done': False, 'result': False}
+        with state['queue_lock']:
+            state['pending'].append(write)
+        with state['commit_lock']:
+            if not write['done']:
+                if self.window_seconds:
+                    time.sleep(self.window_seconds)
+                with state['queue_lock']:
+                    batch, state['pending'] = state['pending'], []
+                self._commit(csv_file_path, batch)
+        return write['result']
+
+    def submit_unit(self, batches):
+        """Commit writes to several tables together: all of them or none.
+
+        batches maps each table's path to its operations. Commit locks and
+        OS locks are taken in path order, so units and single-table writes
+        cannot deadlock. Returns each table's results, all False if the unit
+        was not applied.
+        """
+        paths = sorted(batches, key=os.path.abspath)
+        metrics.count('table_writes', len(paths))
+        storage.recover()
+        with ExitStack() as stack:
+            for csv_file_path in paths:
+                stack.enter_context(self._state(csv_file_path)['commit_lock'])
+            for csv_file_path in paths:
+                stack.enter_context(table_file_lock(csv_file_path))
+            before = {path: table_signature(table_name(path)) for path in paths}
+            deltas = {path: self._view_deltas(path, batches[path]) for path in paths}
+            try:
+                with journal_lock():
+                    results = storage.apply_unit({path: batches[path] for path in paths})
+            except Exception as e:
+                logging.error(f"Error committing unit of work on {', '.join(table_name(p) for p in paths)}: {e}")
+                results = {path: [False] * len(batches[path]) for path in paths}
+                for path in paths:
+                    table_cache.invalidate(path)
+                    deltas[path] = [None] * len(self.views)
+            for path in paths:
+                after = table_signature(table_name(path))
+                for view, delta in zip(self.views, deltas[path]):
+                    view.commit(path, delta, results[path], before[path], after)
+        self.commits += 1
+        self.operations += sum(len(operations) for operations in batches.values())
+        return results
+
+    def _view_deltas(self, csv_file_path, operations):
+        deltas = []
+        for view in self.views:
+            try:
+                deltas.append(view.delta(csv_file_path, operations))
+            except Exception as e:
+                logging.error(f"Error computing {type(view).__name__} deltas for {csv_file_path}: {e}")
+                deltas.append(None)
+        return deltas
+
+    def _commit(self, csv_file_path, batch):
+        operations = [w['operation'] for w in batch]
+        storage.recover()
+        with table_file_lock(csv_file_path):
+            before = table_signature(table_name(csv_file_path))
+            deltas = self._view_deltas(csv_file_path, operations)
+            try:
+                results = storage.apply_batch(csv_file_path, operations)
+            except Exception as e:
+                logging.error(f"Error committing {len(batch)} write(s) to {csv_file_path}: {e}")
+                table_cache.invalidate(csv_file_path)
+                deltas = [None] * len(self.views)  # the failed attempt may have been partly applied
+                if len(batch) == 1:
+                    results = [False]
+                else:
+                    # Retry one by one so a single bad write does not fail its neighbours
+                    results = []
+                    for w in batch:
+                        try:
+                            results += storage.apply_batch(csv_file_path, [w['operation']])
+                        except Exception as e:
+                            logging.error(f"Error writing to {csv_file_path}: {e}")
+                            table_cache.invalidate(csv_file_path)
+                            results.append(False)
+            after = table_signature(table_name(csv_file_path))
+            for view, delta in zip(self.views, deltas):
+                view.commit(csv_file_path, delta, results, before, after)
+        self.commits += 1
+        self.operations += len(batch)
+        for w, result in zip(batch, results):
+            w['result'] = result
+            w['done'] = True
+
+write_coordinator = WriteCoordinator(GROUP_COMMIT_WINDOW_MS / 1000.0, [dashboard_stats, search_index])
+
+def create_storage(backend):
+    if backend == 'sqlite':
+        return SqliteStorage(SQLITE_PATH)
+    return CsvStorage()
+
+storage = create_storage(STORAGE_BACKEND)
+
+class BlobStore:
+    """Content-addressed store for uploaded files.
+
+    Each distinct file body is stored once under BLOB_FOLDER, named by its
+    SHA-256. The unique names recorded in the CSVs are mapped to blobs by an
+    append-only log (one "<digest> <name>" line per reference, "- <name>"
+    when one is released), so re-uploading the same resume or offer letter
+    adds a reference instead of another copy on disk. Each process keeps the
+    references in memory and reads only the lines appended since it last
+    looked; the log is compacted once most of its lines are superseded.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.log_path = os.path.join(folder, 'refs.log')
+        self.lock_path = os.path.join(LOCK_FOLDER, 'uploads.lock')
+        self._lock = threading.RLock()
+        self._refs = {}  # name -> digest
+        self._counts = {}  # digest -> references
+        self._position = None  # (inode, offset) of the log read so far
+        self._lines = 0
+        self._import_manifest()
+
+    def blob_path(self, digest):
+        return os.path.join(self.folder, digest[:2], digest)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, open(self.lock_path, 'a') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self._load()
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self):
+        """Bring the references up to date with the log, reading only what was appended since the last call"""
+        with self._lock:
+            try:
+                st = os.stat(self.log_path)
+            except FileNotFoundError:
+                return self._refs
+            inode, offset = self._position or (None, 0)
+            if inode != st.st_ino or st.st_size < offset:  # compacted by another worker
+                self._refs, self._counts, self._lines, offset = {}, {}, 0, 0
+            if st.st_size > offset:
+                with open(self.log_path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read(st.st_size - offset)
+                data = data[:data.rfind(b'\n') + 1]  # a line still being written is read next time
+                for line in data.decode('utf-8').splitlines():
+                    self._apply(*line.partition(' ')[::2])
+                offset += len(data)
+            self._position = (st.st_ino, offset)
+            return self._refs
+
+    def _apply(self, digest, name):
+        if not name or (digest != '-' and not self.DIGEST_PATTERN.match(digest)):
+            return  # the torn tail of a crashed write
+        self._lines += 1
+        previous = self._refs.pop(name, None)
+        if previous:
+            self._counts[previous] -= 1
+            if not self._counts[previous]:
+                del self._counts[previous]
+        if digest != '-':
+            self._refs[name] = digest
+            self._counts[digest] = self._counts.get(digest, 0) + 1
+
+    def _record(self, name, digest):
+        """Append one reference change to the log (digest None releases name); caller holds _locked"""
+        with open(self.log_path, 'ab') as f:
+            if f.seek(0, os.SEEK_END) > (self._position[1] if self._position else 0):
+                f.write(b'\n')  # end a torn line so this one parses
+            f.write(f"{digest or '-'} {name}\n".encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        self._load()
+        if self._lines > 2 * len(self._refs) + 1000:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the log as one line per live reference; caller holds _locked"""
+        fd, tmp_path = tempfile.mkstemp(prefix='.refs.', suffix='.tmp', dir=self.folder)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.writelines(f'{digest} {name}\n' for name, digest in self._refs.items())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.log_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._position = None
+        self._load()
+
+    def _import_manifest(self):
+        """Move references from the refs.json manifest of earlier versions into the log"""
+        manifest_path = os.path.join(self.folder, 'refs.json')
+        if not os.path.exists(manifest_path):
+            return
+        with self._locked():
+            if not os.path.exists(manifest_path):
+                return
+            with open(manifest_path, encoding='utf-8') as f:
+                refs = json.load(f)['refs']
+            for name, digest in refs.items():
+                if name not in self._refs:
+                    self._apply(digest, name)
+            self._compact()
+            os.remove(manifest_path)
+
+    def _link(self, tmp_path, digest, name):
+        """Reference a blob under name, moving tmp_path into place only if the blob is new"""
+        with self._locked():
+            target = self.blob_path(digest)
+            if os.path.exists(target):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(tmp_path, 'rb') as f:
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, target)
+            previous = self._refs.get(name)
+            if previous != digest:
+                self._record(name, digest)
+                if previous:
+                    self._remove_unreferenced(previous)
+        return digest
+
+    def _remove_unreferenced(self, digest):
+        if not self._counts.get(digest) and os.path.exists(self.blob_path(digest)):
+            os.remove(self.blob_path(digest))
+
+    def put(self, stream, name):
+        """Hash a file while streaming it to disk and store it under name"""
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(prefix='.upload.', suffix='.tmp', dir=self.folder)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: stream.read(self.CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+            return self._link(tmp_path, digest.hexdigest(), name)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def adopt(self, file_path, name):
+        """Move an existing plain upload into the store, dropping it if it is a duplicate"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return self._link(file_path, digest.hexdigest(), name)
+
+    def release(self, name):
+        """Drop a reference, deleting the blob once nothing refers to it"""
+        if not name:
+            return
+        with self._locked():
+            digest = self._refs.get(name)
+            if digest:
+                self._record(name, None)
+                self._remove_unreferenced(digest)
+
+    def names(self):
+        return list(self._load())
+
+    def digest(self, name):
+        return self._load().get(name)
+
+    def path(self, name):
+        digest = self.digest(name)
+        return self.blob_path(digest) if digest else None
+
+    def stats(self):
+        with self._lock:
+            self._load()
+            return {'references': len(self._refs), 'blobs': len(self._counts)}
+
+blob_store = BlobStore(BLOB_FOLDER)
+
+def save_upload(file):
+    """Store an uploaded file and return the unique name recorded in the CSVs"""
+    unique_name = f"{uuid.uuid4()}_{secure_filename(file.filename)}"
+    blob_store.put(file.stream, unique_name)
+    return unique_name
+
+def upload_path(filename):
+    """Absolute disk path of an uploaded file; names from before the blob store live in UPLOAD_FOLDER.
+
+    Absolute because send_file resolves relative paths against the app's
+    root folder rather than the working directory the data folders are in.
+    """
+    return os.path.abspath(blob_store.path(filename) or os.path.join(UPLOAD_FOLDER, filename))
+
+def send_upload(filename, **kwargs):
+    """send_file for an uploaded file, keeping its recorded name as the download name.
+
+    Files in the blob store are validated by their content digest. Uploads
+    are personal documents, so only the browser may cache them, and it
+    revalidates on every use (a conditional request is answered with 304).
+
+    Served from the app, Range requests get 206 partial content and whole
+    files go through the server's wsgi.file_wrapper (sendfile) when it has
+    one. With UPLOAD_OFFLOAD set, the response carries only headers and the
+    web server in front sends the file, Range and revalidation included,
+    so the worker is released at once.
+    """
+    path = upload_path(filename)
+    accel_path = os.path.relpath(path, os.path.abspath(UPLOAD_FOLDER)).replace(os.sep, '/')
+    offload = UPLOAD_OFFLOAD == 'x-sendfile' or (UPLOAD_OFFLOAD == 'x-accel' and not accel_path.startswith('../'))
+    response = werkzeug.utils.send_file(path, request.environ, download_name=filename,
+                                        etag=blob_store.digest(filename) or True, conditional=not offload,
+                                        use_x_sendfile=offload, response_class=app.response_class, **kwargs)
+    if offload:
+        if UPLOAD_OFFLOAD == 'x-accel':
+            del response.headers['X-Sendfile']
+            response.headers['X-Accel-Redirect'] = UPLOAD_ACCEL_PREFIX.rstrip('/') + '/' + quote(accel_path)
+    response.cache_control.private = True
+    return response
+
+def resume_text_path(filename):
+    """Cache file for a resume's extracted text; keyed by blob digest so identical uploads share it"""
+    digest = blob_store.digest(filename)
+    return os.path.join(RESUME_TEXT_FOLDER, f'{digest or secure_filename(filename)}.txt')
+
+def read_resume_text(filename):
+    """Extracted text of an uploaded resume, or '' if there is none (yet)"""
+    if not isinstance(filename, str) or not filename:
+        return ''
+    try:
+        with open(resume_text_path(filename), encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return ''
+
+search_index.sources['resume_filename'] = read_resume_text
+
+def extraction_pool(workers):
+    # Spawned workers do not inherit the server's threads and locks; the jobs they run
+    # live in resume_text, so a worker imports that module rather than this one
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+class ResumeTextExtractor:
+    """Extracts text from uploaded resumes on a bounded process pool.
+
+    Request threads only queue a job. When a job finishes, candidates that
+    use the file are re-indexed so the resume text becomes searchable. Once
+    max_pending jobs are queued, new ones are dropped and left for the
+    extract-resumes backfill.
+    """
+
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(self, filename):
+        """Queue text extraction for an uploaded file unless its text is already cached"""
+        if not filename or os.path.exists(resume_text_path(filename)):
+            return None
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.dropped += 1
+                return None
+            if self._executor is None:
+                self._executor = extraction_pool(self.workers)
+            self.pending += 1
+        try:
+            future = self._executor.submit(extract_resume_to_cache, upload_path(filename), filename,
+                                           resume_text_path(filename))
+        except Exception as e:
+            logging.error(f"Error queueing text extraction for {filename}: {e}")
+            with self._lock:
+                self.pending -= 1
+                self.failed += 1
+            return None
+        future.add_done_callback(lambda f: self._done(filename, f))
+        return future
+
+    def _done(self, filename, future):
+        with self._lock:
+            self.pending -= 1
+        try:
+            future.result()
+        except Exception as e:
+            logging.error(f"Error extracting text from {filename}: {e}")
+            with self._lock:
+                self.failed += 1
+            return
+        with self._lock:
+            self.completed += 1
+        rows = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), resume_filename=filename)
+        search_index.reindex('candidates', to_records(rows))
+
+    def stats(self):
+        with self._lock:
+            return {'pending': self.pending, 'completed': self.completed, 'failed': self.failed, 'dropped': self.dropped}
 
-app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET", "hr-system-secret-key")
+resume_extractor = ResumeTextExtractor(RESUME_EXTRACT_WORKERS, RESUME_EXTRACT_MAX_PENDING)
 
-# Configuration
-UPLOAD_FOLDER = 'uploads'
-CSV_FOLDER = 'csv_templates'
-ALLOWED_EXTENSIONS = {'txt', 'pdf', 'doc', 'docx', 'csv'}
+class JobQueueFull(Exception):
+    """Raised when JOB_MAX_PENDING jobs are already queued or running"""
 
-# Ensure directories exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(CSV_FOLDER, exist_ok=True)
+class Job:
+    """State of one background job, persisted as JSON; the function it runs reports progress through it"""
+
+    PROGRESS_INTERVAL = 0.5  # seconds between progress writes
+
+    def __init__(self, folder, kind):
+        self.folder = folder
+        self.id = uuid.uuid4().hex
+        self.state = {'id': self.id, 'kind': kind, 'status': 'queued', 'owner': JobQueue.owner(),
+                      'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'started': None, 'finished': None,
+                      'progress': {'done': 0, 'total': None, 'message': ''}, 'result': None, 'error': None}
+        self._saved_at = 0
+
+    def path(self, name):
+        """Path of a file the job produces, in its own folder"""
+        folder = os.path.join(self.folder, self.id)
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, name)
+
+    def progress(self, done, total=None, message=None):
+        """Record progress; written out at most every PROGRESS_INTERVAL seconds"""
+        self.state['progress'].update(done=done, **{k: v for k, v in (('total', total), ('message', message)) if v is not None})
+        if time.monotonic() - self._saved_at >= self.PROGRESS_INTERVAL:
+            self.save()
+
+    def update(self, **changes):
+        self.state.update(changes)
+        self.save()
+
+    def save(self):
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{self.id}.', suffix='.tmp', dir=self.folder)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, os.path.join(self.folder, f'{self.id}.json'))
+        self._saved_at = time.monotonic()
+
+class JobQueue:
+    """Runs heavy operations in the background on a bounded thread pool.
+
+    Routes submit a function and answer at once with the job id. Each job's
+    status, progress, result and error are kept as a JSON file in
+    JOB_FOLDER, so /jobs/<id> can be answered by any worker process. Jobs run
+    in the process that queued them; a job whose process has gone is
+    reported as failed. With no workers, jobs run inline in the request.
+    """
+
+    _token = uuid.uuid4().hex  # tells this process apart from an earlier one that had the same pid
+
+    def __init__(self, folder, workers, max_pending):
+        self.folder = folder
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self._pruned_at = None
+
+    @classmethod
+    def owner(cls):
+        return f'{os.getpid()}:{cls._token}'
+
+    def submit(self, kind, func, *args):
+        """Queue func(job, *args) and return the job id; its return value becomes the job's result.
+
+        Raises JobQueueFull when max_pending jobs are already waiting or running.
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise JobQueueFull(f'{self.pending} jobs are already queued')
+            self.pending += 1
+            prune = self._pruned_at is None or time.monotonic() - self._pruned_at >= JOB_PRUNE_INTERVAL
+            if prune:
+                self._pruned_at = time.monotonic()
+        if prune:
+            self.prune()
+        job = Job(self.folder, kind)
+        try:
+            job.save()
+            if not self.workers:
+                self._run(job, func, args)
+            else:
+                with self._lock:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+                self._executor.submit(self._run, job, func, args)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+        return job.id
+
+    def _run(self, job, func, args):
+        job.update(status='running', started=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        try:
+            result = func(job, *args)
+        except Exception as e:
+            logging.error(f"Job {job.id} ({job.state['kind']}) failed: {e}")
+            changes, counter = {'status': 'failed', 'error': str(e)}, 'failed'
+        else:
+            changes, counter = {'status': 'done', 'result': result}, 'completed'
+        try:
+            job.update(finished=datetime.now().strftime('%Y-%m-%d %H:%M:%S'), **changes)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, job_id):
+        """A job's state, or None if there is no such job"""
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        try:
+            with open(os.path.join(self.folder, f'{job_id}.json'), encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state['status'] in ('queued', 'running') and not self._owner_alive(state['owner']):
+            state.update(status='failed', error='Interrupted: the process running the job has exited')
+        return state
+
+    def result_path(self, job_id, name):
+        """Path of a file a finished job produced, or None"""
+        state = self.get(job_id)
+        if not state or state['status'] != 'done' or name != os.path.basename(name):
+            return None
+        path = os.path.join(self.folder, job_id, name)
+        return path if os.path.exists(path) else None
+
+    def _owner_alive(self, owner):
+        pid, token = owner.split(':')
+        if int(pid) == os.getpid():
+            return token == self._token
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def prune(self):
+        """Delete the records and files of jobs that finished more than JOB_RETENTION_SECONDS ago.
+
+        Spooled uploads and temp files as old as that were left by a process
+        that exited mid-job, and go too.
+        """
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for entry in os.scandir(self.folder):
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+                if entry.name.endswith('.json'):
+                    state = self.get(entry.name[:-5])
+                    if state and state['status'] in ('done', 'failed'):
+                        shutil.rmtree(os.path.join(self.folder, state['id']), ignore_errors=True)
+                        os.remove(entry.path)
+                elif entry.is_file():
+                    os.remove(entry.path)
+            except OSError as e:
+                logging.error(f"Error pruning job file {entry.name}: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {'pending': self.pending, 'completed': self.completed, 'failed': self.failed}
+
+job_queue = JobQueue(JOB_FOLDER, JOB_WORKERS, JOB_MAX_PENDING)
+
+class OfferLetterCache:
+    """Rendered offer letters, keyed by offer id and a hash of the rows they show.
+
+    The hash covers the candidate and offer records passed to the template
+    and PAGE_VERSION, so a letter is rendered again only after its offer or
+    candidate row (or the code and templates) changed; the stale letter is
+    replaced. At most max_entries letters are kept, least recently used
+    first out.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._letters = OrderedDict()  # offer id -> (content hash, html)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(candidate, offer):
+        return hashlib.sha1(json.dumps([PAGE_VERSION, candidate, offer], sort_keys=True, default=str).encode()).hexdigest()
+
+    def render(self, candidate, offer):
+        """HTML of the offer letter for a candidate and offer record, rendered only if not cached"""
+        key = offer.get('id', f"candidate-{candidate.get('id')}")
+        digest = self.content_hash(candidate, offer)
+        with self._lock:
+            entry = self._letters.get(key)
+            if entry and entry[0] == digest:
+                self._letters.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        html = render_template('offer_letter.html', candidate=candidate, offer=offer)
+        with self._lock:
+            self._letters[key] = (digest, html)
+            self._letters.move_to_end(key)
+            while len(self._letters) > self.max_entries:
+                self._letters.popitem(last=False)
+        return html
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._letters), 'hits': self.hits, 'misses': self.misses}
+
+offer_letters = OfferLetterCache(OFFER_LETTER_CACHE_ENTRIES)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def max_existing_id(csv_file_path):
+    """Highest ID currently stored in a table (0 when empty)"""
+    df = read_csv_safe(csv_file_path, columns=['id'])
+    if df.empty or 'id' not in df.columns:
+        return 0
+    max_id = pd.to_numeric(df['id'], errors='coerce').max()
+    return 0 if pd.isna(max_id) else int(max_id)
+
+_sequence_lock = threading.Lock()
+
+def _advance_sequence(csv_file_path, advance):
+    """Replace a table's last issued ID with advance(last_id) under the sequence lock; returns (old, new).
+
+    The counter is persisted per table in SEQUENCE_FOLDER under an
+    exclusive file lock, so gunicorn workers never hand out the same ID.
+    A missing sequence file is seeded once from the table's highest ID.
+    """
+    table = os.path.splitext(os.path.basename(csv_file_path))[0]
+    seq_path = os.path.join(SEQUENCE_FOLDER, f'{table}.seq')
+    with _sequence_lock, open(seq_path, 'a+') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            content = f.read().strip()
+            last_id = int(content) if content else max_existing_id(csv_file_path)
+            new_id = advance(last_id)
+            if new_id != last_id or not content:
+                f.seek(0)
+                f.truncate()
+                f.write(str(new_id))
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    return last_id, new_id
+
+def reserve_ids(csv_file_path, count=1):
+    """Reserve a block of consecutive IDs for a table and return them as a range"""
+    last_id, _ = _advance_sequence(csv_file_path, lambda last: last + count)
+    return range(last_id + 1, last_id + count + 1)
+
+def reseed_ids(csv_file_path, floor=None):
+    """Raise a table's ID sequence to at least floor (default: the table's highest ID).
+
+    Run after a table is restored, edited by hand or imported, since
+    reserve_ids only consults the table when the sequence file is missing.
+    """
+    if floor is None:
+        floor = max_existing_id(csv_file_path)
+    return _advance_sequence(csv_file_path, lambda last: max(last, floor))[1]
+
 def get_next_id(csv_file_path):
     """Get the next available ID for a CSV file"""
     try:
-        if os.path.exists(csv_file_path):
-            df = pd.read_csv(csv_file_path)
-            if not df.empty and 'id' in df.columns:
-                return df['id'].max() + 1
-        return 1
+        return reserve_ids(csv_file_path)[0]
     except Exception as e:
         logging.error(f"Error getting next ID: {e}")
-        return 1
+        return max_existing_id(csv_file_path) + 1
 
-def read_csv_safe(csv_file_path):
-    """Safely read CSV file"""
+def read_csv_safe(csv_file_path, columns=None):
+    """Safely read CSV file, serving repeat reads from the table cache.
+
+    With columns, only those columns are returned; if the table is not
+    cached they are read on their own (from the snapshot in CSV mode)
+    instead of loading the whole table.
+    """
+    metrics.count('table_reads')
+    if columns is not None:
+        columns = list(dict.fromkeys(columns))
     try:
-        if os.path.exists(csv_file_path):
-            return pd.read_csv(csv_file_path)
+        if storage.exists(csv_file_path):
+            cached = table_cache.get(csv_file_path)
+            if cached is None and columns is not None:
+                projected = storage.load_columns(csv_file_path, columns)
+                if projected is not None:
+                    return projected
+            if cached is None:
+                signature = table_cache.signature(csv_file_path)
+                df = storage.load(csv_file_path)
+                table_cache.put(csv_file_path, df, signature)
+                cached = df.copy(deep=False)
+            if columns is not None:
+                return cached[[col for col in columns if col in cached.columns]]
+            return cached
         return pd.DataFrame()
     except Exception as e:
         logging.error(f"Error reading CSV {csv_file_path}: {e}")
@@ -50,70 +2531,277 @@ def read_csv_safe(csv_file_path):
 
 def write_csv_safe(df, csv_file_path):
     """Safely write CSV file"""
-    try:
-        df.to_csv(csv_file_path, index=False)
+    return write_coordinator.submit(csv_file_path, ('replace', df))
+
+def append_rows_to_csv(rows, csv_file_path):
+    """Append rows to the end of a table without rewriting existing data.
+
+    The file is only rewritten when the rows bring columns the header does
+    not have yet (a one-off header migration). Rows are checked against the
+    table's schema first; if any value does not fit, nothing is written.
+    """
+    if not rows:
         return True
-    except Exception as e:
-        logging.error(f"Error writing CSV {csv_file_path}: {e}")
+    try:
+        rows = [conform_row(table_name(csv_file_path), row) for row in rows]
+    except ValueError as e:
+        logging.error(f"Rejected write to {csv_file_path}: {e}")
         return False
+    return write_coordinator.submit(csv_file_path, ('append', rows))
 
-def append_to_csv(data, csv_file_path):
-    """Append data to CSV file"""
+def find_rows(csv_file_path, **conditions):
+    """Return the rows of a table whose columns equal the given values.
+
+    Uses the cached table in CSV mode. In SQLite mode a current cached table
+    is filtered too, and the indexes are used only when none is cached.
+    """
     try:
-        df = read_csv_safe(csv_file_path)
-        new_row = pd.DataFrame([data])
-        df = pd.concat([df, new_row], ignore_index=True)
-        return write_csv_safe(df, csv_file_path)
+        if storage.name == 'sqlite':
+            cached = table_cache.current(csv_file_path)
+            if cached is not None:
+                return match_rows(cached[1], conditions)
+        return storage.find(csv_file_path, conditions)
     except Exception as e:
-        logging.error(f"Error appending to CSV {csv_file_path}: {e}")
+        logging.error(f"Error querying {csv_file_path}: {e}")
+        return pd.DataFrame()
+
+def update_rows(csv_file_path, conditions, values):
+    """Set column values on the rows matching the given conditions"""
+    try:
+        values = conform_row(table_name(csv_file_path), values)
+    except ValueError as e:
+        logging.error(f"Rejected update of {csv_file_path}: {e}")
         return False
+    return write_coordinator.submit(csv_file_path, ('update', conditions, values))
+
+def append_to_csv(data, csv_file_path):
+    """Append a single row to CSV file"""
+    return append_rows_to_csv([data], csv_file_path)
 
 def update_candidate_stage(candidate_id, new_stage):
     """Update candidate's stage in candidates.csv"""
+    return update_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), {'id': int(candidate_id)}, {'stage': new_stage})
+
+class UnitOfWork:
+    """Writes to several tables staged together and committed all-or-nothing.
+
+    Used where one submission touches more than one table, e.g. a screening
+    row and the candidate's new stage:
+
+        unit = UnitOfWork()
+        unit.append(screening_data, screening_path)
+        unit.update_candidate_stage(candidate_id, 'Screening')
+        if unit.commit(): ...
+
+    Rows are checked against the schemas as they are staged; a rejected one
+    makes commit() write nothing and return False.
+    """
+
+    def __init__(self):
+        self.batches = {}
+        self.rejected = False
+
+    def append(self, data, csv_file_path):
+        """Stage a row to append (see append_to_csv)"""
+        try:
+            row = conform_row(table_name(csv_file_path), data)
+        except ValueError as e:
+            logging.error(f"Rejected write to {csv_file_path}: {e}")
+            self.rejected = True
+            return
+        self.batches.setdefault(csv_file_path, []).append(('append', [row]))
+
+    def update(self, csv_file_path, conditions, values):
+        """Stage setting column values on the matching rows (see update_rows)"""
+        try:
+            values = conform_row(table_name(csv_file_path), values)
+        except ValueError as e:
+            logging.error(f"Rejected update of {csv_file_path}: {e}")
+            self.rejected = True
+            return
+        self.batches.setdefault(csv_file_path, []).append(('update', conditions, values))
+
+    def update_candidate_stage(self, candidate_id, new_stage):
+        """Stage a candidate's move to a new stage (see update_candidate_stage)"""
+        self.update(os.path.join(CSV_FOLDER, 'candidates.csv'), {'id': int(candidate_id)}, {'stage': new_stage})
+
+    def commit(self):
+        """Apply every staged write, or none; True if they were all applied"""
+        if self.rejected:
+            return False
+        if not self.batches:
+            return True
+        results = write_coordinator.submit_unit(self.batches)
+        return all(result is not False for table_results in results.values() for result in table_results)
+
+def transition_candidates(moves):
+    """Move many candidates to new pipeline stages with a single write.
+
+    moves is a list of (candidate_id, new_stage) pairs. Each is checked
+    against STAGE_TRANSITIONS from the candidate's current stage, and the
+    valid ones are applied together as one compare-and-set, so a candidate
+    whose stage changed meanwhile is left alone. Returns one result per
+    move: candidate_id, from, to, ok and (when not ok) error.
+    """
     csv_path = os.path.join(CSV_FOLDER, 'candidates.csv')
-    df = read_csv_safe(csv_path)
-    if not df.empty:
-        df.loc[df['id'] == int(candidate_id), 'stage'] = new_stage
-        return write_csv_safe(df, csv_path)
-    return False
+    results = []
+    for candidate_id, new_stage in moves:
+        result = {'candidate_id': candidate_id, 'from': None, 'to': new_stage, 'ok': False}
+        try:
+            result['candidate_id'] = int(candidate_id)
+        except (TypeError, ValueError):
+            result['error'] = 'Invalid candidate id'
+        results.append(result)
+    ids = [r['candidate_id'] for r in results if 'error' not in r]
+    df = read_csv_safe(csv_path, columns=['id', 'stage'])
+    if 'id' in df.columns and 'stage' in df.columns:
+        df = plain_frame(df[df['id'].isin(ids)])
+        current = dict(zip(df['id'], df['stage']))
+    else:
+        current = {}
 
-@app.route('/')
-def dashboard():
-    """Main dashboard showing requisitions and quick statistics"""
-    requisitions_df = read_csv_safe(os.path.join(CSV_FOLDER, 'requisitions.csv'))
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    interviews_df = read_csv_safe(os.path.join(CSV_FOLDER, 'interviews.csv'))
-    offers_df = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
+    changes, seen = {}, set()
+    for result in results:
+        candidate_id, new_stage = result['candidate_id'], result['to']
+        if 'error' in result:
+            continue
+        if candidate_id in seen:
+            result['error'] = 'Candidate appears more than once'
+        elif candidate_id not in current:
+            result['error'] = 'Candidate not found'
+        elif new_stage not in STAGE_TRANSITIONS:
+            result['error'] = f'Unknown stage: {new_stage}'
+        else:
+            result['from'] = current[candidate_id]
+            if new_stage not in STAGE_TRANSITIONS.get(result['from'], ()):
+                result['error'] = f"Cannot move from {result['from']} to {new_stage}"
+            else:
+                changes[candidate_id] = (result['from'], new_stage)
+        seen.add(candidate_id)
+    if changes:
+        changed = set(write_coordinator.submit(csv_path, ('update_each', 'id', 'stage', changes)) or ())
+        for result in results:
+            if 'error' not in result:
+                result['ok'] = result['candidate_id'] in changed
+                if not result['ok']:
+                    result['error'] = 'Stage changed meanwhile or write failed'
+    return results
 
-    # Compute quick stats
-    try:
-        open_requisitions = int((requisitions_df['status'] == 'Open').sum()) if not requisitions_df.empty else 0
-    except Exception:
-        open_requisitions = 0
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
 
-    try:
-        active_candidates = int((candidates_df['stage'].isin(['Applied', 'Screening', 'Screening Hold', 'Interview', 'Interview Hold'])).sum()) if not candidates_df.empty else 0
-    except Exception:
-        active_candidates = 0
+@before_render_template.connect_via(app)
+def start_render_timer(sender, template, context, **extra):
+    g.render_started = time.perf_counter()
 
-    try:
-        interviews_pending = int((candidates_df['stage'].isin(['Screening', 'Interview'])).sum()) if not candidates_df.empty else 0
-    except Exception:
-        interviews_pending = 0
+@template_rendered.connect_via(app)
+def record_render_time(sender, template, context, **extra):
+    if 'render_started' in g:
+        current = g.setdefault('metrics', {})
+        current['render_seconds'] = current.get('render_seconds', 0) + time.perf_counter() - g.pop('render_started')
 
+@app.after_request
+def record_request_metrics(response):
+    """Close the request's metrics and log it if it was slower than SLOW_REQUEST_MS"""
+    if 'request_started' not in g:
+        return response
+    if request.mimetype == 'multipart/form-data' and request.content_length:
+        metrics.count('upload_bytes', request.content_length)
+    current = metrics.finish_request(response.status_code, time.perf_counter() - g.request_started)
+    if SLOW_REQUEST_MS and current['duration'] * 1000 >= SLOW_REQUEST_MS:
+        record = {'endpoint': request.endpoint, 'method': request.method, 'path': request.path,
+                  'status': response.status_code, 'ms': round(current.pop('duration') * 1000, 1)}
+        record.update({name: round(value, 4) for name, value in current.items()})
+        logging.warning(f"Slow request: {json.dumps(record)}")
+    return response
+
+def code_version():
+    """Fingerprint of the app code and templates, so a deploy changes every page's ETag"""
+    template_folder = os.path.join(app.root_path, app.template_folder)
+    paths = [os.path.abspath(__file__)] + sorted(os.path.join(template_folder, name) for name in os.listdir(template_folder))
+    return hashlib.sha1(json.dumps([[p, os.stat(p).st_mtime_ns] for p in paths]).encode()).hexdigest()[:12]
+
+PAGE_VERSION = code_version()
+
+def page_validators(tables):
+    """ETag and Last-Modified (or None) for a page built from the given tables at their current versions.
+
+    Uses the storage versions, which all worker processes share. Returns
+    (None, None) if a table's version cannot be read.
+    """
+    if not tables:
+        return None, None
+    versions, modified = [], None
     try:
-        offers_extended = int(len(offers_df)) if not offers_df.empty else 0
-    except Exception:
-        offers_extended = 0
+        for table in tables:
+            csv_file_path = os.path.join(CSV_FOLDER, f'{table}.csv')
+            versions.append([table, list(storage.signature(csv_file_path))])
+            if storage.name == 'csv':
+                modified = max(modified or 0, os.stat(csv_file_path).st_mtime)
+    except (OSError, sqlite3.Error):
+        return None, None
+    # The day is included because pages show dates relative to today
+    key = [PAGE_VERSION, request.full_path, datetime.now().strftime('%Y-%m-%d'), versions]
+    etag = hashlib.sha1(json.dumps(key).encode()).hexdigest()
+    # Last-Modified has whole seconds; only give one once that second is over, so a
+    # write later in the same second cannot leave it unchanged
+    if modified is not None and time.time() < int(modified) + 1:
+        modified = None
+    return etag, None if modified is None else int(modified)
 
-    stats = {
-        'open_requisitions': open_requisitions,
-        'active_candidates': active_candidates,
-        'interviews_pending': interviews_pending,
-        'offers_extended': offers_extended,
-    }
+def conditional_page(tables):
+    """Answer a GET with 304 Not Modified while the tables the page reads are unchanged.
+
+    tables lists the tables the view reads, or is a function of the view's
+    URL arguments returning them. Responses carry a weak ETag and, in CSV
+    mode, Last-Modified, with Cache-Control "private, no-cache" so browsers
+    revalidate. Pages with flash messages waiting to be shown are always
+    rendered.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            if request.method != 'GET' or session.get('_flashes'):
+                return view(**kwargs)
+            etag, last_modified = page_validators(tables(**kwargs) if callable(tables) else tables)
+            if etag is None:
+                return view(**kwargs)
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = bool(last_modified and request.if_modified_since
+                                    and last_modified <= request.if_modified_since.timestamp())
+            response = Response(status=304) if not_modified else make_response(view(**kwargs))
+            if response.status_code in (200, 304):
+                response.set_etag(etag, weak=True)
+                if last_modified:
+                    response.last_modified = last_modified
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+@app.route('/')
+@conditional_page(['requisitions', 'candidates', 'offers'])
+def dashboard():
+    """Main dashboard showing quick statistics"""
+    return render_template('dashboard.html', stats=dashboard_stats.get())
 
-    return render_template('dashboard.html', requisitions=requisitions_df.to_dict('records'), stats=stats)
+@app.route('/analytics')
+@conditional_page(PipelineAnalytics.TABLES)
+def analytics():
+    """Recruitment funnel, time in each stage and breakdowns by requisition, department and source"""
+    report = pipeline_analytics.get()
+    if request.args.get('format') == 'json':
+        return jsonify(report)
+    return render_template('analytics.html', report=report)
+
+@app.route('/stats/rebuild', methods=['POST'])
+def rebuild_stats():
+    """Recount the dashboard counters from scratch"""
+    return jsonify(dashboard_stats.rebuild())
 
 @app.route('/requisitions', methods=['GET', 'POST'])
 def requisitions():
@@ -150,28 +2838,24 @@ def requisitions():
 def close_requisition(req_id):
     """Close a job requisition"""
     csv_path = os.path.join(CSV_FOLDER, 'requisitions.csv')
-    df = read_csv_safe(csv_path)
-    if not df.empty:
-        df.loc[df['id'] == req_id, 'status'] = 'Closed'
-        if write_csv_safe(df, csv_path):
+    if storage.exists(csv_path):
+        if update_rows(csv_path, {'id': req_id}, {'status': 'Closed'}):
             flash('Requisition closed successfully!', 'success')
         else:
             flash('Error closing requisition!', 'error')
     return redirect(url_for('dashboard'))
 
 @app.route('/requisitions/<int:req_id>')
+@conditional_page(['requisitions', 'candidates'])
 def requisition_detail(req_id):
     """Show requisition details with candidates"""
-    requisitions_df = read_csv_safe(os.path.join(CSV_FOLDER, 'requisitions.csv'))
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    
-    requisition = requisitions_df[requisitions_df['id'] == req_id].to_dict('records')
+    requisition = to_records(find_rows(os.path.join(CSV_FOLDER, 'requisitions.csv'), id=req_id))
     if not requisition:
         flash('Requisition not found!', 'error')
         return redirect(url_for('dashboard'))
     
     requisition = requisition[0]
-    req_candidates = candidates_df[candidates_df['requisition_id'] == req_id].to_dict('records')
+    req_candidates = to_records(find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), requisition_id=req_id))
     
     return render_template('requisition_detail.html', requisition=requisition, candidates=req_candidates)
 
@@ -184,11 +2868,7 @@ def add_candidate(req_id):
         if 'resume' in request.files:
             file = request.files['resume']
             if file and file.filename and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                # Add unique identifier to filename
-                unique_filename = f"{uuid.uuid4()}_{filename}"
-                file.save(os.path.join(UPLOAD_FOLDER, unique_filename))
-                resume_filename = unique_filename
+                resume_filename = save_upload(file)
         
         candidate_data = {
             'id': get_next_id(os.path.join(CSV_FOLDER, 'candidates.csv')),
@@ -208,8 +2888,10 @@ def add_candidate(req_id):
         }
         
         if append_to_csv(candidate_data, os.path.join(CSV_FOLDER, 'candidates.csv')):
+            resume_extractor.submit(resume_filename)
             flash('Candidate added successfully!', 'success')
         else:
+            blob_store.release(resume_filename)
             flash('Error adding candidate!', 'error')
             
     except Exception as e:
@@ -242,6 +2924,43 @@ def download_bulk_candidate_sample():
         }
     )
 
+@app.route('/candidates/transitions', methods=['POST'])
+def bulk_transition_candidates():
+    """Move many candidates between pipeline stages in one write.
+
+    Takes JSON {"moves": [{"candidate_id": 1, "stage": "Screening"}, ...]}
+    (or [[1, "Screening"], ...]) and answers with a result per candidate,
+    or a form with several candidate_ids and one stage, answered with flashes.
+    """
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        items = payload.get('moves') if isinstance(payload, dict) else None
+        if not isinstance(items, list):
+            return jsonify({'error': 'Expected a "moves" list'}), 400
+        moves = []
+        for item in items:
+            if isinstance(item, dict):
+                moves.append((item.get('candidate_id'), item.get('stage')))
+            elif isinstance(item, (list, tuple)) and len(item) == 2:
+                moves.append(tuple(item))
+            else:
+                moves.append((None, None))
+        results = transition_candidates(moves)
+        return jsonify({'moved': sum(r['ok'] for r in results), 'results': results})
+
+    stage = request.form.get('stage', '')
+    candidate_ids = request.form.getlist('candidate_ids')
+    if not stage or not candidate_ids:
+        flash('Select candidates and a stage to move them to.', 'error')
+        return redirect(request.referrer or url_for('candidates_page'))
+    results = transition_candidates([(candidate_id, stage) for candidate_id in candidate_ids])
+    moved = sum(r['ok'] for r in results)
+    if moved:
+        flash(f'Moved {moved} candidates to {stage}.', 'success')
+    for result in [r for r in results if not r['ok']][:5]:
+        flash(f"Candidate {result['candidate_id']}: {result['error']}", 'error')
+    return redirect(request.referrer or url_for('candidates_page'))
+
 @app.route('/candidates/bulk-upload', methods=['POST'])
 def bulk_upload_candidates():
     """Handle CSV + resume files upload to bulk-add candidates"""
@@ -271,64 +2990,184 @@ def bulk_upload_candidates():
         for resume_file in resume_files:
             if not allowed_file(resume_file.filename):
                 continue
-            original_name = secure_filename(resume_file.filename)
-            unique_name = f"{uuid.uuid4()}_{original_name}"
-            resume_file.save(os.path.join(UPLOAD_FOLDER, unique_name))
-            original_to_saved_resume[original_name] = unique_name
-
-        # Read uploaded CSV
-        stream = io.StringIO(csv_file.stream.read().decode('UTF8'), newline=None)
-        csv_input = csv.DictReader(stream)
-
-        candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-
-        count = 0
-        for row in csv_input:
-            # Basic normalization
-            row = {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in row.items()}
-
-            # Map optional resume filename to saved file if provided
-            saved_resume = ''
-            if 'resume_filename' in row and row['resume_filename']:
-                original_name = secure_filename(row['resume_filename'])
-                saved_resume = original_to_saved_resume.get(original_name, '')
-
-            candidate_data = {
-                'id': get_next_id(os.path.join(CSV_FOLDER, 'candidates.csv')),
-                'requisition_id': int(row.get('requisition_id', 0) or 0),
-                'name': row.get('name', ''),
-                'email': row.get('email', ''),
-                'phone': row.get('phone', ''),
-                'experience': row.get('experience', ''),
-                'skills': row.get('skills', ''),
-                'current_salary': row.get('current_salary', ''),
-                'expected_salary': row.get('expected_salary', ''),
-                'notice_period': row.get('notice_period', ''),
-                'source': row.get('source', ''),
-                'applied_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'stage': 'Applied',
-                'resume_filename': saved_resume,
-            }
+            saved_name = save_upload(resume_file)
+            original_to_saved_resume[secure_filename(resume_file.filename)] = saved_name
 
-            candidates_df = pd.concat([candidates_df, pd.DataFrame([candidate_data])], ignore_index=True)
-            count += 1
-
-        if write_csv_safe(candidates_df, os.path.join(CSV_FOLDER, 'candidates.csv')):
-            flash(f'Successfully uploaded {count} candidates.', 'success')
-        else:
-            flash('Error saving candidates!', 'error')
+        head = csv_file.stream.read(BULK_UPLOAD_INLINE_BYTES + 1)
+        if len(head) <= BULK_UPLOAD_INLINE_BYTES:
+            report = ingest_candidates_csv(io.StringIO(head.decode('utf-8-sig'), newline=''), original_to_saved_resume)
+            return bulk_upload_response(report)
 
+        # Spool a large CSV to disk and ingest it in a background job, so the worker is free at once
+        fd, csv_path = tempfile.mkstemp(prefix='upload-', suffix='.csv', dir=JOB_FOLDER)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(head)
+            shutil.copyfileobj(csv_file.stream, f)
+        try:
+            job_id = job_queue.submit('bulk_upload', run_bulk_upload, csv_path, original_to_saved_resume)
+        except Exception:
+            if os.path.exists(csv_path):
+                os.remove(csv_path)
+            raise
     except Exception as e:
         logging.error(f"Error in bulk upload: {e}")
-        flash('Error processing bulk upload!', 'error')
+        busy = isinstance(e, JobQueueFull)
+        message = 'Too many jobs are running, try again shortly' if busy else 'Error processing bulk upload'
+        if request.args.get('format') == 'json':
+            return jsonify({'error': message}), (503 if busy else 500)
+        flash(f'{message}!', 'error')
+        return redirect(request.referrer)
 
-    return redirect(request.referrer)
+    if request.args.get('format') == 'json':
+        return jsonify({'job_id': job_id, 'status_url': url_for('job_status', job_id=job_id, format='json')}), 202
+    return redirect(url_for('job_status', job_id=job_id))
+
+def bulk_upload_response(report):
+    """Answer a bulk upload ingested within the request: the report as JSON, or flashes and a redirect"""
+    if request.args.get('format') == 'json':
+        return jsonify({'status': 'done', 'result': report})
+    if report['inserted']:
+        flash(f"Successfully uploaded {report['inserted']} candidates.", 'success')
+    if not report['write_ok']:
+        flash('Error saving candidates!', 'error')
+    elif not report['inserted'] and not report['error_count']:
+        flash('No candidate rows found in the CSV.', 'error')
+    for issue in report['errors'][:5]:
+        flash(f"Row {issue['row']}: {issue['message']}", 'error')
+    if report['error_count'] > 5:
+        flash(f"{report['error_count'] - 5} more rows were skipped.", 'error')
+    return redirect(request.referrer or url_for('candidates_page'))
+
+def validate_candidate_row(row, requisition_ids, saved_resumes):
+    """Normalize one bulk-upload row; returns (candidate_data or None, errors, warnings)"""
+    row = {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k is not None}
+    errors, warnings = [], []
+
+    requisition_value = row.get('requisition_id') or ''
+    requisition_id = None
+    if not requisition_value:
+        errors.append('missing requisition_id')
+    else:
+        try:
+            requisition_id = int(float(requisition_value))
+        except ValueError:
+            errors.append(f'invalid requisition_id "{requisition_value}"')
+        else:
+            if requisition_id not in requisition_ids:
+                errors.append(f'unknown requisition_id {requisition_id}')
+
+    if not row.get('name'):
+        errors.append('missing name')
+    email = row.get('email') or ''
+    if not email:
+        errors.append('missing email')
+    elif not EMAIL_PATTERN.match(email):
+        errors.append(f'malformed email "{email}"')
+
+    # Map optional resume filename to saved file if provided
+    saved_resume = ''
+    if row.get('resume_filename'):
+        saved_resume = saved_resumes.get(secure_filename(row['resume_filename']), '')
+        if not saved_resume:
+            warnings.append(f'resume "{row["resume_filename"]}" was not uploaded')
+
+    if errors:
+        return None, errors, warnings
+
+    candidate_data = {
+        'requisition_id': requisition_id,
+        'name': row.get('name', ''),
+        'email': email,
+        'phone': row.get('phone', ''),
+        'experience': row.get('experience', ''),
+        'skills': row.get('skills', ''),
+        'current_salary': row.get('current_salary', ''),
+        'expected_salary': row.get('expected_salary', ''),
+        'notice_period': row.get('notice_period', ''),
+        'source': row.get('source', ''),
+        'applied_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'stage': 'Applied',
+        'resume_filename': saved_resume,
+    }
+    try:
+        candidate_data = conform_row('candidates', candidate_data)
+    except ValueError as e:
+        return None, [str(e)], warnings
+    return candidate_data, errors, warnings
+
+def ingest_candidates_csv(text_stream, saved_resumes, chunk_size=None, progress=None):
+    """Stream candidate rows from a CSV into candidates.csv in validated chunks.
+
+    Each chunk of valid rows gets one reserved block of IDs and one append,
+    so memory stays bounded by the chunk size however large the upload is.
+    progress(rows_read) is called after each chunk. Returns a report with
+    per-row errors (skipped rows) and warnings. Saved resumes that no
+    inserted row refers to are released.
+    """
+    chunk_size = chunk_size or BULK_UPLOAD_CHUNK_SIZE
+    candidates_path = os.path.join(CSV_FOLDER, 'candidates.csv')
+    requisitions_df = read_csv_safe(os.path.join(CSV_FOLDER, 'requisitions.csv'), columns=['id'])
+    requisition_ids = set()
+    if 'id' in requisitions_df.columns:
+        requisition_ids = set(pd.to_numeric(requisitions_df['id'], errors='coerce').dropna().astype(int))
+
+    report = {'rows': 0, 'inserted': 0, 'error_count': 0, 'warning_count': 0,
+              'errors': [], 'warnings': [], 'write_ok': True}
+    used_resumes = set()
+
+    def record(kind, row_number, messages):
+        report[f'{kind[:-1]}_count'] += len(messages)
+        for message in messages:
+            if len(report[kind]) < BULK_REPORT_MAX_ISSUES:
+                report[kind].append({'row': row_number, 'message': message})
+
+    def flush(chunk):
+        if not chunk:
+            return
+        for new_id, candidate_data in zip(reserve_ids(candidates_path, len(chunk)), chunk):
+            candidate_data['id'] = new_id
+        if append_rows_to_csv(chunk, candidates_path):
+            report['inserted'] += len(chunk)
+            for candidate_data in chunk:
+                if candidate_data['resume_filename'] and candidate_data['resume_filename'] not in used_resumes:
+                    used_resumes.add(candidate_data['resume_filename'])
+                    resume_extractor.submit(candidate_data['resume_filename'])
+        else:
+            report['write_ok'] = False
+        if progress:
+            progress(report['rows'])
+
+    chunk = []
+    # Row numbers match the spreadsheet view: the header is row 1
+    for row_number, row in enumerate(csv.DictReader(text_stream), start=2):
+        report['rows'] += 1
+        candidate_data, errors, warnings = validate_candidate_row(row, requisition_ids, saved_resumes)
+        record('warnings', row_number, warnings)
+        if errors:
+            record('errors', row_number, errors)
+            continue
+        chunk.append(candidate_data)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    flush(chunk)
+    for saved_name in set(saved_resumes.values()) - used_resumes:
+        blob_store.release(saved_name)
+    return report
+
+def run_bulk_upload(job, csv_path, saved_resumes):
+    """Job: ingest a bulk-upload CSV spooled to csv_path, then delete it"""
+    try:
+        with open(csv_path, encoding='utf-8-sig', newline='') as stream:
+            return ingest_candidates_csv(stream, saved_resumes,
+                                         progress=lambda rows: job.progress(rows, message='rows read'))
+    finally:
+        os.remove(csv_path)
 
 @app.route('/candidates/<int:cand_id>/resume')
 def get_resume(cand_id):
     """Stream the resume file"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    candidate = candidates_df[candidates_df['id'] == cand_id]
+    candidate = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=cand_id)
     
     if candidate.empty:
         flash('Candidate not found!', 'error')
@@ -340,7 +3179,7 @@ def get_resume(cand_id):
         return redirect(request.referrer)
     
     try:
-        return send_file(os.path.join(UPLOAD_FOLDER, resume_filename), as_attachment=True)
+        return send_upload(resume_filename, as_attachment=True)
     except FileNotFoundError:
         flash('Resume file not found!', 'error')
         return redirect(request.referrer)
@@ -348,8 +3187,7 @@ def get_resume(cand_id):
 @app.route('/candidates/<int:cand_id>/resume-preview')
 def preview_resume(cand_id):
     """Preview the resume file inline"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    candidate = candidates_df[candidates_df['id'] == cand_id]
+    candidate = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=cand_id)
     
     if candidate.empty:
         return "Candidate not found", 404
@@ -359,7 +3197,7 @@ def preview_resume(cand_id):
         return "No resume found for this candidate", 404
     
     try:
-        file_path = os.path.join(UPLOAD_FOLDER, resume_filename)
+        file_path = upload_path(resume_filename)
         if not os.path.exists(file_path):
             return "Resume file not found", 404
         
@@ -374,22 +3212,22 @@ def preview_resume(cand_id):
         
         content_type = content_types.get(file_ext, 'application/octet-stream')
         
-        return send_file(file_path, mimetype=content_type, as_attachment=False)
+        return send_upload(resume_filename, mimetype=content_type, as_attachment=False)
     except Exception as e:
         logging.error(f"Error previewing resume: {e}")
         return "Error loading resume", 500
 
 @app.route('/screening/<int:cand_id>')
+@conditional_page(['candidates'])
 def screening_form(cand_id):
     """Show screening form for a candidate"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    candidate = candidates_df[candidates_df['id'] == cand_id]
+    candidate = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=cand_id)
     
     if candidate.empty:
         flash('Candidate not found!', 'error')
         return redirect(url_for('dashboard'))
     
-    return render_template('screening_form.html', candidate=candidate.iloc[0].to_dict())
+    return render_template('screening_form.html', candidate=to_record(candidate))
 
 @app.route('/screening', methods=['POST'])
 def submit_screening():
@@ -410,15 +3248,18 @@ def submit_screening():
             'screening_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        if append_to_csv(screening_data, os.path.join(CSV_FOLDER, 'screening.csv')):
-            # Update candidate stage based on screening status
-            status_value = request.form['status']
-            if status_value == 'Shortlisted':
-                update_candidate_stage(candidate_id, 'Screening')
-            elif status_value == 'Rejected':
-                update_candidate_stage(candidate_id, 'Rejected')
-            elif status_value == 'Hold':
-                update_candidate_stage(candidate_id, 'Screening Hold')
+        # Record the result and move the candidate in one unit, so neither is written without the other
+        unit = UnitOfWork()
+        unit.append(screening_data, os.path.join(CSV_FOLDER, 'screening.csv'))
+        # Update candidate stage based on screening status
+        status_value = request.form['status']
+        if status_value == 'Shortlisted':
+            unit.update_candidate_stage(candidate_id, 'Screening')
+        elif status_value == 'Rejected':
+            unit.update_candidate_stage(candidate_id, 'Rejected')
+        elif status_value == 'Hold':
+            unit.update_candidate_stage(candidate_id, 'Screening Hold')
+        if unit.commit():
             flash('Screening result submitted successfully!', 'success')
         else:
             flash('Error submitting screening result!', 'error')
@@ -430,16 +3271,16 @@ def submit_screening():
     return redirect(request.referrer)
 
 @app.route('/interview/<int:cand_id>')
+@conditional_page(['candidates'])
 def interview_form(cand_id):
     """Show interview form for a candidate"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    candidate = candidates_df[candidates_df['id'] == cand_id]
+    candidate = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=cand_id)
     
     if candidate.empty:
         flash('Candidate not found!', 'error')
         return redirect(url_for('dashboard'))
     
-    return render_template('interview_form.html', candidate=candidate.iloc[0].to_dict())
+    return render_template('interview_form.html', candidate=to_record(candidate))
 
 @app.route('/interview', methods=['POST'])
 def submit_interview():
@@ -462,15 +3303,17 @@ def submit_interview():
             'interview_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        if append_to_csv(interview_data, os.path.join(CSV_FOLDER, 'interviews.csv')):
-            # Update candidate stage based on interview status
-            status_value = request.form['status']
-            if status_value == 'Shortlisted':
-                update_candidate_stage(candidate_id, 'Interview')
-            elif status_value == 'Rejected':
-                update_candidate_stage(candidate_id, 'Rejected')
-            elif status_value == 'Hold':
-                update_candidate_stage(candidate_id, 'Interview Hold')
+        unit = UnitOfWork()
+        unit.append(interview_data, os.path.join(CSV_FOLDER, 'interviews.csv'))
+        # Update candidate stage based on interview status
+        status_value = request.form['status']
+        if status_value == 'Shortlisted':
+            unit.update_candidate_stage(candidate_id, 'Interview')
+        elif status_value == 'Rejected':
+            unit.update_candidate_stage(candidate_id, 'Rejected')
+        elif status_value == 'Hold':
+            unit.update_candidate_stage(candidate_id, 'Interview Hold')
+        if unit.commit():
             flash('Interview result submitted successfully!', 'success')
         else:
             flash('Error submitting interview result!', 'error')
@@ -482,16 +3325,16 @@ def submit_interview():
     return redirect(request.referrer)
 
 @app.route('/offer/<int:cand_id>')
+@conditional_page(['candidates'])
 def offer_form(cand_id):
     """Show offer form for a candidate"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    candidate = candidates_df[candidates_df['id'] == cand_id]
+    candidate = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=cand_id)
     
     if candidate.empty:
         flash('Candidate not found!', 'error')
         return redirect(url_for('dashboard'))
     
-    return render_template('offer_form.html', candidate=candidate.iloc[0].to_dict())
+    return render_template('offer_form.html', candidate=to_record(candidate))
 
 @app.route('/offer', methods=['POST'])
 def create_offer():
@@ -513,8 +3356,10 @@ def create_offer():
             'status': 'Sent'
         }
         
-        if append_to_csv(offer_data, os.path.join(CSV_FOLDER, 'offers.csv')):
-            update_candidate_stage(candidate_id, 'Offer')
+        unit = UnitOfWork()
+        unit.append(offer_data, os.path.join(CSV_FOLDER, 'offers.csv'))
+        unit.update_candidate_stage(candidate_id, 'Offer')
+        if unit.commit():
             flash('Offer created successfully!', 'success')
         else:
             flash('Error creating offer!', 'error')
@@ -526,42 +3371,118 @@ def create_offer():
     return redirect(request.referrer)
 
 @app.route('/offer-letter/<int:cand_id>')
+@conditional_page(['candidates', 'offers'])
 def generate_offer_letter(cand_id):
     """Generate offer letter HTML"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    offers_df = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
-    
-    candidate = candidates_df[candidates_df['id'] == cand_id]
-    offer = offers_df[offers_df['candidate_id'] == cand_id]
+    candidate = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=cand_id)
+    offer = history_rows(os.path.join(CSV_FOLDER, 'offers.csv'), cand_id, sort_by=None)
     
     if candidate.empty or offer.empty:
         flash('Candidate or offer not found!', 'error')
         return redirect(url_for('dashboard'))
     
-    return render_template('offer_letter.html', 
-                         candidate=candidate.iloc[0].to_dict(),
-                         offer=offer.iloc[0].to_dict())
+    return offer_letters.render(to_record(candidate), to_record(offer))
+
+def requisition_offers(req_id):
+    """(candidate, offer) records of every candidate on a requisition with an offer, using each one's first offer"""
+    candidates = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), requisition_id=req_id)
+    if candidates.empty:
+        return []
+    offers = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
+    if 'candidate_id' not in offers.columns:
+        return []
+    offers = offers[offers['candidate_id'].isin(candidates['id'])].drop_duplicates('candidate_id')
+    by_candidate = {offer['candidate_id']: offer for offer in to_records(offers)}
+    return [(candidate, by_candidate[candidate['id']]) for candidate in to_records(candidates) if candidate['id'] in by_candidate]
+
+def render_offer_letters(pairs, progress=None):
+    """Yield (file name, html) for each (candidate, offer) pair, in order, rendered on OFFER_LETTER_WORKERS threads"""
+    def render(pair):
+        candidate, offer = pair
+        with app.app_context():
+            html = offer_letters.render(candidate, offer)
+        return f"offer_letter_{candidate['id']}_{secure_filename(str(candidate.get('name') or ''))}.html", html
+    with ThreadPoolExecutor(max_workers=max(OFFER_LETTER_WORKERS, 1)) as pool:
+        for done, letter in enumerate(pool.map(render, pairs), 1):
+            yield letter
+            if progress:
+                progress(done)
+
+class StreamBuffer:
+    """Write-only file object collecting what is written to it, so a zip can be streamed as it is built"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def zip_chunks(files):
+    """A zip archive of (name, text) pairs, yielded a file at a time"""
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, text in files:
+            archive.writestr(name, text)
+            yield buffer.take()
+    yield buffer.take()
+
+def run_offer_letters(job, req_id):
+    """Job: write the zip of a requisition's offer letters to a file of the job's"""
+    pairs = requisition_offers(req_id)
+    name = f'offer_letters_REQ-{req_id}.zip'
+    job.progress(0, len(pairs), 'letters rendered')
+    with open(job.path(name), 'wb') as f:
+        for data in zip_chunks(render_offer_letters(pairs, job.progress)):
+            f.write(data)
+    job.progress(len(pairs))
+    return {'file': name, 'rows': len(pairs), 'bytes': os.path.getsize(job.path(name))}
+
+@app.route('/requisitions/<int:req_id>/offer-letters.zip')
+@conditional_page(['candidates', 'offers'])
+def download_offer_letters(req_id):
+    """Offer letters of every candidate with an offer on a requisition, streamed as one zip (background=1 for a job)"""
+    pairs = requisition_offers(req_id)
+    if not pairs:
+        flash('No offers found for this requisition!', 'error')
+        return redirect(url_for('requisition_detail', req_id=req_id))
+    if (request.args.get('background') or '').lower() not in ('', '0', 'false', 'no'):
+        try:
+            job_id = job_queue.submit('offer_letters', run_offer_letters, req_id)
+        except JobQueueFull:
+            flash('Too many jobs are running, try again shortly!', 'error')
+            return redirect(url_for('requisition_detail', req_id=req_id))
+        return redirect(url_for('job_status', job_id=job_id))
+    return Response(
+        zip_chunks(render_offer_letters(pairs)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename=offer_letters_REQ-{req_id}.zip'}
+    )
 
 @app.route('/onboarding/<int:cand_id>')
+@conditional_page(['candidates', 'offers', 'onboarding', 'requisitions'])
 def onboarding(cand_id):
     """Show onboarding page for employee"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    offers_df = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
-    requisitions_df = read_csv_safe(os.path.join(CSV_FOLDER, 'requisitions.csv'))
-    onboarding_df = read_csv_safe(os.path.join(CSV_FOLDER, 'onboarding.csv'))
-    
-    candidate = candidates_df[candidates_df['id'] == cand_id]
+    candidate = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=cand_id)
     if candidate.empty:
         flash('Candidate not found!', 'error')
         return redirect(url_for('dashboard'))
     
-    candidate_data = candidate.iloc[0].to_dict()
+    candidate_data = to_record(candidate)
     
     # Fetch requisition information for this candidate (original position)
     if candidate_data.get('requisition_id') and candidate_data.get('requisition_id') != '0':
-        requisition_data = requisitions_df[requisitions_df['id'] == int(candidate_data['requisition_id'])]
+        requisition_data = find_rows(os.path.join(CSV_FOLDER, 'requisitions.csv'), id=int(candidate_data['requisition_id']))
         if not requisition_data.empty:
-            requisition = requisition_data.iloc[0].to_dict()
+            requisition = to_record(requisition_data)
             # Add requisition information to candidate data
             candidate_data.update({
                 'position': requisition.get('position_title', 'N/A'),
@@ -569,9 +3490,9 @@ def onboarding(cand_id):
             })
     
     # Fetch offer information for this candidate
-    offer_data = offers_df[offers_df['candidate_id'] == cand_id]
+    offer_data = history_rows(os.path.join(CSV_FOLDER, 'offers.csv'), cand_id, sort_by=None)
     if not offer_data.empty:
-        offer = offer_data.iloc[0].to_dict()
+        offer = to_record(offer_data)
         # Add offer information to candidate data
         candidate_data.update({
             'department': offer.get('department', 'N/A'),
@@ -582,8 +3503,8 @@ def onboarding(cand_id):
             'benefits': offer.get('benefits', 'N/A')
         })
     
-    onboarding_record = onboarding_df[onboarding_df['candidate_id'] == cand_id]
-    onboarding_data = onboarding_record.iloc[0].to_dict() if not onboarding_record.empty else {}
+    onboarding_record = history_rows(os.path.join(CSV_FOLDER, 'onboarding.csv'), cand_id, sort_by=None)
+    onboarding_data = to_record(onboarding_record) if not onboarding_record.empty else {}
     
     return render_template('onboarding.html', 
                          candidate=candidate_data,
@@ -600,18 +3521,15 @@ def update_onboarding():
             if 'signed_offer' in request.files:
                 file = request.files['signed_offer']
                 if file and file.filename and file.filename != '' and allowed_file(file.filename):
-                    filename = secure_filename(file.filename)
-                    unique_filename = f"{uuid.uuid4()}_{filename}"
-                    file.save(os.path.join(UPLOAD_FOLDER, unique_filename))
-                    signed_offer_filename = unique_filename
+                    signed_offer_filename = save_upload(file)
         except Exception as e:
             logging.error(f"Error saving signed offer: {e}")
+        uploaded_filename = signed_offer_filename
 
         # If no new file uploaded, try to reuse latest from onboarding history
         if not signed_offer_filename:
             try:
-                existing_onboarding_df = read_csv_safe(os.path.join(CSV_FOLDER, 'onboarding.csv'))
-                existing_rows = existing_onboarding_df[existing_onboarding_df['candidate_id'] == candidate_id]
+                existing_rows = history_rows(os.path.join(CSV_FOLDER, 'onboarding.csv'), candidate_id, sort_by=None)
                 if not existing_rows.empty and 'signed_offer_filename' in existing_rows.columns:
                     last_row = existing_rows.iloc[-1]
                     prev_file = last_row.get('signed_offer_filename', '')
@@ -635,10 +3553,14 @@ def update_onboarding():
             'signed_offer_filename': signed_offer_filename or ''
         }
         
-        if append_to_csv(onboarding_data, os.path.join(CSV_FOLDER, 'onboarding.csv')):
-            update_candidate_stage(candidate_id, 'Onboarded')
+        unit = UnitOfWork()
+        unit.append(onboarding_data, os.path.join(CSV_FOLDER, 'onboarding.csv'))
+        unit.update_candidate_stage(candidate_id, 'Onboarded')
+        if unit.commit():
             flash('Onboarding updated successfully!', 'success')
         else:
+            if uploaded_filename:
+                blob_store.release(uploaded_filename)
             flash('Error updating onboarding!', 'error')
             
     except Exception as e:
@@ -648,35 +3570,28 @@ def update_onboarding():
     return redirect(request.referrer)
 
 @app.route('/resignation/<int:cand_id>')
+@conditional_page(['candidates', 'offers', 'resignations'])
 def resignation_form(cand_id):
     """Show resignation form"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    resignations_df = read_csv_safe(os.path.join(CSV_FOLDER, 'resignations.csv'))
-    offers_df = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
-
-    candidate = candidates_df[candidates_df['id'] == cand_id]
+    candidate = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=cand_id)
     
     if candidate.empty:
         flash('Employee not found!', 'error')
         return redirect(url_for('dashboard'))
 
-    candidate_dict = candidate.iloc[0].to_dict()
+    candidate_dict = to_record(candidate)
 
     # Enrich department from offer
-    offer_row = offers_df[offers_df['candidate_id'] == cand_id]
+    offer_row = history_rows(os.path.join(CSV_FOLDER, 'offers.csv'), cand_id, sort_by=None)
     if not offer_row.empty:
-        offer = offer_row.iloc[0].to_dict()
+        offer = to_record(offer_row)
         candidate_dict['department'] = offer.get('department', candidate_dict.get('department', 'N/A'))
 
     # Preload latest resignation (if any)
     existing = None
-    res_rows = resignations_df[resignations_df['candidate_id'] == cand_id]
+    res_rows = history_rows(os.path.join(CSV_FOLDER, 'resignations.csv'), cand_id)
     if not res_rows.empty:
-        try:
-            res_rows = res_rows.sort_values(by='resignation_date')
-        except Exception:
-            pass
-        existing = res_rows.iloc[-1].to_dict()
+        existing = to_record(res_rows, -1)
     
     return render_template('resignation.html', candidate=candidate_dict, existing=existing)
 
@@ -704,10 +3619,7 @@ def submit_resignation():
                 if field_name in request.files:
                     f = request.files[field_name]
                     if f and f.filename and f.filename != '' and allowed_file(f.filename):
-                        filename = secure_filename(f.filename)
-                        unique_name = f"{uuid.uuid4()}_{filename}"
-                        f.save(os.path.join(UPLOAD_FOLDER, unique_name))
-                        return unique_name
+                        return save_upload(f)
             except Exception as e:
                 logging.error(f"Error saving file for {field_name}: {e}")
             return ''
@@ -738,10 +3650,14 @@ def submit_resignation():
             'relieving_letter_filename': relieving_letter_file,
         }
         
-        if append_to_csv(resignation_data, os.path.join(CSV_FOLDER, 'resignations.csv')):
-            update_candidate_stage(candidate_id, 'Resigned')
+        unit = UnitOfWork()
+        unit.append(resignation_data, os.path.join(CSV_FOLDER, 'resignations.csv'))
+        unit.update_candidate_stage(candidate_id, 'Resigned')
+        if unit.commit():
             flash('Resignation recorded successfully!', 'success')
         else:
+            for filename in (resignation_letter_file, acceptance_letter_file, relieving_letter_file):
+                blob_store.release(filename)
             flash('Error recording resignation!', 'error')
             
     except Exception as e:
@@ -752,207 +3668,151 @@ def submit_resignation():
 
 # New separate page routes
 @app.route('/requisitions-page')
+@conditional_page(['requisitions'])
 def requisitions_page():
     requisitions_df = read_csv_safe(os.path.join(CSV_FOLDER, 'requisitions.csv'))
-    return render_template('requisitions.html', requisitions=requisitions_df.to_dict('records'))
+    page = query_table(requisitions_df, date_column='created_date', filters=('status', 'department'))
+    return render_template('requisitions.html', requisitions=page.rows, page=page)
 
 @app.route('/candidates-page')
+@conditional_page(['candidates'])
 def candidates_page():
     candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    return render_template('candidates.html', candidates=candidates_df.to_dict('records'))
+    page = query_table(candidates_df, date_column='applied_date')
+    return render_template('candidates.html', candidates=page.rows, page=page)
 
 @app.route('/screening-page')
+@conditional_page(['candidates'])
 def screening_page():
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
     # Filter candidates at Applied stage
-    applied_candidates = candidates_df[candidates_df['stage'] == 'Applied'].to_dict('records')
-    return render_template('screening.html', candidates=applied_candidates)
+    page = query_table(find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), stage='Applied'),
+                       date_column='applied_date', filters=('requisition', 'source'))
+    return render_template('screening.html', candidates=page.rows, page=page)
 
 @app.route('/interviews-page')
+@conditional_page(['candidates'])
 def interviews_page():
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
     # Filter candidates at Screening stage (ready for interview)
-    screening_candidates = candidates_df[candidates_df['stage'] == 'Screening'].to_dict('records')
-    return render_template('interviews.html', candidates=screening_candidates)
+    page = query_table(find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), stage='Screening'),
+                       date_column='applied_date', filters=('requisition', 'source'))
+    return render_template('interviews.html', candidates=page.rows, page=page)
 
 @app.route('/offers-page')
+@conditional_page(['candidates'])
 def offers_page():
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
     # Filter candidates at Interview stage (ready for offer)
-    interview_candidates = candidates_df[candidates_df['stage'] == 'Interview'].to_dict('records')
+    page = query_table(find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), stage='Interview'),
+                       date_column='applied_date', filters=('requisition', 'source'))
     # Also get candidates with offers
-    offer_candidates = candidates_df[candidates_df['stage'] == 'Offer'].to_dict('records')
-    return render_template('offers.html', candidates=interview_candidates, offer_candidates=offer_candidates)
+    offer_page = query_table(find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), stage='Offer'), prefix='offer_',
+                             date_column='applied_date', filters=('requisition', 'source'))
+    return render_template('offers.html', candidates=page.rows, offer_candidates=offer_page.rows,
+                           page=page, offer_page=offer_page)
 
 @app.route('/onboarding-page')
+@conditional_page(['candidates', 'offers', 'onboarding', 'requisitions'])
 def onboarding_page():
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
     offers_df = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
     requisitions_df = read_csv_safe(os.path.join(CSV_FOLDER, 'requisitions.csv'))
     onboarding_df = read_csv_safe(os.path.join(CSV_FOLDER, 'onboarding.csv'))
     
     # Filter candidates at Offer stage (ready for onboarding)
-    offer_candidates = candidates_df[candidates_df['stage'] == 'Offer'].to_dict('records')
+    offer_candidates = to_records(find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), stage='Offer'))
     # Also get recently onboarded
-    onboarded_candidates = candidates_df[candidates_df['stage'] == 'Onboarded'].to_dict('records')
+    onboarded_candidates = to_records(find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), stage='Onboarded'))
     
-    # Add requisition and offer information to candidates
-    for candidate in offer_candidates + onboarded_candidates:
-        # Fetch requisition information (original position)
-        if candidate.get('requisition_id') and candidate.get('requisition_id') != '0':
-            requisition_data = requisitions_df[requisitions_df['id'] == int(candidate['requisition_id'])]
-            if not requisition_data.empty:
-                requisition = requisition_data.iloc[0].to_dict()
-                candidate.update({
-                    'position': requisition.get('position_title', 'N/A'),
-                    'requisition_department': requisition.get('department', 'N/A')
-                })
-        
-        # Fetch offer information
-        offer_data = offers_df[offers_df['candidate_id'] == candidate['id']]
-        if not offer_data.empty:
-            offer = offer_data.iloc[0].to_dict()
-            candidate.update({
-                'department': offer.get('department', 'N/A'),
-                'job_title': offer.get('job_title', 'N/A'),
-                'joining_date': offer.get('joining_date', 'N/A'),
-                'location': offer.get('location', 'N/A'),
-                'salary': offer.get('salary', 'N/A'),
-                'benefits': offer.get('benefits', 'N/A'),
-                'offer_date': offer.get('offer_date', 'N/A')
-            })
+    # Add requisition (original position) and offer information to candidates
+    attach_related(offer_candidates + onboarded_candidates, first_row_per_key(requisitions_df, 'id'),
+                   REQUISITION_FIELDS, key_column='id', left_key='requisition_id')
+    attach_related(offer_candidates + onboarded_candidates, first_row_per_key(offers_df, 'candidate_id'),
+                   dict(OFFER_FIELDS, offer_date='offer_date'))
     
     # Add onboarding information to onboarded candidates
-    for candidate in onboarded_candidates:
-        onboarding_data = onboarding_df[onboarding_df['candidate_id'] == candidate['id']]
-        if not onboarding_data.empty:
-            onboarding = onboarding_data.iloc[0].to_dict()
-            candidate.update({
-                'onboarding_date': onboarding.get('onboarding_date', 'N/A'),
-                'hr_representative': onboarding.get('hr_representative', 'N/A')
-            })
+    attach_related(onboarded_candidates, first_row_per_key(onboarding_df, 'candidate_id'),
+                   {'onboarding_date': 'onboarding_date', 'hr_representative': 'hr_representative'})
     
     return render_template('onboarding_list.html', candidates=offer_candidates, onboarded_candidates=onboarded_candidates)
 
 @app.route('/employees-page')
+@conditional_page(['candidates', 'offers', 'requisitions', 'resignations'])
 def employees_page():
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
     offers_df = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
     requisitions_df = read_csv_safe(os.path.join(CSV_FOLDER, 'requisitions.csv'))
     
-    # Filter employees (onboarded candidates)
-    employees = candidates_df[candidates_df['stage'] == 'Onboarded'].to_dict('records')
+    first_offers = first_row_per_key(offers_df, 'candidate_id')
+    
+    # Filter employees (onboarded candidates); department and joining date come from the offer
+    employees_df = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), stage='Onboarded')
+    joined = [c for c in ('department', 'joining_date') if c not in employees_df.columns]
+    employees_df = join_related(employees_df, first_offers, {'department': 'department', 'joining_date': 'joining_date'})
+    page = query_table(employees_df, date_column='joining_date', filters=('department', 'requisition', 'source'))
+    # Employees without an offer keep the template fallbacks for the joined columns
+    employees = [{k: v for k, v in row.items() if k not in joined or not pd.isna(v)} for row in page.rows]
     
     # Add offer and requisition information to employees
-    for employee in employees:
-        # Fetch requisition information (original position)
-        if employee.get('requisition_id') and employee.get('requisition_id') != '0':
-            requisition_data = requisitions_df[requisitions_df['id'] == int(employee['requisition_id'])]
-            if not requisition_data.empty:
-                requisition = requisition_data.iloc[0].to_dict()
-                employee.update({
-                    'position': requisition.get('position_title', 'N/A'),
-                    'requisition_department': requisition.get('department', 'N/A')
-                })
-        
-        # Fetch offer information
-        offer_data = offers_df[offers_df['candidate_id'] == employee['id']]
-        if not offer_data.empty:
-            offer = offer_data.iloc[0].to_dict()
-            employee.update({
-                'department': offer.get('department', 'N/A'),
-                'job_title': offer.get('job_title', 'N/A'),
-                'joining_date': offer.get('joining_date', 'N/A'),
-                'location': offer.get('location', 'N/A'),
-                'salary': offer.get('salary', 'N/A'),
-                'benefits': offer.get('benefits', 'N/A'),
-                'offer_date': offer.get('offer_date', 'N/A')
-            })
-        # Attach latest resignation document filenames if resigned
-        if employee.get('stage') == 'Resigned':
-            resignations_df = read_csv_safe(os.path.join(CSV_FOLDER, 'resignations.csv'))
-            res_rows = resignations_df[resignations_df['candidate_id'] == employee['id']]
-            if not res_rows.empty:
-                try:
-                    res_rows = res_rows.sort_values(by='updated_at')
-                except Exception:
-                    pass
-                latest = res_rows.iloc[-1].to_dict()
-                employee.update({
-                    'resignation_letter_filename': latest.get('resignation_letter_filename', ''),
-                    'acceptance_letter_filename': latest.get('acceptance_letter_filename', ''),
-                    'relieving_letter_filename': latest.get('relieving_letter_filename', ''),
-                })
+    attach_related(employees, first_row_per_key(requisitions_df, 'id'), REQUISITION_FIELDS,
+                   key_column='id', left_key='requisition_id')
+    attach_related(employees, first_offers, dict(OFFER_FIELDS, offer_date='offer_date'))
     
-    return render_template('employees.html', employees=employees)
+    # Attach latest resignation document filenames if resigned
+    resigned = [employee for employee in employees if employee.get('stage') == 'Resigned']
+    if resigned:
+        resignations_df = read_csv_safe(os.path.join(CSV_FOLDER, 'resignations.csv'))
+        attach_related(resigned, latest_row_per_key(resignations_df, 'candidate_id', 'updated_at'), {
+            'resignation_letter_filename': 'resignation_letter_filename',
+            'acceptance_letter_filename': 'acceptance_letter_filename',
+            'relieving_letter_filename': 'relieving_letter_filename',
+        }, default='')
+    
+    return render_template('employees.html', employees=employees, page=page)
 
 @app.route('/resignations-page')
+@conditional_page(['candidates', 'offers', 'resignations'])
 def resignations_page():
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
     offers_df = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
     resignations_df = read_csv_safe(os.path.join(CSV_FOLDER, 'resignations.csv'))
+    first_offers = first_row_per_key(offers_df, 'candidate_id')
 
     # Filter resigned candidates
-    resigned_candidates = candidates_df[candidates_df['stage'] == 'Resigned'].to_dict('records')
+    resigned_candidates = to_records(find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), stage='Resigned'))
 
     # Enrich resigned candidates with offer department and latest resignation info
-    for cand in resigned_candidates:
-        offer_row = offers_df[offers_df['candidate_id'] == cand['id']]
-        if not offer_row.empty:
-            offer = offer_row.iloc[0].to_dict()
-            cand['department'] = offer.get('department', cand.get('department', 'N/A'))
-
-        res_rows = resignations_df[resignations_df['candidate_id'] == cand['id']]
-        if not res_rows.empty:
-            try:
-                res_rows = res_rows.sort_values(by='resignation_date')
-            except Exception:
-                pass
-            latest = res_rows.iloc[-1].to_dict()
-            cand['resignation_date'] = latest.get('resignation_date', 'N/A')
-            cand['last_working_date'] = latest.get('last_working_date', 'N/A')
-            cand['resignation_reason'] = latest.get('reason', 'N/A')
+    attach_related(resigned_candidates, first_offers, {'department': 'department'}, keep_existing=True)
+    attach_related(resigned_candidates, latest_row_per_key(resignations_df, 'candidate_id', 'resignation_date'), {
+        'resignation_date': 'resignation_date',
+        'last_working_date': 'last_working_date',
+        'resignation_reason': 'reason',
+    })
 
     # Also get active employees for resignation processing and enrich department from offer
-    active_employees = candidates_df[candidates_df['stage'] == 'Onboarded'].to_dict('records')
-    for emp in active_employees:
-        offer_row = offers_df[offers_df['candidate_id'] == emp['id']]
-        if not offer_row.empty:
-            offer = offer_row.iloc[0].to_dict()
-            emp['department'] = offer.get('department', emp.get('department', 'N/A'))
+    active_employees = to_records(find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), stage='Onboarded'))
+    attach_related(active_employees, first_offers, {'department': 'department'}, keep_existing=True)
 
     return render_template('resignations_list.html', resigned_candidates=resigned_candidates, active_employees=active_employees)
 
 @app.route('/resignation-details/<int:cand_id>')
+@conditional_page(['candidates', 'offers', 'resignations'])
 def resignation_detail(cand_id):
     """Show resignation details and history for an employee"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    offers_df = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
-    resignations_df = read_csv_safe(os.path.join(CSV_FOLDER, 'resignations.csv'))
-
-    candidate_df = candidates_df[candidates_df['id'] == cand_id]
+    candidate_df = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=cand_id)
     if candidate_df.empty:
         flash('Employee not found!', 'error')
         return redirect(url_for('resignations_page'))
 
-    candidate = candidate_df.iloc[0].to_dict()
+    candidate = to_record(candidate_df)
 
     # Enrich with offer details (department and job_title)
-    offer_row = offers_df[offers_df['candidate_id'] == cand_id]
+    offer_row = history_rows(os.path.join(CSV_FOLDER, 'offers.csv'), cand_id, sort_by=None)
     if not offer_row.empty:
-        offer = offer_row.iloc[0].to_dict()
+        offer = to_record(offer_row)
         candidate['department'] = offer.get('department', candidate.get('department', 'N/A'))
         candidate['job_title'] = offer.get('job_title', candidate.get('job_title', 'N/A'))
 
     # Build resignation history
-    res_rows = resignations_df[resignations_df['candidate_id'] == cand_id]
+    res_rows = history_rows(os.path.join(CSV_FOLDER, 'resignations.csv'), cand_id)
     history = []
     if not res_rows.empty:
-        try:
-            res_rows = res_rows.sort_values(by='resignation_date')
-        except Exception:
-            pass
-        history = res_rows.to_dict('records')
+        history = to_records(res_rows)
     latest = history[-1] if history else None
 
     return render_template('resignation_detail.html', candidate=candidate, resignation=latest, resignation_history=history)
@@ -970,8 +3830,7 @@ def download_resignation_doc(cand_id, doc_type):
         flash('Invalid document type', 'error')
         return redirect(request.referrer or url_for('resignation_detail', cand_id=cand_id))
 
-    resignations_df = read_csv_safe(os.path.join(CSV_FOLDER, 'resignations.csv'))
-    rows = resignations_df[resignations_df['candidate_id'] == cand_id]
+    rows = history_rows(os.path.join(CSV_FOLDER, 'resignations.csv'), cand_id, sort_by=None)
     if rows.empty or valid_types[doc_type] not in rows.columns:
         flash('Document not found', 'error')
         return redirect(request.referrer or url_for('resignation_detail', cand_id=cand_id))
@@ -980,7 +3839,7 @@ def download_resignation_doc(cand_id, doc_type):
         flash('Document not found', 'error')
         return redirect(request.referrer or url_for('resignation_detail', cand_id=cand_id))
     try:
-        return send_file(os.path.join(UPLOAD_FOLDER, filename), as_attachment=True)
+        return send_upload(filename, as_attachment=True)
     except FileNotFoundError:
         flash('File not found', 'error')
         return redirect(request.referrer or url_for('resignation_detail', cand_id=cand_id))
@@ -994,14 +3853,13 @@ def preview_resignation_doc(cand_id, doc_type):
     }
     if doc_type not in valid_types:
         return "Invalid document type", 400
-    resignations_df = read_csv_safe(os.path.join(CSV_FOLDER, 'resignations.csv'))
-    rows = resignations_df[resignations_df['candidate_id'] == cand_id]
+    rows = history_rows(os.path.join(CSV_FOLDER, 'resignations.csv'), cand_id, sort_by=None)
     if rows.empty or valid_types[doc_type] not in rows.columns:
         return "Document not found", 404
     filename = rows.iloc[-1].get(valid_types[doc_type], '')
     if not filename:
         return "Document not found", 404
-    file_path = os.path.join(UPLOAD_FOLDER, filename)
+    file_path = upload_path(filename)
     if not os.path.exists(file_path):
         return "Document not found", 404
     file_ext = filename.lower().split('.')[-1]
@@ -1011,7 +3869,7 @@ def preview_resignation_doc(cand_id, doc_type):
         'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
         'txt': 'text/plain',
     }
-    return send_file(file_path, mimetype=content_types.get(file_ext, 'application/octet-stream'), as_attachment=False)
+    return send_upload(filename, mimetype=content_types.get(file_ext, 'application/octet-stream'), as_attachment=False)
 
 @app.route('/add-employee-direct', methods=['POST'])
 def add_employee_direct():
@@ -1050,62 +3908,35 @@ def add_employee_direct():
     return redirect(url_for('employees_page'))
 
 @app.route('/candidate/<int:cand_id>')
+@conditional_page(['candidates', 'screening', 'interviews', 'offers', 'requisitions'])
 def candidate_detail(cand_id):
     """Show candidate details"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    screening_df = read_csv_safe(os.path.join(CSV_FOLDER, 'screening.csv'))
-    interviews_df = read_csv_safe(os.path.join(CSV_FOLDER, 'interviews.csv'))
-    offers_df = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
-    requisitions_df = read_csv_safe(os.path.join(CSV_FOLDER, 'requisitions.csv'))
-    
-    candidate_data = candidates_df[candidates_df['id'] == cand_id]
+    candidate_data = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=cand_id)
     
     if candidate_data.empty:
         flash('Candidate not found!', 'error')
         return redirect(url_for('candidates_page'))
     
-    candidate = candidate_data.to_dict('records')[0]
+    candidate = to_record(candidate_data)
     
-    # Normalize candidate_id columns to numeric for reliable filtering
-    try:
-        if not screening_df.empty:
-            screening_df['candidate_id'] = pd.to_numeric(screening_df['candidate_id'], errors='coerce')
-        if not interviews_df.empty:
-            interviews_df['candidate_id'] = pd.to_numeric(interviews_df['candidate_id'], errors='coerce')
-    except Exception:
-        pass
-    # Fetch screening attempts (history) for this candidate
-    screening_rows = screening_df[screening_df['candidate_id'] == cand_id]
-    screening_history = []
-    if not screening_rows.empty:
-        try:
-            screening_rows = screening_rows.sort_values(by='screening_date')
-        except Exception:
-            pass
-        screening_history = screening_rows.to_dict('records')
+    # Fetch screening attempts (history) for this candidate, oldest first
+    screening_history = to_records(history_rows(os.path.join(CSV_FOLDER, 'screening.csv'), cand_id))
     latest_screening = screening_history[-1] if screening_history else None
     
-    # Fetch interview attempts (history) for this candidate
-    interview_rows = interviews_df[interviews_df['candidate_id'] == cand_id]
-    interview_history = []
-    if not interview_rows.empty:
-        try:
-            interview_rows = interview_rows.sort_values(by='interview_date')
-        except Exception:
-            pass
-        interview_history = interview_rows.to_dict('records')
+    # Fetch interview attempts (history) for this candidate, oldest first
+    interview_history = to_records(history_rows(os.path.join(CSV_FOLDER, 'interviews.csv'), cand_id))
     latest_interview = interview_history[-1] if interview_history else None
     
     # Fetch offer information for this candidate (latest)
-    offer_rows = offers_df[offers_df['candidate_id'] == cand_id]
-    offer = offer_rows.iloc[0].to_dict() if not offer_rows.empty else None
+    offer_rows = history_rows(os.path.join(CSV_FOLDER, 'offers.csv'), cand_id, sort_by=None)
+    offer = to_record(offer_rows) if not offer_rows.empty else None
     
     # Fetch requisition information for this candidate
     requisition = None
     if candidate.get('requisition_id') and candidate.get('requisition_id') != '0':
-        requisition_data = requisitions_df[requisitions_df['id'] == int(candidate['requisition_id'])]
+        requisition_data = find_rows(os.path.join(CSV_FOLDER, 'requisitions.csv'), id=int(candidate['requisition_id']))
         if not requisition_data.empty:
-            requisition = requisition_data.iloc[0].to_dict()
+            requisition = to_record(requisition_data)
     
     return render_template(
         'candidate_detail.html',
@@ -1119,25 +3950,22 @@ def candidate_detail(cand_id):
     )
 
 @app.route('/employee/<int:emp_id>')
+@conditional_page(['candidates', 'offers', 'onboarding', 'requisitions', 'resignations'])
 def employee_detail(emp_id):
     """Show employee details"""
-    candidates_df = read_csv_safe(os.path.join(CSV_FOLDER, 'candidates.csv'))
-    offers_df = read_csv_safe(os.path.join(CSV_FOLDER, 'offers.csv'))
-    requisitions_df = read_csv_safe(os.path.join(CSV_FOLDER, 'requisitions.csv'))
-    
-    employee_data = candidates_df[(candidates_df['id'] == emp_id) & (candidates_df['stage'] == 'Onboarded')]
+    employee_data = find_rows(os.path.join(CSV_FOLDER, 'candidates.csv'), id=emp_id, stage='Onboarded')
     
     if employee_data.empty:
         flash('Employee not found!', 'error')
         return redirect(url_for('employees_page'))
     
-    employee = employee_data.to_dict('records')[0]
+    employee = to_record(employee_data)
     
     # Fetch requisition information for this employee (original position)
     if employee.get('requisition_id') and employee.get('requisition_id') != '0':
-        requisition_data = requisitions_df[requisitions_df['id'] == int(employee['requisition_id'])]
+        requisition_data = find_rows(os.path.join(CSV_FOLDER, 'requisitions.csv'), id=int(employee['requisition_id']))
         if not requisition_data.empty:
-            requisition = requisition_data.iloc[0].to_dict()
+            requisition = to_record(requisition_data)
             # Add requisition information to employee data
             employee.update({
                 'position': requisition.get('position_title', 'N/A'),
@@ -1145,9 +3973,9 @@ def employee_detail(emp_id):
             })
     
     # Fetch offer information for this employee
-    offer_data = offers_df[offers_df['candidate_id'] == emp_id]
+    offer_data = history_rows(os.path.join(CSV_FOLDER, 'offers.csv'), emp_id, sort_by=None)
     if not offer_data.empty:
-        offer = offer_data.iloc[0].to_dict()
+        offer = to_record(offer_data)
         # Add offer information to employee data
         employee.update({
             'job_title': offer.get('job_title', 'N/A'),
@@ -1160,25 +3988,15 @@ def employee_detail(emp_id):
         })
     
     # Fetch latest onboarding info to attach signed offer filename
-    onboarding_df = read_csv_safe(os.path.join(CSV_FOLDER, 'onboarding.csv'))
-    onboarding_rows = onboarding_df[onboarding_df['candidate_id'] == emp_id]
+    onboarding_rows = history_rows(os.path.join(CSV_FOLDER, 'onboarding.csv'), emp_id)
     if not onboarding_rows.empty and 'signed_offer_filename' in onboarding_rows.columns:
-        try:
-            onboarding_rows = onboarding_rows.sort_values(by='onboarding_date')
-        except Exception:
-            pass
-        latest_onboarding = onboarding_rows.iloc[-1].to_dict()
+        latest_onboarding = to_record(onboarding_rows, -1)
         employee['signed_offer_filename'] = latest_onboarding.get('signed_offer_filename', '')
 
     # If resigned, attach resignation document filenames
-    resignations_df = read_csv_safe(os.path.join(CSV_FOLDER, 'resignations.csv'))
-    res_rows = resignations_df[resignations_df['candidate_id'] == emp_id]
+    res_rows = history_rows(os.path.join(CSV_FOLDER, 'resignations.csv'), emp_id, sort_by='updated_at')
     if not res_rows.empty:
-        try:
-            res_rows = res_rows.sort_values(by='updated_at')
-        except Exception:
-            pass
-        latest_res = res_rows.iloc[-1].to_dict()
+        latest_res = to_record(res_rows, -1)
         employee['stage'] = 'Resigned'
         employee['resignation_letter_filename'] = latest_res.get('resignation_letter_filename', '')
         employee['acceptance_letter_filename'] = latest_res.get('acceptance_letter_filename', '')
@@ -1190,8 +4008,7 @@ def employee_detail(emp_id):
 @app.route('/signed-offer/<int:cand_id>/download')
 def download_signed_offer(cand_id):
     """Download the signed offer letter for the candidate"""
-    onboarding_df = read_csv_safe(os.path.join(CSV_FOLDER, 'onboarding.csv'))
-    rows = onboarding_df[onboarding_df['candidate_id'] == cand_id]
+    rows = history_rows(os.path.join(CSV_FOLDER, 'onboarding.csv'), cand_id, sort_by=None)
     if rows.empty or 'signed_offer_filename' not in rows.columns:
         flash('No signed offer on file for this employee.', 'error')
         return redirect(request.referrer or url_for('employee_detail', emp_id=cand_id))
@@ -1200,7 +4017,7 @@ def download_signed_offer(cand_id):
         flash('No signed offer on file for this employee.', 'error')
         return redirect(request.referrer or url_for('employee_detail', emp_id=cand_id))
     try:
-        return send_file(os.path.join(UPLOAD_FOLDER, filename), as_attachment=True)
+        return send_upload(filename, as_attachment=True)
     except FileNotFoundError:
         flash('Signed offer file not found!', 'error')
         return redirect(request.referrer or url_for('employee_detail', emp_id=cand_id))
@@ -1208,15 +4025,14 @@ def download_signed_offer(cand_id):
 @app.route('/signed-offer/<int:cand_id>/preview')
 def preview_signed_offer(cand_id):
     """Inline preview for the signed offer letter"""
-    onboarding_df = read_csv_safe(os.path.join(CSV_FOLDER, 'onboarding.csv'))
-    rows = onboarding_df[onboarding_df['candidate_id'] == cand_id]
+    rows = history_rows(os.path.join(CSV_FOLDER, 'onboarding.csv'), cand_id, sort_by=None)
     if rows.empty or 'signed_offer_filename' not in rows.columns:
         return "Signed offer not found", 404
     filename = rows.iloc[-1].get('signed_offer_filename', '')
     if not filename:
         return "Signed offer not found", 404
 
-    file_path = os.path.join(UPLOAD_FOLDER, filename)
+    file_path = upload_path(filename)
     if not os.path.exists(file_path):
         return "Signed offer not found", 404
 
@@ -1228,18 +4044,161 @@ def preview_signed_offer(cand_id):
         'txt': 'text/plain',
     }
     content_type = content_types.get(file_ext, 'application/octet-stream')
-    return send_file(file_path, mimetype=content_type, as_attachment=False)
+    return send_upload(filename, mimetype=content_type, as_attachment=False)
+
+# Search
+def search_records(table, query, limit=SEARCH_RESULT_LIMIT):
+    """Ranked rows of a table matching a search query, each with its score"""
+    hits = search_index.search(query, table, limit)
+    if not hits:
+        return []
+    df = read_csv_safe(os.path.join(CSV_FOLDER, f'{table}.csv'))
+    rows = df[df['id'].isin([doc_id for doc_id, _ in hits])]
+    by_id = {int(row['id']): row for row in plain_frame(rows).astype(object).where(rows.notna(), None).to_dict('records')}
+    return [dict(by_id[doc_id], score=round(score, 4)) for doc_id, score in hits if doc_id in by_id]
+
+@app.route('/search')
+def search():
+    """Search candidates by name, email, phone or skills and requisitions by title or description"""
+    query = request.args.get('q', '')
+    scope = request.args.get('type', 'all')
+    try:
+        limit = min(max(int(request.args.get('limit', SEARCH_RESULT_LIMIT)), 1), LIST_PAGE_SIZE_MAX)
+    except ValueError:
+        limit = SEARCH_RESULT_LIMIT
+    results = {}
+    for table in SEARCH_FIELDS:
+        if scope in ('all', table):
+            try:
+                results[table] = search_records(table, query, limit) if query.strip() else []
+            except Exception as e:
+                logging.error(f"Error searching {table}: {e}")
+                results[table] = []
+    if request.args.get('format') == 'json':
+        return jsonify({'query': query, 'results': results})
+    return render_template('search.html', query=query, scope=scope, results=results)
 
 # Helper function to read CSV data as dictionaries for compatibility
 def read_csv_data(csv_file_path):
     """Read CSV file and return as list of dictionaries"""
     df = read_csv_safe(csv_file_path)
-    return df.to_dict('records')
+    return to_records(df)
 
 # Admin download routes
+def run_export(job, csv_path, columns, export_args, compress):
+    """Job: write an export to a file of the job's"""
+    name = f"{table_name(csv_path)}.csv{'.gz' if compress else ''}"
+    rows = [0]
+    def progress(written):
+        rows[0] = written
+        job.progress(written, message='rows written')
+    job.progress(0, message='rows written')
+    with open(job.path(name), 'wb') as f:
+        for data in export_chunks(csv_path, columns, export_args, compress, progress):
+            f.write(data)
+    job.progress(rows[0], rows[0])
+    return {'file': name, 'rows': rows[0], 'bytes': os.path.getsize(job.path(name))}
+
+def export_chunks(csv_path, columns, export_args, compress=False, progress=None):
+    """CSV of the rows matching an export's filters, optionally as a gzip stream.
+
+    The table is read from storage EXPORT_CHUNK_ROWS rows at a time and each
+    chunk is filtered and written before the next is read, so only one chunk
+    is ever in memory and the table cache is left alone. Cells are written as
+    stored. progress(rows_written) is called after each chunk.
+    """
+    table = table_name(csv_path)
+    date_column = export_args['date_column'] or EXPORT_DATE_COLUMNS.get(table)
+    filtered = [LIST_FILTERS[name] for name in LIST_FILTERS if export_args[name]]
+    if export_args['date_from'] or export_args['date_to']:
+        filtered.append(date_column)
+    header = storage.columns(csv_path)
+    filtered = [col for col in dict.fromkeys(filtered) if col in header]
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits=31: gzip container
+    def encode(text):
+        data = text.encode('utf-8')
+        return compressor.compress(data) if compressor else data
+    yield encode(pd.DataFrame(columns=columns).to_csv(index=False))
+    written = 0
+    for chunk in storage.iter_chunks(csv_path, list(dict.fromkeys(columns + filtered)), EXPORT_CHUNK_ROWS):
+        # Filters compare typed values (numbers, dates); only their columns are converted
+        mask, _ = filter_mask(apply_schema(table, chunk[filtered]), export_args.get, list(LIST_FILTERS), date_column)
+        chunk = chunk[mask.to_numpy()]
+        written += len(chunk)
+        data = encode(chunk[columns].to_csv(index=False, header=False))
+        if data:
+            yield data
+        if progress:
+            progress(written)
+    if compressor:
+        yield compressor.flush()
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status, progress, result and error of a background job (?format=json for the API)"""
+    job = job_queue.get(job_id)
+    if job and isinstance(job['result'], dict) and job['result'].get('file'):
+        job['download_url'] = url_for('download_job_file', job_id=job_id)
+    if request.args.get('format') == 'json':
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job)
+    if job is None:
+        flash('Job not found!', 'error')
+        return redirect(url_for('dashboard'))
+    return render_template('job.html', job=job)
+
+@app.route('/jobs/<job_id>/download')
+def download_job_file(job_id):
+    """Download the file a finished job produced"""
+    job = job_queue.get(job_id)
+    result = job['result'] if job and isinstance(job['result'], dict) else {}
+    path = job_queue.result_path(job_id, result.get('file') or '')
+    if not path:
+        flash('Job file not found!', 'error')
+        return redirect(url_for('dashboard'))
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=result['file'])
+
+@app.route('/metrics')
+def metrics_page():
+    """Request and storage metrics in the Prometheus text format"""
+    cache = table_cache.stats()
+    extraction = resume_extractor.stats()
+    jobs = job_queue.stats()
+    letters = offer_letters.stats()
+    extra = {
+        'table_cache_bytes': ('gauge', 'Bytes of parsed tables held in the cache', cache['bytes']),
+        'table_cache_entries': ('gauge', 'Tables held in the cache', cache['entries']),
+        'table_cache_hits_total': ('counter', 'Table reads served from the cache', cache['hits']),
+        'table_cache_misses_total': ('counter', 'Table reads that loaded from storage', cache['misses']),
+        'table_cache_evictions_total': ('counter', 'Tables evicted from the cache', cache['evictions']),
+        'snapshot_reads_total': ('counter', 'Tables loaded from binary snapshots', snapshots.reads),
+        'snapshot_writes_total': ('counter', 'Binary snapshots written', snapshots.writes),
+        'resume_extractions_pending': ('gauge', 'Resume text extractions queued or running', extraction['pending']),
+        'resume_extractions_total': ('counter', 'Resume text extractions finished', extraction['completed']),
+        'resume_extractions_failed_total': ('counter', 'Resume text extractions that failed', extraction['failed']),
+        'offer_letter_cache_entries': ('gauge', 'Rendered offer letters held in the cache', letters['entries']),
+        'offer_letter_cache_hits_total': ('counter', 'Offer letters served from the cache', letters['hits']),
+        'offer_letter_cache_misses_total': ('counter', 'Offer letters rendered', letters['misses']),
+        'jobs_pending': ('gauge', 'Background jobs queued or running', jobs['pending']),
+        'jobs_completed_total': ('counter', 'Background jobs finished', jobs['completed']),
+        'jobs_failed_total': ('counter', 'Background jobs that failed', jobs['failed']),
+        'analytics_rebuilds_total': ('counter', 'Analytics reports rebuilt after a table changed', pipeline_analytics.rebuilds),
+    }
+    return Response(metrics.render(extra), mimetype='text/plain; version=0.0.4')
+
 @app.route('/download/<csv_name>')
+@conditional_page(lambda csv_name: [csv_name] if csv_name in TABLE_NAMES else [])
 def download_csv(csv_name):
-    """Download CSV files for admin"""
+    """Download CSV files for admin.
+
+    Without query arguments the table is sent as stored. With any of
+    columns=a,b,c, the list filters (stage, status, requisition, source,
+    department), date_from/date_to (on EXPORT_DATE_COLUMNS or ?date_column=)
+    or gzip=1, the matching rows are streamed in chunks instead, gzipped as
+    .csv.gz if asked. With background=1 the export is written by a job and
+    the browser is sent to the job's page to download it.
+    """
     allowed_csvs = ['requisitions', 'candidates', 'screening', 'interviews', 'offers', 'onboarding', 'resignations']
     if csv_name not in allowed_csvs:
         flash('Invalid CSV file!', 'error')
@@ -1247,10 +4206,127 @@ def download_csv(csv_name):
     
     try:
         csv_path = os.path.join(CSV_FOLDER, f'{csv_name}.csv')
-        return send_file(csv_path, as_attachment=True, download_name=f'{csv_name}.csv')
+        export_args = {name: (request.args.get(name) or '').strip()
+                       for name in list(LIST_FILTERS) + ['columns', 'date_from', 'date_to', 'date_column', 'gzip']}
+        background = (request.args.get('background') or '').lower() not in ('', '0', 'false', 'no')
+        if any(export_args.values()) or background:
+            header = storage.columns(csv_path) if storage.exists(csv_path) else []
+            if not header:
+                raise FileNotFoundError(csv_path)
+            columns = list(dict.fromkeys(c.strip() for c in export_args['columns'].split(',') if c.strip())) or header
+            unknown = [c for c in columns + [export_args['date_column']] if c and c not in header]
+            if unknown:
+                flash(f"Unknown column(s) for {csv_name}: {', '.join(unknown)}", 'error')
+                return redirect(url_for('dashboard'))
+            compress = export_args['gzip'].lower() not in ('', '0', 'false', 'no')
+            if background:
+                try:
+                    job_id = job_queue.submit('export', run_export, csv_path, columns, export_args, compress)
+                except JobQueueFull:
+                    flash('Too many jobs are running, try again shortly!', 'error')
+                    return redirect(url_for('dashboard'))
+                return redirect(url_for('job_status', job_id=job_id))
+            return Response(
+                export_chunks(csv_path, columns, export_args, compress),
+                mimetype='application/gzip' if compress else 'text/csv',
+                headers={'Content-Disposition': f"attachment; filename={csv_name}.csv{'.gz' if compress else ''}"}
+            )
+        if storage.name == 'csv':
+            return send_file(os.path.abspath(csv_path), as_attachment=True, download_name=f'{csv_name}.csv')
+        if not storage.exists(csv_path):
+            raise FileNotFoundError(csv_path)
+        return Response(
+            storage.export_csv(csv_path),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename={csv_name}.csv'}
+        )
     except FileNotFoundError:
         flash('CSV file not found!', 'error')
         return redirect(url_for('dashboard'))
 
+# Storage maintenance commands
+@app.cli.command('migrate-to-sqlite')
+@click.option('--db', default=SQLITE_PATH, show_default=True, help='SQLite database file to create or replace.')
+def migrate_to_sqlite(db):
+    """Import every CSV table into the SQLite database"""
+    target = SqliteStorage(db)
+    for table in TABLE_NAMES:
+        csv_path = os.path.join(CSV_FOLDER, f'{table}.csv')
+        if not os.path.exists(csv_path):
+            continue
+        # Keep the cell text, but treat the same markers as missing that read_csv does
+        df = pd.read_csv(csv_path, dtype=str)
+        rows = [tuple(None if pd.isna(v) else v for v in row) for row in df.itertuples(index=False)]
+        target.replace_table(table, list(df.columns), rows)
+        max_id = pd.to_numeric(df['id'], errors='coerce').max() if 'id' in df.columns else None
+        reseed_ids(csv_path, 0 if max_id is None or pd.isna(max_id) else int(max_id))
+        click.echo(f'{table}: imported {len(rows)} rows')
+
+@app.cli.command('reseed-ids')
+def reseed_ids_command():
+    """Raise every table's ID sequence past its highest stored ID (after a restore or hand edit)"""
+    for table in TABLE_NAMES:
+        csv_path = os.path.join(CSV_FOLDER, f'{table}.csv')
+        if storage.exists(csv_path):
+            click.echo(f'{table}: next id {reseed_ids(csv_path) + 1}')
+
+@app.cli.command('export-csv')
+@click.option('--out', default=CSV_FOLDER, show_default=True, help='Folder to write the CSV files to.')
+def export_csv_command(out):
+    """Export every table from the active storage backend to CSV files"""
+    os.makedirs(out, exist_ok=True)
+    for table in TABLE_NAMES:
+        csv_path = os.path.join(CSV_FOLDER, f'{table}.csv')
+        if not storage.exists(csv_path):
+            continue
+        target = os.path.join(out, f'{table}.csv')
+        if os.path.abspath(target) == os.path.abspath(csv_path) and storage.name == 'csv':
+            continue
+        with open(target, 'wb') as f:
+            f.write(storage.export_csv(csv_path))
+        click.echo(f'{table}: exported to {target}')
+
+@app.cli.command('dedupe-uploads')
+def dedupe_uploads_command():
+    """Move plain files in the uploads folder into the content-addressed blob store"""
+    moved = 0
+    freed = 0
+    for entry in sorted(os.scandir(UPLOAD_FOLDER), key=lambda e: e.name):
+        if not entry.is_file() or entry.name.startswith('.'):
+            continue
+        size = entry.stat().st_size
+        blobs_before = blob_store.stats()['blobs']
+        blob_store.adopt(entry.path, entry.name)
+        if blob_store.stats()['blobs'] == blobs_before:
+            freed += size
+        moved += 1
+    stats = blob_store.stats()
+    click.echo(f'{moved} files moved; {stats["references"]} names share {stats["blobs"]} blobs, {freed} bytes freed')
+
+@app.cli.command('extract-resumes')
+@click.option('--workers', default=RESUME_EXTRACT_WORKERS, show_default=True, help='Extraction processes to run.')
+def extract_resumes_command(workers):
+    """Extract text from every upload without cached text; safe to interrupt and re-run"""
+    names = set(blob_store.names())
+    names.update(e.name for e in os.scandir(UPLOAD_FOLDER) if e.is_file() and not e.name.startswith('.'))
+    jobs = {}
+    for name in sorted(names):
+        text_path = resume_text_path(name)
+        if not os.path.exists(text_path) and os.path.exists(upload_path(name)):
+            jobs.setdefault(text_path, name)  # identical blobs are extracted once
+    click.echo(f'{len(names) - len(jobs)} of {len(names)} files need no extraction; extracting {len(jobs)}')
+    extracted = failed = 0
+    with extraction_pool(workers) as pool:
+        futures = {pool.submit(extract_resume_to_cache, upload_path(name), name, text_path): name
+                   for text_path, name in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                extracted += 1
+            except Exception as e:
+                click.echo(f'{futures[future]}: {e}', err=True)
+                failed += 1
+    click.echo(f'{extracted} extracted, {failed} failed')
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
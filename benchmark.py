@@ -0,0 +1,587 @@
+"""Benchmark every route of the HR app against seeded synthetic data.
+
+Each scale (number of candidates) gets a fresh working directory with
+generated tables and uploads, and runs in its own Python process so caches
+and peak memory do not carry over between scales:
+
+    python benchmark.py --scale 10000 --scale 100000 --out bench.json
+    python benchmark.py --scale 10000 --compare bench.json
+
+For each route the report holds p50/p95 latency, the first (cold) request,
+peak RSS while the route ran and the bytes read per request. With
+--compare, routes whose p50 grew past --threshold are listed and the exit
+status is 1.
+"""
+import os
+import sys
+import io
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_TIME = np.datetime64('2024-01-01T09:00:00')
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rohan', 'Meera',
+               'John', 'Jane', 'Maria', 'David', 'Fatima', 'Wei', 'Carlos', 'Aisha', 'Tom', 'Yuki']
+LAST_NAMES = ['Sharma', 'Iyer', 'Khan', 'Patel', 'Reddy', 'Nair', 'Gupta', 'Singh', 'Das', 'Rao',
+              'Smith', 'Doe', 'Garcia', 'Chen', 'Okafor', 'Silva', 'Müller', 'Tanaka', 'Brown', 'Ali']
+SKILLS = ['Python', 'Java', 'SQL', 'React', 'AWS', 'Django', 'Flask', 'Go', 'Kubernetes', 'Spark',
+          'C++', 'C#', 'Excel', 'Tableau', 'Node.js', 'Docker', 'PostgreSQL', 'Salesforce', 'SAP', 'Figma']
+DEPARTMENTS = ['Engineering', 'IT', 'Data', 'Sales', 'Marketing', 'Finance', 'HR', 'Operations']
+LOCATIONS = ['Chennai', 'Bengaluru', 'Pune', 'Hyderabad', 'Mumbai', 'Remote']
+TITLES = ['Software Engineer', 'Data Analyst', 'Developer', 'QA Engineer', 'Account Manager',
+          'DevOps Engineer', 'Product Designer', 'HR Executive', 'Financial Analyst', 'Team Lead']
+SOURCES = ['Job Board', 'Referral', 'LinkedIn', 'Agency', 'Campus']
+NOTICE_PERIODS = ['Immediate', '30 days', '60 days', '90 days']
+PEOPLE = ['Lisa Brown', 'Sarah Johnson', 'Mike Wilson', 'Ravi Kumar', 'Anita Desai']
+REASONS = ['Better Opportunity', 'Higher Salary', 'Personal Reasons', 'Relocation', 'Higher Studies']
+# Stage -> (share of candidates, pipeline depth: screening, interview, offer, onboarding, resignation)
+STAGES = {
+    'Applied': (0.30, 0), 'Screening': (0.14, 1), 'Screening Hold': (0.03, 1), 'Rejected': (0.08, 1),
+    'Interview': (0.12, 2), 'Interview Hold': (0.02, 2), 'Offer': (0.08, 3), 'Onboarded': (0.19, 4),
+    'Resigned': (0.04, 5),
+}
+# Upload files shared by the generated rows, so no scale needs a file per row
+UPLOAD_POOL = 50
+
+TABLE_HEADERS = {
+    'requisitions': ['id', 'start_date', 'end_date', 'manager_name', 'position_title', 'job_description',
+                     'number_of_openings', 'department', 'location', 'salary_min', 'salary_max', 'job_type',
+                     'requirements', 'status', 'created_date'],
+    'candidates': ['id', 'requisition_id', 'name', 'email', 'phone', 'experience', 'skills', 'resume_filename',
+                   'stage', 'applied_date', 'current_salary', 'expected_salary', 'notice_period', 'source',
+                   'department', 'position', 'join_date', 'salary'],
+    'screening': ['id', 'candidate_id', 'screener_name', 'technical_score', 'communication_score',
+                  'experience_score', 'overall_score', 'comments', 'status', 'screening_date'],
+    'interviews': ['id', 'candidate_id', 'interviewer_name', 'interview_type', 'technical_score',
+                   'problem_solving_score', 'communication_score', 'cultural_fit_score', 'overall_score',
+                   'comments', 'status', 'interview_date'],
+    'offers': ['id', 'candidate_id', 'job_title', 'salary', 'joining_date', 'department', 'location', 'benefits',
+               'offer_letter_generated', 'offer_date', 'status'],
+    'onboarding': ['id', 'candidate_id', 'documents_verified', 'laptop_assigned', 'id_card_issued',
+                   'workspace_assigned', 'orientation_completed', 'system_access_provided', 'comments',
+                   'onboarding_date', 'hr_representative', 'signed_offer_filename'],
+    'resignations': ['id', 'candidate_id', 'resignation_date', 'last_working_date', 'reason',
+                     'exit_interview_completed', 'laptop_returned', 'id_card_returned', 'clearance_completed',
+                     'final_settlement', 'comments', 'hr_representative', 'updated_at', 'completion_status',
+                     'notice_period_days', 'notice_period_end_date', 'resignation_letter_filename',
+                     'acceptance_letter_filename', 'relieving_letter_filename'],
+}
+
+
+def _pick(rng, choices, n):
+    return np.asarray(choices, dtype=object)[rng.integers(0, len(choices), n)]
+
+def _times(rng, n, after=None, max_days=30):
+    """Random timestamps in 2024-2025, or up to max_days after the given ones"""
+    offsets = rng.integers(0, max_days * 86400 if after is not None else 2 * 365 * 86400, n).astype('timedelta64[s]')
+    return (after if after is not None else BASE_TIME) + offsets
+
+def _datetime_text(values):
+    return pd.Series(np.datetime_as_string(values, unit='s')).str.replace('T', ' ', regex=False).to_numpy()
+
+def _date_text(values):
+    return np.datetime_as_string(values, unit='D')
+
+def _flags(rng, n, yes=0.8):
+    return np.where(rng.random(n) < yes, 'Yes', 'No')
+
+def generate_dataset(folder, scale, seed=42):
+    """Write consistent tables for `scale` candidates (and matching uploads) under folder.
+
+    Returns the candidate ids per stage and the requisition ids, which the
+    route drivers draw their URLs from.
+    """
+    rng = np.random.default_rng(seed)
+    csv_folder = os.path.join(folder, 'csv_templates')
+    upload_folder = os.path.join(folder, 'uploads')
+    os.makedirs(csv_folder, exist_ok=True)
+    os.makedirs(upload_folder, exist_ok=True)
+
+    for i in range(UPLOAD_POOL):
+        with open(os.path.join(upload_folder, f'resume_{i:03d}.txt'), 'w', encoding='utf-8') as f:
+            f.write(f'Resume {i}\nSkills: {", ".join(_pick(rng, SKILLS, 4))}\n' + 'Experience details. ' * 50)
+        for kind in ('signed_offer', 'resignation_letter'):
+            with open(os.path.join(upload_folder, f'{kind}_{i:03d}.pdf'), 'wb') as f:
+                f.write(b'%PDF-1.4\n' + rng.bytes(2048))
+
+    tables = {}
+    n_req = max(20, scale // 200)
+    req_ids = np.arange(1, n_req + 1)
+    created = _times(rng, n_req)
+    tables['requisitions'] = pd.DataFrame({
+        'id': req_ids,
+        'start_date': _date_text(created + np.timedelta64(7, 'D')),
+        'end_date': _date_text(created + np.timedelta64(60, 'D')),
+        'manager_name': _pick(rng, PEOPLE, n_req),
+        'position_title': _pick(rng, TITLES, n_req),
+        'job_description': 'Join the team to build and run our products. ' * 3,
+        'number_of_openings': rng.integers(1, 10, n_req),
+        'department': _pick(rng, DEPARTMENTS, n_req),
+        'location': _pick(rng, LOCATIONS, n_req),
+        'salary_min': rng.integers(3, 10, n_req) * 100000,
+        'salary_max': rng.integers(10, 30, n_req) * 100000,
+        'job_type': _pick(rng, ['Full time', 'Part time', 'Contract'], n_req),
+        'requirements': pd.Series(_pick(rng, SKILLS, n_req)) + ', ' + _pick(rng, SKILLS, n_req),
+        'status': np.where(rng.random(n_req) < 0.7, 'Open', 'Closed'),
+        'created_date': _datetime_text(created),
+    })
+
+    stage_names = list(STAGES)
+    shares = np.array([STAGES[s][0] for s in stage_names])
+    stage = np.asarray(stage_names, dtype=object)[rng.choice(len(stage_names), scale, p=shares / shares.sum())]
+    depth = pd.Series(stage).map({s: STAGES[s][1] for s in stage_names}).to_numpy()
+    cand_ids = np.arange(1, scale + 1)
+    first, last = _pick(rng, FIRST_NAMES, scale), _pick(rng, LAST_NAMES, scale)
+    applied = _times(rng, scale)
+    employed = depth >= 4
+    salary = rng.integers(3, 30, scale) * 100000
+    tables['candidates'] = pd.DataFrame({
+        'id': cand_ids,
+        'requisition_id': rng.integers(1, n_req + 1, scale),
+        'name': pd.Series(first) + ' ' + last,
+        'email': pd.Series(first).str.lower() + '.' + pd.Series(last).str.lower() + pd.Series(cand_ids).astype(str) + '@example.com',
+        'phone': rng.integers(7000000000, 9999999999, scale).astype(str),
+        'experience': rng.integers(0, 20, scale),
+        'skills': pd.Series(_pick(rng, SKILLS, scale)) + ', ' + _pick(rng, SKILLS, scale) + ', ' + _pick(rng, SKILLS, scale),
+        'resume_filename': [f'resume_{i:03d}.txt' for i in rng.integers(0, UPLOAD_POOL, scale)],
+        'stage': stage,
+        'applied_date': _datetime_text(applied),
+        'current_salary': salary,
+        'expected_salary': salary + rng.integers(0, 5, scale) * 100000,
+        'notice_period': _pick(rng, NOTICE_PERIODS, scale),
+        'source': _pick(rng, SOURCES, scale),
+        'department': np.where(employed, _pick(rng, DEPARTMENTS, scale), None),
+        'position': np.where(employed, _pick(rng, TITLES, scale), None),
+        'join_date': np.where(employed, _date_text(applied + np.timedelta64(45, 'D')), None),
+        'salary': np.where(employed, salary, None),
+    })
+
+    def history(mask):
+        ids = cand_ids[mask]
+        return ids, len(ids), applied[mask]
+
+    ids, n, when = history(depth >= 1)
+    status = pd.Series(stage[depth >= 1]).map({'Screening Hold': 'Hold', 'Rejected': 'Rejected'}).fillna('Shortlisted')
+    scores = rng.integers(4, 11, (n, 3))
+    tables['screening'] = pd.DataFrame({
+        'id': np.arange(1, n + 1), 'candidate_id': ids, 'screener_name': _pick(rng, PEOPLE, n),
+        'technical_score': scores[:, 0], 'communication_score': scores[:, 1], 'experience_score': scores[:, 2],
+        'overall_score': scores.mean(axis=1).round(1), 'comments': _pick(rng, ['Good', 'Strong fundamentals', 'Average'], n),
+        'status': status.to_numpy(), 'screening_date': _datetime_text(_times(rng, n, when)),
+    })
+
+    ids, n, when = history(depth >= 2)
+    scores = rng.integers(4, 11, (n, 4))
+    tables['interviews'] = pd.DataFrame({
+        'id': np.arange(1, n + 1), 'candidate_id': ids, 'interviewer_name': _pick(rng, PEOPLE, n),
+        'interview_type': _pick(rng, ['Technical', 'HR', 'Final'], n),
+        'technical_score': scores[:, 0], 'problem_solving_score': scores[:, 1],
+        'communication_score': scores[:, 2], 'cultural_fit_score': scores[:, 3],
+        'overall_score': scores.mean(axis=1).round(1), 'comments': _pick(rng, ['Good', 'Recommend for offer'], n),
+        'status': np.where(stage[depth >= 2] == 'Interview Hold', 'Hold', 'Shortlisted'),
+        'interview_date': _datetime_text(_times(rng, n, when + np.timedelta64(15, 'D'))),
+    })
+
+    ids, n, when = history(depth >= 3)
+    offered = when + np.timedelta64(30, 'D')
+    tables['offers'] = pd.DataFrame({
+        'id': np.arange(1, n + 1), 'candidate_id': ids, 'job_title': _pick(rng, TITLES, n),
+        'salary': rng.integers(3, 30, n) * 100000, 'joining_date': _date_text(offered + np.timedelta64(20, 'D')),
+        'department': _pick(rng, DEPARTMENTS, n), 'location': _pick(rng, LOCATIONS, n),
+        'benefits': 'Health insurance, flexible PTO', 'offer_letter_generated': _flags(rng, n),
+        'offer_date': _datetime_text(offered), 'status': 'Sent',
+    })
+
+    ids, n, when = history(depth >= 4)
+    tables['onboarding'] = pd.DataFrame({
+        'id': np.arange(1, n + 1), 'candidate_id': ids,
+        **{column: _flags(rng, n, 0.9) for column in TABLE_HEADERS['onboarding'][2:8]},
+        'comments': 'Onboarding on track', 'onboarding_date': _datetime_text(when + np.timedelta64(50, 'D')),
+        'hr_representative': _pick(rng, PEOPLE, n),
+        'signed_offer_filename': [f'signed_offer_{i:03d}.pdf' for i in rng.integers(0, UPLOAD_POOL, n)],
+    })
+
+    ids, n, when = history(depth >= 5)
+    resigned = when + np.timedelta64(400, 'D')
+    done = rng.random(n) < 0.6
+    tables['resignations'] = pd.DataFrame({
+        'id': np.arange(1, n + 1), 'candidate_id': ids, 'resignation_date': _date_text(resigned),
+        'last_working_date': _date_text(resigned + np.timedelta64(30, 'D')), 'reason': _pick(rng, REASONS, n),
+        'exit_interview_completed': np.where(done, 'Yes', 'No'), 'laptop_returned': np.where(done, 'Yes', 'No'),
+        'id_card_returned': np.where(done, 'Yes', 'No'), 'clearance_completed': np.where(done, 'Yes', 'No'),
+        'final_settlement': np.where(done, 'Completed', 'Pending'), 'comments': '',
+        'hr_representative': _pick(rng, PEOPLE, n), 'updated_at': _datetime_text(resigned),
+        'completion_status': np.where(done, 'Completed', 'In Progress'), 'notice_period_days': 30,
+        'notice_period_end_date': _date_text(resigned + np.timedelta64(30, 'D')),
+        'resignation_letter_filename': [f'resignation_letter_{i:03d}.pdf' for i in rng.integers(0, UPLOAD_POOL, n)],
+        'acceptance_letter_filename': '', 'relieving_letter_filename': '',
+    })
+
+    for name, df in tables.items():
+        df[TABLE_HEADERS[name]].to_csv(os.path.join(csv_folder, f'{name}.csv'), index=False)
+
+    return {
+        'requisitions': [int(i) for i in req_ids],
+        'stages': {s: [int(i) for i in cand_ids[stage == s]] for s in stage_names},
+        'rows': {name: len(df) for name, df in tables.items()},
+    }
+
+
+def _proc_io():
+    """Bytes this process has read so far (all reads, and those that reached the disk), if the OS reports it"""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['rchar']), int(fields['read_bytes'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class RssSampler:
+    """Peak resident set size while a block runs, polled from a thread.
+
+    Where the current RSS cannot be read, the process-wide peak is reported.
+    """
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes() or 0)
+
+    def __enter__(self):
+        current = _rss_bytes()
+        if current is not None:
+            self.peak = current
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, _rss_bytes() or 0)
+        else:
+            self.peak = _peak_rss_bytes()
+
+
+def _bulk_csv(rng, req_id, rows):
+    df = pd.DataFrame({
+        'requisition_id': req_id,
+        'name': pd.Series(_pick(rng, FIRST_NAMES, rows)) + ' ' + _pick(rng, LAST_NAMES, rows),
+        'email': [f'bulk.{rng.integers(1 << 40)}@example.com' for _ in range(rows)],
+        'phone': rng.integers(7000000000, 9999999999, rows).astype(str),
+        'experience': rng.integers(0, 20, rows),
+        'skills': pd.Series(_pick(rng, SKILLS, rows)) + ', ' + _pick(rng, SKILLS, rows),
+        'current_salary': 500000, 'expected_salary': 700000, 'notice_period': '30 days', 'source': 'Agency',
+        'resume_filename': '',
+    })
+    return df.to_csv(index=False).encode('utf-8')
+
+def route_drivers(data, rng, bulk_rows):
+    """(method, rule, make) for every route; make(i) returns the URL and form data of the i-th request"""
+    stages = data['stages']
+    reqs = data['requisitions']
+
+    def ids(*names):
+        pool = [i for name in names for i in stages[name]] or [1]
+        return lambda: int(pool[rng.integers(len(pool))])
+
+    def queue(*names):
+        """Candidates handed out once each, for writes that move them along the pipeline"""
+        pool = [i for name in names for i in stages[name]]
+        order = rng.permutation(len(pool))
+        return lambda i: int(pool[order[i % len(pool)]])
+
+    any_candidate = ids(*stages)
+    employee = ids('Onboarded')
+    resigned = ids('Resigned')
+    offered = ids('Offer', 'Onboarded', 'Resigned')
+    requisition = lambda: int(reqs[rng.integers(len(reqs))])
+    applied, shortlisted, interviewed = queue('Applied'), queue('Screening'), queue('Interview')
+    offers, onboarded = queue('Offer'), queue('Onboarded')
+    held = queue('Screening Hold')  # re-held in batches, a move that stays valid on every repeat
+    open_requisitions = list(reqs)
+    file = lambda payload, name: (io.BytesIO(payload), name)
+
+    get = lambda url: (lambda i: (url() if callable(url) else url, None))
+    drivers = [
+        ('GET', '/', get('/')),
+        ('GET', '/requisitions-page', get('/requisitions-page')),
+        ('GET', '/candidates-page', get('/candidates-page')),
+        ('GET', '/candidates-page?stage&sort', get('/candidates-page?stage=Interview&sort=name&order=desc')),
+        ('GET', '/screening-page', get('/screening-page')),
+        ('GET', '/interviews-page', get('/interviews-page')),
+        ('GET', '/offers-page', get('/offers-page')),
+        ('GET', '/onboarding-page', get('/onboarding-page')),
+        ('GET', '/employees-page', get('/employees-page')),
+        ('GET', '/resignations-page', get('/resignations-page')),
+        ('GET', '/requisitions/<int:req_id>', get(lambda: f'/requisitions/{requisition()}')),
+        ('GET', '/candidate/<int:cand_id>', get(lambda: f'/candidate/{any_candidate()}')),
+        ('GET', '/employee/<int:emp_id>', get(lambda: f'/employee/{employee()}')),
+        ('GET', '/screening/<int:cand_id>', get(lambda: f'/screening/{any_candidate()}')),
+        ('GET', '/interview/<int:cand_id>', get(lambda: f'/interview/{any_candidate()}')),
+        ('GET', '/offer/<int:cand_id>', get(lambda: f'/offer/{any_candidate()}')),
+        ('GET', '/offer-letter/<int:cand_id>', get(lambda: f'/offer-letter/{offered()}')),
+        ('GET', '/requisitions/<int:req_id>/offer-letters.zip',
+         get(lambda: f'/requisitions/{requisition()}/offer-letters.zip')),
+        ('GET', '/onboarding/<int:cand_id>', get(lambda: f'/onboarding/{employee()}')),
+        ('GET', '/resignation/<int:cand_id>', get(lambda: f'/resignation/{employee()}')),
+        ('GET', '/resignation-details/<int:cand_id>', get(lambda: f'/resignation-details/{resigned()}')),
+        ('GET', '/candidates/<int:cand_id>/resume', get(lambda: f'/candidates/{any_candidate()}/resume')),
+        ('GET', '/candidates/<int:cand_id>/resume-preview', get(lambda: f'/candidates/{any_candidate()}/resume-preview')),
+        ('GET', '/signed-offer/<int:cand_id>/download', get(lambda: f'/signed-offer/{employee()}/download')),
+        ('GET', '/signed-offer/<int:cand_id>/preview', get(lambda: f'/signed-offer/{employee()}/preview')),
+        ('GET', '/resignation-doc/<int:cand_id>/<doc_type>/download',
+         get(lambda: f'/resignation-doc/{resigned()}/resignation_letter/download')),
+        ('GET', '/resignation-doc/<int:cand_id>/<doc_type>/preview',
+         get(lambda: f'/resignation-doc/{resigned()}/resignation_letter/preview')),
+        ('GET', '/candidates/bulk-sample', get('/candidates/bulk-sample')),
+        ('GET', '/search', get(lambda: f'/search?q={rng.choice(SKILLS).lower()}+{rng.choice(FIRST_NAMES).lower()}')),
+        ('GET', '/download/<csv_name>', get('/download/candidates')),
+        ('GET', '/analytics', get('/analytics')),
+        ('GET', '/analytics?format=json', get('/analytics?format=json')),
+        ('GET', '/metrics', get('/metrics')),
+        ('POST', '/requisitions', lambda i: ('/requisitions', dict(
+            start_date='2025-01-01', end_date='2025-03-01', manager_name='Bench', position_title=str(rng.choice(TITLES)),
+            job_description='Benchmark opening', number_of_openings='2', department=str(rng.choice(DEPARTMENTS)),
+            location=str(rng.choice(LOCATIONS)), salary_min='500000', salary_max='900000', job_type='Full time',
+            requirements='Python, SQL'))),
+        ('POST', '/requisitions/<int:req_id>/candidates', lambda i: (f'/requisitions/{requisition()}/candidates', dict(
+            name=f'Bench Candidate {i}', email=f'bench{i}@example.com', phone='9000000000', experience='3',
+            skills='Python, SQL', source='Referral', resume=file(b'Benchmark resume, Python and SQL', f'bench_{i}.txt')))),
+        ('POST', '/candidates/transitions', lambda i: ('/candidates/transitions', dict(
+            candidate_ids=[str(held(i * 50 + n)) for n in range(50)], stage='Screening Hold'))),
+        ('POST', '/candidates/bulk-upload', lambda i: ('/candidates/bulk-upload', dict(
+            bulk_files=[file(_bulk_csv(rng, requisition(), bulk_rows), f'bulk_{i}.csv')]))),
+        ('POST', '/screening', lambda i: ('/screening', dict(
+            candidate_id=str(applied(i)), screener_name='Bench', technical_score='7', communication_score='8',
+            experience_score='6', overall_score='7', comments='ok', status='Shortlisted'))),
+        ('POST', '/interview', lambda i: ('/interview', dict(
+            candidate_id=str(shortlisted(i)), interviewer_name='Bench', interview_type='Technical', technical_score='8',
+            problem_solving_score='7', communication_score='8', cultural_fit_score='9', overall_score='8',
+            comments='good', status='Shortlisted'))),
+        ('POST', '/offer', lambda i: ('/offer', dict(
+            candidate_id=str(interviewed(i)), job_title='Developer', salary='800000', joining_date='2025-06-01',
+            department='IT', location='Chennai', benefits='Standard'))),
+        ('POST', '/onboarding', lambda i: ('/onboarding', dict(
+            candidate_id=str(offers(i)), documents_verified='Yes', laptop_assigned='Yes', comments='bench',
+            hr_representative='Lisa Brown', signed_offer=file(b'%PDF-1.4 signed', 'signed.pdf')))),
+        ('POST', '/resignation', lambda i: ('/resignation', dict(
+            candidate_id=str(onboarded(i)), resignation_date='2025-05-01', last_working_date='2025-05-31',
+            reason='Relocation', comments='bench', hr_representative='Lisa Brown', notice_period_days='30',
+            resignation_letter=file(b'%PDF-1.4 letter', 'letter.pdf')))),
+        ('POST', '/add-employee-direct', lambda i: ('/add-employee-direct', dict(
+            name=f'Direct Hire {i}', email=f'direct{i}@example.com', phone='9000000001', department='Ops',
+            position='Lead', join_date='2025-01-01'))),
+        ('POST', '/requisitions/<int:req_id>/close',
+         lambda i: (f'/requisitions/{open_requisitions[i % len(open_requisitions)]}/close', {})),
+        ('POST', '/stats/rebuild', lambda i: ('/stats/rebuild', {})),
+    ]
+    return drivers
+
+
+def _summary(latencies):
+    values = np.array(latencies) * 1000
+    return round(float(np.percentile(values, 50)), 3), round(float(np.percentile(values, 95)), 3)
+
+def run_scale(scale, options):
+    """Generate a dataset for one scale, drive every route and return the report for it"""
+    if options['workdir']:
+        os.makedirs(options['workdir'], exist_ok=True)
+    workdir = tempfile.mkdtemp(prefix=f'hr-bench-{scale}-', dir=options['workdir'])
+    try:
+        started = time.perf_counter()
+        data = generate_dataset(workdir, scale, options['seed'])
+        generate_seconds = time.perf_counter() - started
+        data_bytes = sum(os.path.getsize(os.path.join(workdir, 'csv_templates', f))
+                         for f in os.listdir(os.path.join(workdir, 'csv_templates')))
+
+        os.chdir(workdir)
+        os.environ['STORAGE_BACKEND'] = options['backend']
+        # Run background jobs inline, so a route's time includes its job instead of slowing later routes
+        os.environ['JOB_WORKERS'] = '0'
+        os.environ['SQLITE_PATH'] = os.path.join(workdir, 'csv_templates', 'hr.sqlite3')
+        sys.path.insert(0, REPO_DIR)
+        import app as hr_app
+        logging.disable(logging.INFO)
+        app = hr_app.app
+        app.config['PROPAGATE_EXCEPTIONS'] = False
+        if options['backend'] == 'sqlite':
+            result = app.test_cli_runner().invoke(args=['migrate-to-sqlite'])
+            if result.exception:
+                raise result.exception
+        client = app.test_client()
+        rng = np.random.default_rng(options['seed'] + 1)
+
+        routes = {}
+        for method, rule, make in route_drivers(data, rng, options['bulk_rows']):
+            latencies, statuses, response_bytes = [], {}, 0
+            io_before = _proc_io()
+            with RssSampler() as rss:
+                for i in range(options['repeat'] + 1):
+                    url, form = make(i)
+                    started = time.perf_counter()
+                    response = client.open(url, method=method, data=form, headers={'Referer': '/'},
+                                           content_type='multipart/form-data' if form is not None else None)
+                    body = response.get_data()
+                    latencies.append(time.perf_counter() - started)
+                    response.close()
+                    response_bytes += len(body)
+                    statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            io_after = _proc_io()
+            requests = len(latencies)
+            p50, p95 = _summary(latencies[1:])
+            routes[f'{method} {rule}'] = {
+                'requests': requests,
+                'first_ms': round(latencies[0] * 1000, 3),
+                'p50_ms': p50,
+                'p95_ms': p95,
+                'peak_rss_mb': round(rss.peak / 2 ** 20, 1),
+                'read_kb_per_request': round((io_after[0] - io_before[0]) / requests / 1024, 1) if io_before else None,
+                'disk_read_kb_per_request': round((io_after[1] - io_before[1]) / requests / 1024, 1) if io_before else None,
+                'response_kb': round(response_bytes / requests / 1024, 1),
+                'statuses': statuses,
+            }
+
+        driven = {key.split(' ', 1)[1].split('?')[0] for key in routes}
+        uncovered = sorted(rule.rule for rule in app.url_map.iter_rules()
+                           if rule.endpoint != 'static' and rule.rule not in driven)
+        return {
+            'scale': scale,
+            'rows': data['rows'],
+            'data_mb': round(data_bytes / 2 ** 20, 1),
+            'generate_seconds': round(generate_seconds, 2),
+            'peak_rss_mb': round(_peak_rss_bytes() / 2 ** 20, 1),
+            'routes': routes,
+            'uncovered_routes': uncovered,
+        }
+    finally:
+        os.chdir(REPO_DIR)
+        if not options['keep']:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(run):
+    print(f"\nscale {run['scale']}: {run['data_mb']} MB of CSV, generated in {run['generate_seconds']}s, "
+          f"peak RSS {run['peak_rss_mb']} MB")
+    print(f"{'route':58} {'p50 ms':>9} {'p95 ms':>9} {'first ms':>9} {'RSS MB':>8} {'read KB':>9}  status")
+    for key, r in run['routes'].items():
+        read_kb = '-' if r['read_kb_per_request'] is None else r['read_kb_per_request']
+        statuses = ' '.join(f'{code}x{count}' for code, count in sorted(r['statuses'].items()))
+        print(f"{key:58} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['first_ms']:>9} {r['peak_rss_mb']:>8} {read_kb:>9}  {statuses}")
+    if run['uncovered_routes']:
+        print('routes without a driver:', ', '.join(run['uncovered_routes']))
+
+def compare(results, baseline, threshold):
+    """Routes whose p50 grew by more than threshold (and at least 1 ms) against the baseline run of the same scale"""
+    previous = {str(run['scale']): run for run in baseline['runs']}
+    regressions = []
+    for run in results['runs']:
+        before = previous.get(str(run['scale']))
+        if not before:
+            continue
+        for key, r in run['routes'].items():
+            old = before['routes'].get(key)
+            if old and r['p50_ms'] > old['p50_ms'] * threshold and r['p50_ms'] - old['p50_ms'] >= 1:
+                regressions.append((run['scale'], key, old['p50_ms'], r['p50_ms']))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scale', type=int, action='append', help='Candidates to generate; repeat for several scales (default 10000).')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed requests per route, after one cold request.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--bulk-rows', type=int, default=500, help='Rows per file in the bulk upload requests.')
+    parser.add_argument('--workdir', default=None, help='Where to create the generated data (default: system temp).')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated data directories.')
+    parser.add_argument('--out', default=None, help='Write the results to this JSON file.')
+    parser.add_argument('--compare', default=None, help='Baseline JSON from an earlier run to compare against.')
+    parser.add_argument('--threshold', type=float, default=1.25, help='p50 growth that counts as a regression.')
+    parser.add_argument('--run-file', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    options = {'seed': args.seed, 'repeat': args.repeat, 'backend': args.backend, 'bulk_rows': args.bulk_rows,
+               'workdir': args.workdir, 'keep': args.keep}
+    if args.run_file:
+        # Child process for a single scale: the app is imported here and nowhere else
+        with open(args.run_file, 'w') as f:
+            json.dump(run_scale(args.scale[0], options), f)
+        return
+
+    results = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'options': options,
+        'runs': [],
+    }
+    for scale in args.scale or [10000]:
+        with tempfile.NamedTemporaryFile(suffix='.json') as run_file:
+            command = [sys.executable, os.path.abspath(__file__), '--scale', str(scale), '--repeat', str(args.repeat),
+                       '--seed', str(args.seed), '--backend', args.backend, '--bulk-rows', str(args.bulk_rows),
+                       '--run-file', run_file.name] + (['--workdir', args.workdir] if args.workdir else []) \
+                      + (['--keep'] if args.keep else [])
+            subprocess.run(command, check=True)
+            run = json.load(run_file)
+        print_report(run)
+        results['runs'].append(run)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nresults written to {args.out}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        changed = {key: baseline['options'].get(key) for key in ('backend', 'seed', 'repeat', 'bulk_rows')
+                   if baseline['options'].get(key) != options[key]}
+        if changed:
+            print(f'note: the baseline was run with different options: {changed}')
+        regressions = compare(results, baseline, args.threshold)
+        for scale, key, before, after in regressions:
+            print(f'REGRESSION scale {scale} {key}: p50 {before} ms -> {after} ms')
+        if regressions:
+            sys.exit(1)
+        print('no regressions against', args.compare)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Text extraction for uploaded resumes.
+
+Runs in the resume extraction process pool. Spawned workers import only
+this module, so it must stay free of import-time side effects and must not
+import app.py.
+"""
+import os
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+
+from pypdf import PdfReader
+
+def extract_resume_text(file_path, filename):
+    """Plain text of a .txt, .docx or .pdf file ('' for other types)"""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.txt':
+        with open(file_path, 'rb') as f:
+            return f.read().decode('utf-8', errors='replace')
+    if ext == '.docx':
+        namespace = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+        with zipfile.ZipFile(file_path) as docx:
+            root = ET.fromstring(docx.read('word/document.xml'))
+        return '\n'.join(''.join(t.text or '' for t in p.iter(f'{namespace}t')) for p in root.iter(f'{namespace}p'))
+    if ext == '.pdf':
+        return '\n'.join(page.extract_text() or '' for page in PdfReader(file_path).pages)
+    return ''
+
+def extract_resume_to_cache(file_path, filename, text_path):
+    """Process-pool job: extract a file's text and write it atomically to text_path"""
+    text = extract_resume_text(file_path, filename)
+    fd, tmp_path = tempfile.mkstemp(prefix='.extract.', suffix='.tmp', dir=os.path.dirname(text_path))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, text_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
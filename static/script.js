@@ -136,40 +136,6 @@ document.addEventListener('DOMContentLoaded', function() {
         }, 100);
     });
 
-    // Enhanced table sorting (simple implementation)
-    const tableHeaders = document.querySelectorAll('th[data-sort]');
-    tableHeaders.forEach(header => {
-        header.style.cursor = 'pointer';
-        header.addEventListener('click', function() {
-            const table = this.closest('table');
-            const tbody = table.querySelector('tbody');
-            const rows = Array.from(tbody.querySelectorAll('tr'));
-            const column = this.dataset.sort;
-            const isAscending = !this.classList.contains('sort-asc');
-            
-            // Remove existing sort classes
-            tableHeaders.forEach(h => h.classList.remove('sort-asc', 'sort-desc'));
-            
-            // Add current sort class
-            this.classList.add(isAscending ? 'sort-asc' : 'sort-desc');
-            
-            // Sort rows
-            rows.sort((a, b) => {
-                const aVal = a.querySelector(`td:nth-child(${this.cellIndex + 1})`).textContent.trim();
-                const bVal = b.querySelector(`td:nth-child(${this.cellIndex + 1})`).textContent.trim();
-                
-                if (isAscending) {
-                    return aVal.localeCompare(bVal, undefined, {numeric: true});
-                } else {
-                    return bVal.localeCompare(aVal, undefined, {numeric: true});
-                }
-            });
-            
-            // Append sorted rows
-            rows.forEach(row => tbody.appendChild(row));
-        });
-    });
-
     // Keyboard shortcuts
     document.addEventListener('keydown', function(e) {
         // Ctrl+N for new requisition
@@ -0,0 +1,291 @@
+"""Views of the tables kept current by the write path: dashboard counters and the search index.
+
+WriteCoordinator hands each view the operations of a commit before it is
+applied (delta) and the outcome after (commit). The views read tables
+through the source app.py passes in (see TableSource there), so this
+module does not import app.py.
+"""
+import bisect
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+SEARCH_TOKEN_PATTERN = re.compile(r'[a-z0-9]+[+#]*')
+
+class DashboardStats:
+    """Dashboard counters materialized per source table and kept current by write deltas.
+
+    Each table's counts are stored with the table signature they match. A
+    commit whose pre-write signature matches adds its delta and moves the
+    signature forward; any other change (a full rewrite, a write from another
+    worker) leaves the table stale, and the next read recounts just that table.
+    """
+
+    COUNTERS = {
+        'open_requisitions': ('requisitions', 'status', {'Open'}),
+        'active_candidates': ('candidates', 'stage', {'Applied', 'Screening', 'Screening Hold', 'Interview', 'Interview Hold'}),
+        'interviews_pending': ('candidates', 'stage', {'Screening', 'Interview'}),
+        'offers_extended': ('offers', None, None),  # every offer row counts
+    }
+
+    def __init__(self, tables):
+        self.tables = tables
+        self._counts = {}  # table -> {counter: value}
+        self._signatures = {}
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def _counters(self, table):
+        return {name: spec[1:] for name, spec in self.COUNTERS.items() if spec[0] == table}
+
+    @staticmethod
+    def _count(df, column, values):
+        if column is None:
+            return len(df)
+        if df.empty or column not in df.columns:
+            return 0
+        return int(df[column].isin(values).sum())
+
+    def _recount(self, table):
+        signature = self.tables.signature(table)
+        columns = [column for column, _ in self._counters(table).values() if column] or ['id']
+        df = self.tables.read(table, columns)
+        counts = {name: self._count(df, column, values) for name, (column, values) in self._counters(table).items()}
+        with self._lock:
+            self._counts[table] = counts
+            self._signatures[table] = signature
+            self.rebuilds += 1
+
+    def rebuild(self):
+        """Recount every counter from the tables"""
+        for table in dict.fromkeys(spec[0] for spec in self.COUNTERS.values()):
+            self._recount(table)
+        return self.get()
+
+    def get(self):
+        """Current counter values, recounting only tables changed outside the tracked writes"""
+        for table in dict.fromkeys(spec[0] for spec in self.COUNTERS.values()):
+            with self._lock:
+                current = table in self._counts and self._signatures.get(table) == self.tables.signature(table)
+            if not current:
+                self._recount(table)
+        with self._lock:
+            return {name: self._counts[spec[0]].get(name, 0) for name, spec in self.COUNTERS.items()}
+
+    def delta(self, csv_file_path, operations):
+        """Counter changes a batch of writes will make, or None if they cannot be derived.
+
+        Must run before the batch is applied, since updates need the old values.
+        """
+        counters = self._counters(self.tables.name(csv_file_path))
+        if not counters:
+            return {}
+        deltas = []
+        for op in operations:
+            if op[0] == 'append':
+                rows = pd.DataFrame(op[1])
+                deltas.append({name: self._count(rows, column, values) for name, (column, values) in counters.items()})
+            elif op[0] == 'update':
+                touched = {name: spec for name, spec in counters.items() if spec[0] in op[2]}
+                if touched and len(operations) > 1:
+                    return None  # later ops in the batch could see this one's result
+                columns = list(op[1]) + [column for column, _ in touched.values()]
+                matched = self.tables.match(self.tables.rows(csv_file_path, columns), op[1]) if touched else pd.DataFrame()
+                deltas.append({name: (len(matched) if op[2][column] in values else 0) - self._count(matched, column, values)
+                               for name, (column, values) in touched.items()})
+            elif op[0] == 'update_each':
+                key, changed_column, changes = op[1:]
+                touched = {name: spec for name, spec in counters.items() if spec[0] == changed_column}
+                if touched and len(operations) > 1:
+                    return None
+                current = self.tables.rows(csv_file_path, [key, changed_column]) if touched else pd.DataFrame()
+                hit, new_values = self.tables.update_each_hits(current, key, changed_column, changes)
+                deltas.append({name: int(new_values.isin(values).sum()) - int(current.loc[hit, column].isin(values).sum())
+                               for name, (column, values) in touched.items()})
+            else:
+                return None
+        return deltas
+
+    def commit(self, csv_file_path, deltas, results, before, after):
+        """Apply the deltas of the successful writes of a commit that took the table from before to after"""
+        table = self.tables.name(csv_file_path)
+        if not self._counters(table):
+            return
+        with self._lock:
+            if deltas is None or table not in self._counts or self._signatures.get(table) != before:
+                self._signatures.pop(table, None)
+                return
+            counts = self._counts[table]
+            for delta, ok in zip(deltas, results):
+                if ok:
+                    for name, change in delta.items():
+                        counts[name] += change
+            self._signatures[table] = after
+
+def search_tokens(value):
+    """Lowercased word tokens of a cell; keeps the + and # of names like C++ and C#"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return []
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # phone numbers read back as floats
+    return SEARCH_TOKEN_PATTERN.findall(str(value).lower())
+
+class SearchIndex:
+    """In-process inverted index over the text columns in SEARCH_FIELDS, ranked with BM25.
+
+    Postings map token -> {row id: field-weighted term frequency}. Like
+    DashboardStats, an index is kept with the table signature it matches:
+    appended rows are indexed as they are committed, and any other change
+    leaves the table to be re-indexed on the next search.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    MAX_PREFIX_EXPANSIONS = 50
+
+    def __init__(self, tables, fields):
+        self.tables = tables
+        self.fields = fields
+        self.sources = {}  # column -> function returning the text a cell refers to
+        self._tables = {}  # table -> {'postings', 'docs', 'lengths', 'total_length', 'vocab', 'signature'}
+        self._lock = threading.RLock()
+        self.builds = 0
+
+    def _index_rows(self, state, table, rows):
+        postings, docs = state['postings'], state['docs']
+        for row in rows:
+            try:
+                doc_id = int(row['id'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if doc_id in docs:
+                self._remove(state, doc_id)
+            weights = {}
+            for field, weight in self.fields[table].items():
+                value = row.get(field)
+                if field in self.sources:
+                    value = self.sources[field](value)
+                for token in search_tokens(value):
+                    weights[token] = weights.get(token, 0) + weight
+            for token, weight in weights.items():
+                if token not in postings:
+                    postings[token] = {}
+                    state['vocab'] = None
+                postings[token][doc_id] = weight
+            docs[doc_id] = weights
+            state['lengths'][doc_id] = sum(weights.values())
+            state['total_length'] += state['lengths'][doc_id]
+
+    def _remove(self, state, doc_id):
+        weights = state['docs'].pop(doc_id)
+        for token in weights:
+            state['postings'][token].pop(doc_id, None)
+        state['total_length'] -= state['lengths'].pop(doc_id)
+
+    def _build(self, table):
+        signature = self.tables.signature(table)
+        records = self.tables.records(table, ['id', *self.fields[table]])
+        state = {'postings': {}, 'docs': {}, 'lengths': {}, 'total_length': 0.0, 'vocab': None, 'signature': signature}
+        if records and 'id' in records[0]:
+            self._index_rows(state, table, records)
+        self.builds += 1
+        return state
+
+    def _current(self, table):
+        state = self._tables.get(table)
+        if state is None or state['signature'] != self.tables.signature(table):
+            state = self._tables[table] = self._build(table)
+        return state
+
+    def rebuild(self):
+        with self._lock:
+            self._tables = {table: self._build(table) for table in self.fields}
+
+    def reindex(self, table, rows):
+        """Re-index rows whose source text changed, if the table's index is built and current"""
+        with self._lock:
+            state = self._tables.get(table)
+            if state is not None and state['signature'] == self.tables.signature(table):
+                self._index_rows(state, table, rows)
+
+    def delta(self, csv_file_path, operations):
+        """Rows a batch of writes will add to the index, or None if it must be rebuilt"""
+        table = self.tables.name(csv_file_path)
+        if table not in self.fields:
+            return {}
+        deltas = []
+        for op in operations:
+            if op[0] == 'append' and all('id' in row for row in op[1]):
+                deltas.append(op[1])
+            elif op[0] == 'update' and not any(col in self.fields[table] for col in op[2]):
+                deltas.append([])
+            elif op[0] == 'update_each' and op[2] not in self.fields[table]:
+                deltas.append([])
+            else:
+                return None
+        return deltas
+
+    def commit(self, csv_file_path, deltas, results, before, after):
+        """Index the rows of the successful writes of a commit that took the table from before to after"""
+        table = self.tables.name(csv_file_path)
+        with self._lock:
+            state = self._tables.get(table)
+            if table not in self.fields or state is None:
+                return
+            if deltas is None or state['signature'] != before:
+                del self._tables[table]
+                return
+            for rows, ok in zip(deltas, results):
+                if ok:
+                    self._index_rows(state, table, rows)
+            state['signature'] = after
+
+    def _expand(self, state, term):
+        """Tokens starting with term, for matching the word still being typed"""
+        if state['vocab'] is None:
+            state['vocab'] = sorted(state['postings'])
+        vocab = state['vocab']
+        start = bisect.bisect_left(vocab, term)
+        matches = []
+        for token in vocab[start:start + self.MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(term):
+                break
+            matches.append(token)
+        return matches
+
+    def search(self, query, table, limit=20):
+        """Return [(row id, score)] for rows containing every query term, best first.
+
+        The last term also matches as a prefix unless the query ends in a space.
+        """
+        terms = list(dict.fromkeys(search_tokens(query)))
+        if not terms:
+            return []
+        with self._lock:
+            state = self._current(table)
+            doc_count = len(state['docs'])
+            if not doc_count:
+                return []
+            average_length = state['total_length'] / doc_count or 1.0
+            scores = None
+            for i, term in enumerate(terms):
+                expand = i == len(terms) - 1 and not query[-1:].isspace()
+                tokens = self._expand(state, term) if expand else [term]
+                term_scores = {}
+                for token in tokens:
+                    postings = state['postings'].get(token, {})
+                    idf = np.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, tf in postings.items():
+                        length = state['lengths'][doc_id]
+                        score = idf * tf * (self.K1 + 1) / (tf + self.K1 * (1 - self.B + self.B * length / average_length))
+                        term_scores[doc_id] = max(term_scores.get(doc_id, 0.0), score)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc_id: score + term_scores[doc_id] for doc_id, score in scores.items() if doc_id in term_scores}
+                if not scores:
+                    return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(doc_id, float(score)) for doc_id, score in ranked[:limit]]
@@ -0,0 +1,38 @@
+"""Shared setup: the app runs against a scratch copy of the sample tables.
+
+app.py resolves csv_templates/ and uploads/ against the working directory
+when it is imported, so the copy is made and entered before any test
+module imports it.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_TABLES = os.path.join(REPO_ROOT, 'csv_templates')
+WORKDIR = tempfile.mkdtemp(prefix='hr-tests-')
+atexit.register(shutil.rmtree, WORKDIR, ignore_errors=True)
+
+os.makedirs(os.path.join(WORKDIR, 'csv_templates'))
+os.makedirs(os.path.join(WORKDIR, 'uploads'))
+os.chdir(WORKDIR)
+os.environ['STORAGE_BACKEND'] = 'csv'
+os.environ['JOB_WORKERS'] = '0'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+@pytest.fixture
+def app_module():
+    """The app with freshly copied sample tables and no sequences or journals left by earlier tests"""
+    import app
+    for name in os.listdir(SAMPLE_TABLES):
+        if name.endswith('.csv'):
+            shutil.copy(os.path.join(SAMPLE_TABLES, name), os.path.join(app.CSV_FOLDER, name))
+    for folder in (app.SEQUENCE_FOLDER, app.JOURNAL_FOLDER):
+        for entry in os.scandir(folder):
+            os.remove(entry.path)
+    for table in app.TABLE_NAMES:
+        app.table_cache.invalidate(os.path.join(app.CSV_FOLDER, f'{table}.csv'))
+    return app
@@ -0,0 +1,37 @@
+import io
+import os
+
+import pytest
+
+@pytest.fixture
+def blobs(app_module, tmp_path):
+    folder = tmp_path / 'blobs'
+    folder.mkdir()
+    return app_module.BlobStore(str(folder))
+
+def test_identical_uploads_share_a_blob_until_both_are_released(blobs):
+    blobs.put(io.BytesIO(b'resume body'), 'a_resume.pdf')
+    blobs.put(io.BytesIO(b'resume body'), 'b_resume.pdf')
+    path = blobs.path('a_resume.pdf')
+    assert path == blobs.path('b_resume.pdf')
+    assert blobs.stats() == {'references': 2, 'blobs': 1}
+
+    blobs.release('a_resume.pdf')
+    assert blobs.path('a_resume.pdf') is None
+    assert os.path.exists(path)
+
+    blobs.release('b_resume.pdf')
+    assert not os.path.exists(path)
+    assert blobs.stats() == {'references': 0, 'blobs': 0}
+
+def test_releases_are_seen_by_other_processes_reading_the_log(app_module, blobs):
+    blobs.put(io.BytesIO(b'one'), 'one.txt')
+    blobs.put(io.BytesIO(b'two'), 'two.txt')
+    blobs.release('one.txt')
+    blobs.release('unknown.txt')  # nothing to drop
+    blobs.release('')
+
+    reopened = app_module.BlobStore(blobs.folder)
+    assert reopened.names() == ['two.txt']
+    with open(reopened.path('two.txt'), 'rb') as f:
+        assert f.read() == b'two'
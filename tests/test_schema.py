@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+def test_conform_row_canonicalizes_declared_columns(app_module):
+    row = app_module.conform_row('offers', {
+        'id': '7', 'candidate_id': 3.0, 'salary': '700000.50', 'offer_letter_generated': 'yes',
+        'joining_date': ' 2025-10-01 ', 'status': 'Accepted', 'notes': ' kept as is ',
+    })
+    assert row == {
+        'id': 7, 'candidate_id': 3, 'salary': 700000.5, 'offer_letter_generated': 'Yes',
+        'joining_date': '2025-10-01', 'status': 'Accepted', 'notes': ' kept as is ',
+    }
+
+def test_conform_row_keeps_free_form_numbers_and_dates(app_module):
+    row = app_module.conform_row('candidates', {'experience': '2.5', 'join_date': '01/10/2025'})
+    assert row == {'experience': 2.5, 'join_date': '01/10/2025'}
+    assert app_module.conform_row('candidates', {'experience': '3'}) == {'experience': 3}
+    assert app_module.conform_row('candidates', {'experience': ''}) == {'experience': None}
+
+def test_conform_row_rejects_ids_and_flags_that_do_not_fit(app_module):
+    with pytest.raises(ValueError, match='candidate_id'):
+        app_module.conform_row('screening', {'candidate_id': 'abc'})
+    with pytest.raises(ValueError, match='technical_score'):
+        app_module.conform_row('screening', {'technical_score': '7.5'})
+    with pytest.raises(ValueError, match='laptop_assigned'):
+        app_module.conform_row('onboarding', {'laptop_assigned': 'maybe'})
+
+def test_conformed_rows_round_trip_through_typed_loading(app_module, tmp_path):
+    rows = [
+        app_module.conform_row('offers', {'id': 1, 'candidate_id': 4, 'salary': '50000', 'offer_letter_generated': 'No',
+                                          'joining_date': '2025-01-15', 'offer_date': '2025-01-02 09:30:00',
+                                          'department': 'IT', 'status': 'Pending'}),
+        app_module.conform_row('offers', {'id': 2, 'candidate_id': 5, 'salary': '', 'offer_letter_generated': 'YES',
+                                          'joining_date': '', 'offer_date': '2025-02-03 14:00:00',
+                                          'department': 'HR', 'status': 'Accepted'}),
+    ]
+    path = tmp_path / 'offers.csv'
+    pd.DataFrame(rows).to_csv(path, index=False)
+    df = app_module.CsvStorage._parse(str(path), 'offers')
+
+    assert isinstance(df['id'].dtype, pd.Int64Dtype)
+    assert isinstance(df['department'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['offer_letter_generated'].dtype, pd.BooleanDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df['joining_date'])
+    records = app_module.to_records(df)
+    for record, row in zip(records, rows):
+        assert {col: (None if pd.isna(v) else v) for col, v in record.items()} == row
+
+def test_apply_schema_types_number_columns_by_their_values(app_module):
+    whole = app_module.apply_schema('candidates', pd.DataFrame({'experience': [3, 5]}))
+    fractional = app_module.apply_schema('candidates', pd.DataFrame({'experience': [3, 2.5]}))
+    assert isinstance(whole['experience'].dtype, pd.Int64Dtype)
+    assert fractional['experience'].dtype == 'float64'
+
+def test_apply_schema_keeps_a_column_that_does_not_fit_as_read(app_module):
+    df = pd.DataFrame({'id': ['1', '2'], 'join_date': ['2025-01-01', '01/10/2025']})
+    typed = app_module.apply_schema('candidates', df)
+    assert isinstance(typed['id'].dtype, pd.Int64Dtype)
+    assert typed['join_date'].tolist() == ['2025-01-01', '01/10/2025']
@@ -0,0 +1,33 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import pandas as pd
+
+def reserve_many(csv_file_path, rounds, count):
+    """Worker-process job: reserve rounds blocks of count IDs"""
+    import app
+    return [new_id for _ in range(rounds) for new_id in app.reserve_ids(csv_file_path, count)]
+
+def test_reserve_ids_is_unique_across_processes(app_module):
+    path = os.path.join(app_module.CSV_FOLDER, 'screening.csv')
+    start = app_module.max_existing_id(path)
+    with ProcessPoolExecutor(4, mp_context=multiprocessing.get_context('spawn')) as pool:
+        blocks = list(pool.map(reserve_many, [path] * 4, [25] * 4, [3] * 4))
+    issued = [new_id for block in blocks for new_id in block]
+    assert len(issued) == 300
+    assert sorted(issued) == list(range(start + 1, start + 301))
+
+def test_sequence_is_seeded_once_then_reseeded_on_demand(app_module):
+    path = os.path.join(app_module.CSV_FOLDER, 'requisitions.csv')
+    start = app_module.max_existing_id(path)
+    assert list(app_module.reserve_ids(path, 2)) == [start + 1, start + 2]
+
+    df = pd.read_csv(path, dtype=str)
+    restored = df.iloc[[0]].assign(id='500')
+    pd.concat([df, restored]).to_csv(path, index=False)  # edited outside the app
+    assert app_module.get_next_id(path) == start + 3  # the counter alone decides
+
+    assert app_module.reseed_ids(path) == 500
+    assert app_module.get_next_id(path) == 501
+    assert app_module.reseed_ids(path, floor=10) == 501  # never moves backwards
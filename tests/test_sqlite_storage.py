@@ -0,0 +1,33 @@
+import pytest
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'hr.sqlite3')
+
+def test_cached_columns_follow_schema_changes_from_other_connections(app_module, db_path):
+    path = 'csv_templates/candidates.csv'
+    storage = app_module.SqliteStorage(db_path)
+    storage.replace_table('candidates', ['id', 'name', 'experience'], [(1, 'Ann', '3')])
+    assert storage.columns(path) == ['id', 'name', 'experience']
+    assert str(storage.find(path, {'id': 1})['experience'].dtype) == 'Int64'
+
+    # Another process adds a column and a fractional experience
+    other = app_module.SqliteStorage(db_path)
+    other.append([{'id': 2, 'name': 'Bo', 'experience': '2.5', 'source': 'Referral'}],
+                 ['id', 'name', 'experience', 'source'], path)
+
+    assert storage.columns(path) == ['id', 'name', 'experience', 'source']
+    found = storage.find(path, {'id': 2})
+    assert found['experience'].tolist() == [2.5]
+    assert found['source'].astype(str).tolist() == ['Referral']
+    assert storage.find(path, {'id': 1})['experience'].tolist() == [3.0]
+
+def test_replaced_table_drops_cached_columns(app_module, db_path):
+    path = 'csv_templates/offers.csv'
+    storage = app_module.SqliteStorage(db_path)
+    storage.replace_table('offers', ['id', 'candidate_id'], [(1, 7)])
+    assert storage.columns(path) == ['id', 'candidate_id']
+
+    storage.replace_table('offers', ['id', 'status'], [(1, 'Accepted')])
+    assert storage.columns(path) == ['id', 'status']
+    assert storage.find(path, {'candidate_id': 7}).empty
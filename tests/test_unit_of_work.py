@@ -0,0 +1,72 @@
+import glob
+import os
+
+import pytest
+
+SCREENING = {'screener_name': 'B', 'technical_score': 7, 'communication_score': 8, 'experience_score': 6,
+             'overall_score': 7.0, 'comments': 'ok', 'status': 'Shortlisted', 'screening_date': '2025-05-01 10:00:00'}
+
+class Crash(BaseException):
+    pass
+
+def crash_after(app_module, monkeypatch, writes_done):
+    """Make the next unit's redo stop after its first writes_done table writes, as a killed process would"""
+    redo = app_module.storage._redo
+
+    def crashing(writes, replay=False):
+        redo(writes[:writes_done], replay)
+        raise Crash
+    monkeypatch.setattr(app_module.storage, '_redo', crashing)
+
+def paths(app_module):
+    return (os.path.join(app_module.CSV_FOLDER, 'screening.csv'),
+            os.path.join(app_module.CSV_FOLDER, 'candidates.csv'))
+
+def stage(app_module, candidate_id):
+    df = app_module.read_csv_safe(paths(app_module)[1])
+    return str(df.loc[df['id'] == candidate_id, 'stage'].iloc[0])
+
+def screening_ids(app_module):
+    return app_module.read_csv_safe(paths(app_module)[0])['id'].tolist()
+
+def interrupted_unit(app_module, monkeypatch, writes_done, row_id, candidate_id):
+    screening_path, _ = paths(app_module)
+    crash_after(app_module, monkeypatch, writes_done)
+    unit = app_module.UnitOfWork()
+    unit.append(dict(SCREENING, id=row_id, candidate_id=candidate_id), screening_path)
+    unit.update_candidate_stage(candidate_id, 'Screening')
+    with pytest.raises(Crash):
+        unit.commit()
+    monkeypatch.undo()
+    assert glob.glob(os.path.join(app_module.JOURNAL_FOLDER, '*.journal'))
+
+@pytest.mark.parametrize('writes_done', [0, 1])
+def test_recover_completes_an_interrupted_unit_once(app_module, monkeypatch, writes_done):
+    interrupted_unit(app_module, monkeypatch, writes_done, 9001, 3)
+
+    app_module.storage.recover()
+    app_module.storage.recover()  # a second replay finds nothing left to do
+
+    assert screening_ids(app_module).count(9001) == 1
+    assert stage(app_module, 3) == 'Screening'
+    assert not glob.glob(os.path.join(app_module.JOURNAL_FOLDER, '*.journal'))
+
+def test_next_write_replays_the_journal_first(app_module, monkeypatch):
+    interrupted_unit(app_module, monkeypatch, 0, 9001, 3)
+    screening_path, candidates_path = paths(app_module)
+
+    assert app_module.update_rows(candidates_path, {'id': 3}, {'stage': 'Interview'})
+
+    assert 9001 in screening_ids(app_module)
+    assert stage(app_module, 3) == 'Interview'  # the newer write lands after the replay
+
+def test_replay_leaves_tables_changed_since_the_crash(app_module, monkeypatch):
+    interrupted_unit(app_module, monkeypatch, 0, 9001, 3)
+    screening_path, candidates_path = paths(app_module)
+    # Written without going through the coordinator, so nothing replays the journal first
+    app_module.storage.apply_batch(candidates_path, [('update', {'id': 3}, {'stage': 'Rejected'})])
+
+    app_module.storage.recover()
+
+    assert stage(app_module, 3) == 'Rejected'
+    assert 9001 in screening_ids(app_module)
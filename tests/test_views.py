@@ -0,0 +1,52 @@
+import os
+
+from table_views import DashboardStats, SearchIndex
+
+def candidate(candidate_id, name, skills, stage='Applied'):
+    return {'id': candidate_id, 'requisition_id': 1, 'name': name, 'email': f'{name.split()[0].lower()}@example.com',
+            'phone': '5550100', 'experience': 3, 'skills': skills, 'stage': stage,
+            'applied_date': '2025-06-01 09:00:00', 'source': 'Referral'}
+
+def write_mix(app_module):
+    """Appends, single and keyed updates and a unit of work, as the routes issue them"""
+    candidates_path = os.path.join(app_module.CSV_FOLDER, 'candidates.csv')
+    requisitions_path = os.path.join(app_module.CSV_FOLDER, 'requisitions.csv')
+    assert app_module.append_rows_to_csv([candidate(9001, 'Ada Lovelace', 'Python, C++'),
+                                          candidate(9002, 'Grace Hopper', 'COBOL', stage='Screening')], candidates_path)
+    assert app_module.update_candidate_stage(9001, 'Interview')
+    assert app_module.update_rows(requisitions_path, {'id': 1}, {'status': 'Closed'})
+    assert all(r['ok'] for r in app_module.transition_candidates([(9002, 'Interview'), (9001, 'Offer')]))
+    unit = app_module.UnitOfWork()
+    unit.append({'id': 9100, 'candidate_id': 9001, 'salary': 90000, 'offer_date': '2025-06-20 10:00:00',
+                 'status': 'Pending'}, os.path.join(app_module.CSV_FOLDER, 'offers.csv'))
+    unit.update_candidate_stage(9001, 'Onboarded')
+    assert unit.commit()
+
+def test_dashboard_stats_deltas_match_a_rebuild(app_module):
+    stats = app_module.dashboard_stats
+    before = stats.get()
+    rebuilds = stats.rebuilds
+
+    write_mix(app_module)
+    incremental = stats.get()
+
+    assert stats.rebuilds == rebuilds  # every write was applied as a delta
+    assert incremental != before
+    assert incremental == DashboardStats(app_module.table_source).rebuild()
+
+def test_search_index_deltas_match_a_rebuild(app_module):
+    index = app_module.search_index
+    index.search('warmup', 'candidates')
+    builds = index.builds
+
+    write_mix(app_module)
+
+    fresh = SearchIndex(app_module.table_source, app_module.SEARCH_FIELDS)
+    fresh.sources = dict(index.sources)
+    for query in ('ada', 'grace hopper', 'c++', 'pyth'):
+        assert index.search(query, 'candidates') == fresh.search(query, 'candidates')
+    assert index.builds == builds
+    live, rebuilt = index._tables['candidates'], fresh._tables['candidates']
+    assert live['postings'].keys() == rebuilt['postings'].keys()
+    assert live['docs'] == rebuilt['docs']
+    assert live['total_length'] == rebuilt['total_length']